@@ -1,7 +1,7 @@
 # app/api/v1/api.py
 from fastapi import APIRouter
 
-from .endpoints import auth, senior, family, schedule, calendar, daily_qa
+from .endpoints import auth, senior, family, schedule, calendar, daily_qa, metrics
 
 api_router = APIRouter()
 
@@ -10,4 +10,5 @@ api_router.include_router(senior.router, prefix="/senior", tags=["Senior Convers
 api_router.include_router(family.router, prefix="/family", tags=["Family App"])
 api_router.include_router(schedule.router, prefix="/schedule", tags=["Schedule Management"])
 api_router.include_router(calendar.router, prefix="/calendar", tags=["Calendar Management"])
-api_router.include_router(daily_qa.router, prefix="/daily-qa", tags=["Daily Question"])
\ No newline at end of file
+api_router.include_router(daily_qa.router, prefix="/daily-qa", tags=["Daily Question"])
+api_router.include_router(metrics.router, prefix="/internal", tags=["Internal Metrics"])
\ No newline at end of file
@@ -7,6 +7,7 @@ from datetime import date
 
 from app.db.database import get_db
 from app.db import crud
+from app.services.report_cache import report_cache, FULL_REPORT
 
 router = APIRouter()
 
@@ -39,4 +40,5 @@ def post_family_answer(request: FamilyAnswerRequest, db: Session = Depends(get_d
         raise HTTPException(status_code=404, detail="오늘의 질문이 없어 답변을 등록할 수 없습니다.")
     
     crud.add_family_answer_to_daily_question(db, target_date=today, answer_text=request.answer_text)
+    report_cache.invalidate_kind(FULL_REPORT)
     return {"status": "success", "message": "가족 답변이 성공적으로 등록되었습니다."}
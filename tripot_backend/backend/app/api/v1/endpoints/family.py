@@ -27,6 +27,11 @@ def get_full_detail_report(senior_user_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="해당 사용자의 상세 리포트를 찾을 수 없습니다.")
     return report_data
 
+@router.get("/reports/today/{senior_user_id}")
+def get_today_digest(senior_user_id: str, db: Session = Depends(get_db)):
+    """야간 리포트가 만들어지기 전에도 볼 수 있는 오늘의 누적 대화 요약"""
+    return report_service.get_today_digest(db, senior_user_id)
+
 # --- Family Yard (Photos & Comments) ---
 
 # 🔽🔽🔽 사진 업로드 함수를 아래 내용으로 전체 교체해주세요 🔽🔽🔽
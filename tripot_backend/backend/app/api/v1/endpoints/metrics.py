@@ -0,0 +1,45 @@
+# app/api/v1/endpoints/metrics.py
+# 내부 모니터링용 지표 엔드포인트 ('X-Internal-Token' 헤더가 settings.INTERNAL_API_TOKEN과 같아야 접근 가능)
+
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import pool_stats
+from app.services.embedding_cache import embedding_cache
+from app.services.connection_manager import manager
+from app.services.memory_worker import memory_worker
+from app.services.conversation_writer import conversation_writer
+from app.services.report_cache import report_cache
+from app.services.quiz_selector import quiz_selector
+from app.services.quiz_grader import quiz_grader
+from app.services.intent_router import intent_router
+
+
+def require_internal_token(x_internal_token: str | None = Header(default=None)):
+    """내부 토큰이 설정되지 않았으면 엔드포인트가 없는 것처럼(404), 토큰이 틀리면 401을 반환합니다."""
+    if not settings.INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    # compare_digest는 ASCII가 아닌 str을 받으면 TypeError를 내므로 bytes로 비교합니다.
+    if not x_internal_token or not secrets.compare_digest(x_internal_token.encode(), settings.INTERNAL_API_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="내부 토큰이 올바르지 않습니다.")
+
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+@router.get("/metrics")
+def get_internal_metrics():
+    """대화 파이프라인의 단계별 지연 시간 히스토그램과 캐시/워커/DB 풀 현황을 반환합니다."""
+    return {
+        "active_connections": len(manager.active_connections),
+        "intents": intent_router.stats(),
+        "latency_ms": metrics.latency_registry.snapshot(),
+        "embedding_cache": embedding_cache.stats(),
+        "memory_worker": memory_worker.stats(),
+        "conversation_writer": conversation_writer.stats(),
+        "report_cache": report_cache.stats(),
+        "quiz_selector": quiz_selector.stats(),
+        "quiz_grader": quiz_grader.stats(),
+        "db_pool": pool_stats(),
+    }
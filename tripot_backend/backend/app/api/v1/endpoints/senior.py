@@ -3,18 +3,27 @@
 import json
 import os
 import asyncio
-import base64
-import tempfile
+from datetime import date
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from sqlalchemy.orm import Session
 
 # --- 통합된 모듈 임포트 ---
 from app.services import ai_service, vector_db_service
 from app.services.quiz_manager import QuizManager
+from app.services.quiz_bank import quiz_bank
+from app.services.quiz_selector import quiz_selector
+from app.services.intent_router import (
+    intent_router, INTENT_START_QUIZ, INTENT_STOP_QUIZ, INTENT_STT_NOISE, INTENT_GREETING, INTENT_ACK, INTENT_QUIZ_ANSWER
+)
+from app.services.audio_stream import AudioStreamAssembler, AudioProtocolError
+from app.services.prompt_registry import prompt_registry
+from app.services.memory_worker import memory_worker
+from app.services.conversation_writer import conversation_writer
+from app.services.report_cache import report_cache
 from app.services.connection_manager import manager # 분리된 매니저 사용
-from app.db import crud
+from app.db import async_crud
 from app.core.config import settings
-from app.db.database import SessionLocal
+from app.core import metrics
+from app.db.database import AsyncSessionLocal
 
 router = APIRouter()
 
@@ -22,78 +31,78 @@ router = APIRouter()
 # (퀴즈 관리자 인스턴스와 대화 로그를 포함)
 user_sessions = {}
 
-# --- 서버 시작 시 퀴즈 데이터와 프롬프트 경로 미리 준비 ---
-ALL_QUIZZES_DF = crud.fetch_quizzes_as_df()
-PROMPTS_FILE_PATH = os.path.join(settings.PROMPTS_DIR, 'quiz_prompts.json')
+# --- 퀴즈 문제는 quiz_bank(서버 시작 시 적재), 프롬프트는 prompt_registry가 관리 ---
+DEFAULT_START_QUESTION = "안녕하세요! 오늘은 어떤 재미있는 이야기를 나눠볼까요?"
 
 # --- 웹소켓 엔드포인트 ---
 
 @router.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: str):
     await manager.connect(websocket, user_id)
+    # '?stream=1'로 접속한 클라이언트에게는 일반 대화 응답을 문장 단위로 스트리밍합니다.
+    # (기존 클라이언트는 지금처럼 'ai_message' 한 번으로 전체 응답을 받습니다.)
+    stream_reply = websocket.query_params.get("stream") in ("1", "true")
+    debug_timing = websocket.query_params.get("debug") in ("1", "true")
     
     # --- 1. 사용자 세션 초기화 ---
     user_sessions[user_id] = {
-        "quiz_manager": QuizManager(ALL_QUIZZES_DF, PROMPTS_FILE_PATH, ai_service),
-        "conversation_log": []
+        "quiz_manager": QuizManager(quiz_bank, ai_service),
+        "conversation_log": [],
+        "log_dates": [],  # conversation_log 줄마다 그 말이 오간 날짜 (자정을 넘긴 세션의 누적 요약을 날짜별로 나누는 데 사용)
+        "audio_stream": AudioStreamAssembler(),
+        # 세션 동안 재사용할 기억 후보를 백그라운드에서 미리 불러옵니다.
+        "memory_prefetch": asyncio.create_task(vector_db_service.prefetch_memories(user_id)),
+        # 퀴즈 출제 기록(푼 문제, 최근 오답 주제)도 미리 불러와, 퀴즈를 시작할 때 DB를 훑지 않게 합니다.
+        "quiz_prefetch": asyncio.create_task(quiz_selector.load(user_id))
     }
     print(f"✅ 클라이언트 [{user_id}] 연결됨. 세션 초기화 완료.")
 
     # --- 2. 시작 메시지 전송 ---
-    # TODO: 시작 메시지를 talk_prompts.json에서 동적으로 불러오도록 개선
-    start_question = "안녕하세요! 오늘은 어떤 재미있는 이야기를 나눠볼까요?"
+    start_question = prompt_registry.start_question(DEFAULT_START_QUESTION)
     await manager.send_json({"type": "ai_message", "content": start_question}, user_id)
     
     # 세션 로그에 시작 메시지 기록
     user_sessions[user_id]["conversation_log"].append(f"AI: {start_question}")
+    user_sessions[user_id]["log_dates"].append(date.today())
     
-    # DB 세션 생성
-    db: Session = SessionLocal()
     try:
         # --- 3. 메시지 수신 및 처리 루프 ---
         while True:
-            audio_base64 = await websocket.receive_text()
-            
-            # 3-1. STT (Speech-to-Text)
-            user_message = await _audio_to_text(audio_base64)
-            if not user_message:
-                await manager.send_json({"type": "ai_message", "content": "음, 잘 못 들었어요. 다시 말씀해주시겠어요?"}, user_id)
-                continue
-            
-            # 사용자 메시지 화면에 표시
-            await manager.send_json({"type": "user_message", "content": user_message}, user_id)
-
-            # 3-2. 비즈니스 로직 처리 (퀴즈/일반대화)
-            quiz_manager = user_sessions[user_id]["quiz_manager"]
-            response_text = ""
-
-            if quiz_manager.is_active():
-                # 퀴즈 진행 중일 때: 사용자 입력을 정답으로 간주
-                response_text, result_to_save = await quiz_manager.process_answer(user_message)
-                if result_to_save:
-                    crud.save_quiz_result(db, result_to_save)
-            else:
-                # 일반 대화 상태일 때: 명령어 확인 후 처리
-                command = await ai_service.check_quiz_command(user_message)
-                if command:
-                    if command["action"] == "start_quiz":
-                        start_msg, first_question = quiz_manager.start_quiz(user_id)
-                        response_text = f"{start_msg}\n{first_question}" if first_question else start_msg
-                    elif command["action"] == "stop_quiz":
-                        response_text = quiz_manager.stop_quiz()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            # 3-1. 발화 오디오 수신
+            audio_data = None
+            if message.get("bytes") is not None:
+                # 바이너리 청크 프로토콜: END 프레임이 도착해야 발화 하나가 완성됩니다.
+                audio_stream = user_sessions[user_id]["audio_stream"]
+                try:
+                    audio_data = audio_stream.feed(message["bytes"])
+                except AudioProtocolError as e:
+                    print(f"⚠️ [{user_id}] 오디오 프레임 오류: {e}")
+                    audio_stream.reset()
+                    await manager.send_json({"type": "error", "content": str(e)}, user_id)
+                    continue
+                if audio_data is None:
+                    continue
+
+            with metrics.turn_timer() as turn_stages:
+                # 3-2. STT (Speech-to-Text)
+                if audio_data is not None:
+                    user_message = await _audio_bytes_to_text(audio_data)
                 else:
-                    # 일반 대화 처리
-                    _, response_text = await ai_service.process_user_audio(user_id, audio_base64)
-            
-            # 3-3. 최종 응답 전송 및 저장 (통합된 부분)
-            await manager.send_json({"type": "ai_message", "content": response_text}, user_id)
-            
-            # 모든 대화를 conversations 테이블에 저장
-            crud.save_conversation(db, user_id, user_message, response_text)
-            
-            # 모든 대화를 Pinecone 요약용 세션 로그에 추가
-            user_sessions[user_id]["conversation_log"].append(f"사용자: {user_message}")
-            user_sessions[user_id]["conversation_log"].append(f"AI: {response_text}")
+                    # 기존 텍스트 프로토콜: 프레임 하나에 base64로 인코딩된 발화 전체
+                    user_message = await _audio_to_text(message.get("text") or "")
+
+                if user_message:
+                    await _handle_user_message(user_id, user_message, stream_reply)
+                else:
+                    await manager.send_json({"type": "ai_message", "content": "음, 잘 못 들었어요. 다시 말씀해주시겠어요?"}, user_id)
+
+            # '?debug=1'로 접속한 클라이언트에게는 턴별 단계 소요 시간(ms)을 보냅니다.
+            if debug_timing:
+                await manager.send_json({"type": "turn_timing", "stages": turn_stages}, user_id)
 
     except WebSocketDisconnect:
         print(f"🔌 클라이언트 [{user_id}] 연결이 끊어졌습니다.")
@@ -105,32 +114,105 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
         # --- 4. 연결 종료 시 후처리 ---
         if user_id in user_sessions:
             session_log = user_sessions[user_id].get("conversation_log", [])
-            if session_log:
-                # 대화 기록을 Pinecone에 기억으로 저장
-                await vector_db_service.create_memory_for_pinecone(user_id, session_log)
+            log_dates = user_sessions[user_id].get("log_dates", [])
+            # 대화 기록의 기억 생성은 백그라운드 워커에 맡기고 바로 연결을 정리합니다.
+            # (사용자 발화 없이 시작 인사만 있는 세션은 워커가 건너뜁니다.)
+            memory_worker.submit(user_id, session_log, log_dates)
+            user_sessions[user_id]["memory_prefetch"].cancel()
+            user_sessions[user_id]["quiz_prefetch"].cancel()
             del user_sessions[user_id]
         
         manager.disconnect(user_id)
-        db.close()
         print(f"⏹️ [{user_id}] 클라이언트 세션 정리 완료.")
 
+async def _handle_user_message(user_id: str, user_message: str, stream_reply: bool):
+    """STT로 얻은 사용자 발화 하나를 처리하고 (퀴즈/일반대화) 응답 전송 및 저장까지 수행합니다."""
+    # 사용자 메시지 화면에 표시
+    await manager.send_json({"type": "user_message", "content": user_message}, user_id)
+
+    # 비즈니스 로직 처리 (퀴즈/일반대화)
+    quiz_manager = user_sessions[user_id]["quiz_manager"]
+    response_text = ""
+    already_sent = False
+
+    if quiz_manager.is_active():
+        # 퀴즈 진행 중일 때: 사용자 입력을 정답으로 간주
+        intent_router.record(INTENT_QUIZ_ANSWER)
+        response_text, result_to_save = await quiz_manager.process_answer(user_message)
+        if result_to_save:
+            with metrics.timed("db_write"):
+                async with AsyncSessionLocal() as db:
+                    await async_crud.save_quiz_result(db, result_to_save)
+                report_cache.invalidate_user(user_id)
+    else:
+        # 일반 대화 상태일 때: 의도(명령/인사/맞장구/일반 대화)를 먼저 분류한 뒤 처리
+        intent = intent_router.classify(user_message)
+        intent_router.record(intent)
+        if intent == INTENT_START_QUIZ:
+            await quiz_bank.refresh_if_stale()
+            await asyncio.shield(user_sessions[user_id]["quiz_prefetch"])
+            start_msg, first_question = quiz_manager.start_quiz(user_id)
+            response_text = f"{start_msg}\n{first_question}" if first_question else start_msg
+        elif intent == INTENT_STOP_QUIZ:
+            response_text = quiz_manager.stop_quiz()
+        elif intent == INTENT_GREETING:
+            # 인사에는 정해진 답변으로 바로 응답합니다.
+            response_text = intent_router.fast_reply(intent)
+        elif intent == INTENT_ACK and settings.INTENT_FAST_REPLY_ENABLED:
+            # 짧은 맞장구는 기억 검색 없이 최근 대화만 보고 작은 모델로 응답합니다.
+            recent_log = user_sessions[user_id]["conversation_log"][-settings.INTENT_FAST_CONTEXT_LINES:]
+            response_text = await ai_service.generate_light_reply(user_message, recent_log)
+        else:
+            # 일반 대화 처리 (STT에서 얻은 텍스트를 그대로 사용하여 STT 중복 호출 방지)
+            memory_snapshot = _get_memory_snapshot(user_sessions[user_id])
+            if stream_reply:
+                response_text = await manager.stream_text(
+                    ai_service.stream_chat_reply(user_id, user_message, memory_snapshot), user_id
+                )
+                already_sent = True
+            else:
+                response_text = await ai_service.generate_chat_reply(user_id, user_message, memory_snapshot)
+
+    # 최종 응답 전송 및 저장 (통합된 부분)
+    if not already_sent:
+        await manager.send_json({"type": "ai_message", "content": response_text}, user_id)
+
+    # 모든 대화를 conversations 테이블에 저장
+    # (write-behind 버퍼에 넣고 바로 반환합니다. 실제 INSERT는 여러 웹소켓의 메시지를 모아 한 번에 수행)
+    turn_at = conversation_writer.add_turn(user_id, user_message, response_text)
+
+    # 모든 대화를 기억 요약용 세션 로그에 추가
+    user_sessions[user_id]["conversation_log"].append(f"사용자: {user_message}")
+    user_sessions[user_id]["conversation_log"].append(f"AI: {response_text}")
+    user_sessions[user_id]["log_dates"].extend([turn_at.date()] * 2)
+
+def _get_memory_snapshot(session: dict):
+    """미리 불러오기가 끝났으면 기억 후보를, 아직이거나 실패했으면 None을 반환합니다."""
+    task = session.get("memory_prefetch")
+    if task is None or not task.done() or task.cancelled() or task.exception():
+        return None
+    return task.result()
+
 async def _audio_to_text(audio_base64: str) -> str | None:
-    """오디오 데이터를 텍스트로 변환하는 헬퍼 함수"""
-    temp_audio_path = None
+    """base64 오디오 데이터를 텍스트로 변환하는 헬퍼 함수 (기존 텍스트 프로토콜용)"""
     try:
-        audio_data = base64.b64decode(audio_base64)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
-            temp_audio.write(audio_data)
-            temp_audio_path = temp_audio.name
-        
-        user_message = await ai_service.get_transcript_from_audio(temp_audio_path)
+        audio_data = await ai_service.decode_audio_base64(audio_base64)
+    except Exception as e:
+        print(f"오디오 디코딩 오류: {e}")
+        return None
+    return await _audio_bytes_to_text(audio_data)
+
+async def _audio_bytes_to_text(audio_data: bytes | memoryview) -> str | None:
+    """메모리의 오디오 데이터를 텍스트로 변환하는 헬퍼 함수 (임시 파일 없이 처리)"""
+    if not audio_data:
+        return None
+    try:
+        user_message = await ai_service.get_transcript_from_audio(audio_data)
         
-        if not user_message.strip() or "시청해주셔서 감사합니다" in user_message:
+        if intent_router.is_stt_noise(user_message):
+            intent_router.record(INTENT_STT_NOISE)
             return None
         return user_message
     except Exception as e:
         print(f"STT 처리 오류: {e}")
         return None
-    finally:
-        if temp_audio_path and os.path.exists(temp_audio_path):
-            os.unlink(temp_audio_path)
\ No newline at end of file
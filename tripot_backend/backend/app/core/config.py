@@ -16,8 +16,29 @@ class Settings(BaseSettings):
 
     # --- API Keys & Vector DB ---
     OPENAI_API_KEY: str
-    PINECONE_API_KEY: str
+    PINECONE_API_KEY: str = ""   # MEMORY_STORE_BACKEND='pinecone'일 때만 필요
     PINECONE_INDEX_NAME: str = "long-term-memory"
+    MEMORY_STORE_BACKEND: str = "pinecone"   # 'pinecone' 또는 'local' (프로세스 내 NumPy 저장소)
+    MEMORY_PREFETCH_LIMIT: int = 200          # 세션 시작 시 미리 불러올 기억 후보 수
+    MEMORY_PREFETCH_MIN_SIMILARITY: float = 0.3  # 미리 불러온 후보의 최고 유사도가 이보다 낮으면 저장소에 다시 질의
+    LOCAL_MEMORY_MAX_USERS: int = 1000        # 'local' 저장소가 메모리에 열어 둘 최대 사용자 수 (LRU)
+
+    # --- Memory Consolidation Worker (웹소켓 종료 후 기억 생성) ---
+    MEMORY_WORKER_CONCURRENCY: int = 4
+    MEMORY_WORKER_QUEUE_SIZE: int = 1000
+    MEMORY_UPSERT_BATCH_SIZE: int = 50
+    MEMORY_UPSERT_FLUSH_SECONDS: float = 2.0
+    MEMORY_UPSERT_MAX_PENDING: int = 1000   # 저장에 실패해 다시 시도할 벡터까지 포함한 최대 보관 수 (넘으면 오래된 것부터 버림)
+
+    # --- OpenAI HTTP Client (비동기 클라이언트 커넥션 풀) ---
+    OPENAI_TIMEOUT_SECONDS: float = 30.0          # 요청 전체(읽기/쓰기) 타임아웃
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = 5.0   # TCP/TLS 연결 타임아웃
+    OPENAI_POOL_TIMEOUT_SECONDS: float = 10.0     # 풀에서 연결을 기다리는 최대 시간
+    OPENAI_MAX_CONNECTIONS: int = 200
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 100
+    OPENAI_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    OPENAI_MAX_RETRIES: int = 2
+    OPENAI_WARMUP_CONNECTIONS: int = 4            # 서버 시작 시 미리 열어둘 연결 수
 
     # --- MySQL Database ---
     MYSQL_USER: str
@@ -27,10 +48,59 @@ class Settings(BaseSettings):
     MYSQL_PORT: int = 3306
     MYSQL_ROOT_PASSWORD: str
 
+    # --- Conversation Write-Behind Buffer (대화 저장을 모아서 한 번에 INSERT) ---
+    CONVERSATION_WRITE_BATCH_SIZE: int = 200       # 이만큼 쌓이면 바로 flush
+    CONVERSATION_WRITE_FLUSH_SECONDS: float = 1.0  # 최대 이 시간마다 flush
+    CONVERSATION_WRITE_MAX_PENDING: int = 20_000   # flush 실패가 이어질 때 메모리에 보관할 최대 행 수
+    CONVERSATION_WRITE_USER_CACHE_SIZE: int = 10_000  # user_id_str -> users.id 캐시에 보관할 최대 사용자 수 (LRU)
+
+    # --- Daily Report Generation (scripts/generate_reports.py) ---
+    REPORT_CONCURRENCY: int = 8   # 동시에 리포트를 생성할 사용자 수
+    REPORT_CHUNK_TOKEN_BUDGET: int = 8000   # 대화 원문을 이 토큰 수(추정) 단위로 나눠 요약 (map-reduce)
+    REPORT_CHUNK_CONCURRENCY: int = 4       # 한 사용자의 조각을 동시에 요약할 수
+
+    # --- Family Report Read Cache (홈/상세 리포트 응답 캐시, 0이면 사용 안 함) ---
+    REPORT_CACHE_TTL_SECONDS: float = 300.0
+    REPORT_CACHE_MAX_ITEMS: int = 2048
+
+    # --- Rolling Daily Digest (세션 종료 시 하루 누적 요약 갱신) ---
+    DAILY_DIGEST_ENABLED: bool = True
+    DAILY_DIGEST_MAX_TOKENS: int = 600
+
+    # --- Quiz Bank (quiz 테이블 메모리 적재) ---
+    QUIZ_BANK_CHECK_SECONDS: float = 60.0   # quiz 테이블이 바뀌었는지 최대 이 주기로 확인
+    QUIZ_SELECTOR_MAX_USERS: int = 5000     # 푼 문제 비트맵을 메모리에 보관할 최대 사용자 수 (LRU)
+    QUIZ_MISS_LOOKBACK_DAYS: int = 14       # 최근 이 기간의 오답이 많은 주제를 더 자주 출제
+    QUIZ_MISS_WEIGHT: float = 1.0           # 주제 가중치 = 1 + QUIZ_MISS_WEIGHT * 최근 오답 수
+    QUIZ_GRADE_MEMO_MAX_ITEMS: int = 10_000  # 규칙으로 채점하지 못해 LLM에 물은 판정을 기억할 최대 개수
+
+    # --- Intent Router (짧은 맞장구는 기억 검색 없이 작은 모델로 응답) ---
+    INTENT_FAST_REPLY_ENABLED: bool = True
+    INTENT_FAST_MODEL: str = "gpt-4o-mini"
+    INTENT_FAST_CONTEXT_LINES: int = 6   # 작은 모델에 함께 보낼 최근 세션 로그 줄 수
+
+    # --- Internal Endpoints (/api/v1/internal/*) ---
+    INTERNAL_API_TOKEN: str = ""   # 'X-Internal-Token' 헤더로 받을 토큰. 비어 있으면 내부 엔드포인트를 열지 않음 (404)
+
+    # --- DB Connection Pool (동기/비동기 엔진 공통) ---
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 5.0      # 풀이 가득 찼을 때 기다릴 최대 시간 (짧게 두어 빨리 실패)
+    DB_POOL_RECYCLE_SECONDS: int = 1800       # MySQL wait_timeout보다 짧게
+    DB_POOL_PRE_PING: bool = True
+
     # --- Paths (경로 수정) ---
     # config.py -> core -> app -> backend (세 단계 위로 이동)
     BASE_DIR: str = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     PROMPTS_DIR: str = os.path.join(BASE_DIR, "prompts")
+    CACHE_DIR: str = os.path.join(BASE_DIR, "cache")
+    LOCAL_MEMORY_DIR: str = os.path.join(BASE_DIR, "memory_store")
+
+    # --- Embedding Cache (메모리 LRU + 로컬 SQLite) ---
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 4096
+    EMBEDDING_CACHE_MAX_DB_ITEMS: int = 200_000
+    EMBEDDING_CACHE_DB_PATH: str = os.path.join(CACHE_DIR, "embeddings.sqlite3")
 
     @property
     def DATABASE_URL(self) -> str:
@@ -40,6 +110,14 @@ class Settings(BaseSettings):
             f"{self.MYSQL_HOST}:{self.MYSQL_PORT}/{self.MYSQL_DATABASE}?charset=utf8mb4"
         )
     
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """비동기 엔진(aiomysql)에서 사용할 데이터베이스 연결 URL을 생성합니다."""
+        return (
+            f"mysql+aiomysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@"
+            f"{self.MYSQL_HOST}:{self.MYSQL_PORT}/{self.MYSQL_DATABASE}?charset=utf8mb4"
+        )
+
     # ... (나머지 property들은 그대로 유지) ...
     @property
     def SERVER_DATABASE_URL(self) -> str:
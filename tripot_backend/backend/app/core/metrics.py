@@ -0,0 +1,115 @@
+# app/core/metrics.py
+# 대화 파이프라인의 단계별 지연 시간을 측정하고 히스토그램으로 집계하는 모듈
+
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# 히스토그램 버킷 상한 (밀리초)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# 현재 처리 중인 턴의 단계별 소요 시간 (턴 밖에서는 None)
+_current_turn: ContextVar[dict | None] = ContextVar("current_turn", default=None)
+
+
+class LatencyHistogram:
+    """고정 버킷 기반의 지연 시간 히스토그램입니다. (누적 분포로 백분위수를 근사)"""
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        for i, upper in enumerate(self.buckets):
+            if ms <= upper:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float | None:
+        """q(0~1) 백분위수가 속한 버킷의 상한값을 반환합니다."""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for i, c in enumerate(self.counts):
+            cumulative += c
+            if cumulative >= target:
+                return float(self.buckets[i]) if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for upper, c in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            cumulative += c
+            buckets[upper] = cumulative
+        return {
+            "count": self.count,
+            "avg_ms": round(self.sum_ms / self.count, 2) if self.count else None,
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets_le_ms": buckets,
+        }
+
+
+class LatencyRegistry:
+    """단계 이름별 히스토그램 모음"""
+    def __init__(self):
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, ms: float):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+            histogram.observe(ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {stage: h.snapshot() for stage, h in sorted(self._histograms.items())}
+
+
+# 서버 전체에서 공유하는 레지스트리 인스턴스
+latency_registry = LatencyRegistry()
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    블록의 실행 시간을 단조 시계(perf_counter)로 재서 stage 히스토그램에 기록합니다.
+    턴 측정(turn_timer) 안이라면 해당 턴의 단계별 시간에도 더합니다.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        latency_registry.observe(stage, elapsed_ms)
+        turn = _current_turn.get()
+        if turn is not None:
+            turn[stage] = round(turn.get(stage, 0.0) + elapsed_ms, 2)
+
+
+@contextmanager
+def turn_timer():
+    """한 턴 전체를 측정합니다. 블록 안에서 기록된 단계별 시간(ms) 딕셔너리를 돌려줍니다."""
+    stages: dict[str, float] = {}
+    token = _current_turn.set(stages)
+    start = time.perf_counter()
+    try:
+        yield stages
+    finally:
+        stages["total"] = round((time.perf_counter() - start) * 1000, 2)
+        latency_registry.observe("turn_total", stages["total"])
+        _current_turn.reset(token)
@@ -0,0 +1,232 @@
+# app/db/async_crud.py
+# 웹소켓 대화 경로에서 사용하는 비동기 CRUD 함수 모음
+# (배치 스크립트 등에서는 기존 동기 crud.py를 그대로 사용합니다.)
+
+from datetime import date, datetime
+from typing import AsyncIterator
+
+from sqlalchemy import select, insert, exists, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .crud import day_range, format_conversation_line, quiz_rollup_increment, CONVERSATION_FETCH_BATCH
+
+# --- User CRUD ---
+
+async def get_user_by_user_id_str(db: AsyncSession, user_id_str: str) -> models.User | None:
+    """user_id_str로 사용자를 조회합니다."""
+    result = await db.execute(select(models.User).where(models.User.user_id_str == user_id_str))
+    return result.scalars().first()
+
+async def get_or_create_user(db: AsyncSession, user_id_str: str, name: str = None) -> models.User:
+    """사용자가 없으면 생성하고, 있으면 반환합니다."""
+    user = await get_user_by_user_id_str(db, user_id_str)
+    if user:
+        return user
+
+    user = models.User(user_id_str=user_id_str, name=name)
+    db.add(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # 다른 연결이 같은 사용자를 먼저 만든 경우
+        await db.rollback()
+        return await get_user_by_user_id_str(db, user_id_str)
+    await db.refresh(user)
+    return user
+
+async def get_or_create_user_ids(db: AsyncSession, user_id_strs: set[str]) -> dict[str, int]:
+    """여러 사용자의 {user_id_str: id}를 한 번에 조회하고, 없는 사용자는 한 번의 INSERT로 생성합니다."""
+    if not user_id_strs:
+        return {}
+    query = select(models.User.user_id_str, models.User.id).where(models.User.user_id_str.in_(user_id_strs))
+    user_ids = dict((await db.execute(query)).all())
+
+    missing = user_id_strs - user_ids.keys()
+    if missing:
+        # 다른 연결이 같은 사용자를 먼저 만들었을 수 있으므로 중복은 무시하고 다시 조회합니다.
+        await db.execute(
+            insert(models.User).prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite"),
+            [{"user_id_str": user_id_str} for user_id_str in missing]
+        )
+        user_ids.update((await db.execute(query)).all())
+    return user_ids
+
+# --- Conversation CRUD ---
+
+async def save_conversation(db: AsyncSession, user_id_str: str, user_message: str, ai_message: str):
+    """실시간 대화를 DB에 저장합니다."""
+    user = await get_or_create_user(db, user_id_str)
+    db.add_all([
+        models.Conversation(user_id=user.id, speaker='user', message=user_message),
+        models.Conversation(user_id=user.id, speaker='ai', message=ai_message),
+    ])
+    await db.commit()
+
+async def bulk_insert_conversations(db: AsyncSession, rows: list[dict]):
+    """{'user_id', 'speaker', 'message', 'created_at'} 행 목록을 multi-row INSERT 한 번으로 저장합니다. (commit은 호출자가 수행)"""
+    if rows:
+        await db.execute(insert(models.Conversation), rows)
+
+# --- Summary (Daily Report) CRUD ---
+
+async def get_user_ids_with_convos_on_date(db: AsyncSession, target_date: date, exclude_summarized: bool = False) -> list[str]:
+    """
+    특정 날짜에 대화한 모든 사용자 ID 목록을 반환합니다.
+    exclude_summarized가 True이면 그 날짜의 리포트가 이미 있는 사용자는 제외합니다. (중단된 리포트 작업 이어서 하기)
+    """
+    start, end = day_range(target_date)
+    query = select(models.User.user_id_str).join(models.Conversation).where(
+        models.Conversation.created_at >= start,
+        models.Conversation.created_at < end
+    ).distinct()
+    if exclude_summarized:
+        query = query.where(~exists().where(
+            models.Summary.user_id == models.User.id,
+            models.Summary.report_date == target_date
+        ))
+    return list((await db.execute(query)).scalars().all())
+
+async def stream_conversation_lines(db: AsyncSession, user_id_str: str, target_date: date) -> AsyncIterator[str]:
+    """특정 사용자의 하루치 대화를 시간순으로 한 줄씩 돌려줍니다. (서버 측 커서로 CONVERSATION_FETCH_BATCH행씩 읽음)"""
+    user = await get_user_by_user_id_str(db, user_id_str)
+    if not user:
+        return
+
+    start, end = day_range(target_date)
+    result = await db.stream(
+        select(models.Conversation.speaker, models.Conversation.message).where(
+            models.Conversation.user_id == user.id,
+            models.Conversation.created_at >= start,
+            models.Conversation.created_at < end
+        ).order_by(models.Conversation.created_at.asc(), models.Conversation.id.asc())
+        .execution_options(yield_per=CONVERSATION_FETCH_BATCH)
+    )
+    async for speaker, message in result:
+        yield format_conversation_line(speaker, message)
+
+async def fetch_conversations_text_by_date(db: AsyncSession, user_id_str: str, target_date: date) -> str:
+    """특정 사용자의 하루치 대화 내용을 리포트용 텍스트로 조합하여 반환합니다."""
+    return "\n".join([line async for line in stream_conversation_lines(db, user_id_str, target_date)])
+
+async def save_summary(db: AsyncSession, user_id_str: str, report_date: date, summary_json: dict):
+    """분석된 리포트를 DB에 저장 또는 업데이트합니다."""
+    user = await get_or_create_user(db, user_id_str)
+    result = await db.execute(select(models.Summary).where(
+        models.Summary.user_id == user.id,
+        models.Summary.report_date == report_date
+    ))
+    existing = result.scalars().first()
+    if existing:
+        existing.summary_json = summary_json
+    else:
+        db.add(models.Summary(user_id=user.id, report_date=report_date, summary_json=summary_json))
+    await db.commit()
+
+async def count_user_turns_on_date(db: AsyncSession, user_id: int, target_date: date) -> int:
+    """특정 날짜에 저장된 사용자 발화(speaker='user') 수를 반환합니다."""
+    start, end = day_range(target_date)
+    result = await db.execute(select(func.count()).select_from(models.Conversation).where(
+        models.Conversation.user_id == user_id,
+        models.Conversation.speaker == 'user',
+        models.Conversation.created_at >= start,
+        models.Conversation.created_at < end
+    ))
+    return result.scalar_one()
+
+# --- Daily Digest CRUD ---
+
+async def get_daily_digest(db: AsyncSession, user_id: int, digest_date: date) -> models.DailyDigest | None:
+    result = await db.execute(select(models.DailyDigest).where(
+        models.DailyDigest.user_id == user_id,
+        models.DailyDigest.digest_date == digest_date
+    ))
+    return result.scalars().first()
+
+async def save_daily_digest(db: AsyncSession, user_id: int, digest_date: date, digest_text: str, new_user_turns: int):
+    """하루 누적 요약을 저장 또는 갱신하고, 반영된 발화/세션 수를 늘립니다."""
+    digest = await get_daily_digest(db, user_id, digest_date)
+    if digest is None:
+        db.add(models.DailyDigest(
+            user_id=user_id, digest_date=digest_date, digest_text=digest_text,
+            user_turn_count=new_user_turns, session_count=1
+        ))
+    else:
+        digest.digest_text = digest_text
+        digest.user_turn_count += new_user_turns
+        digest.session_count += 1
+    await db.commit()
+
+# --- Quiz CRUD ---
+
+async def get_quiz_table_signature(db: AsyncSession) -> tuple:
+    """quiz 테이블의 (문제 수, 최대 id, 최근 생성 시각)을 반환합니다. 테이블을 다시 채웠는지 확인하는 데 씁니다."""
+    result = await db.execute(select(func.count(models.Quiz.id), func.max(models.Quiz.id), func.max(models.Quiz.created_at)))
+    return tuple(result.one())
+
+async def fetch_all_quizzes(db: AsyncSession) -> list[tuple]:
+    """모든 퀴즈를 (id, topic, question_text, answer) 튜플 목록으로 반환합니다."""
+    result = await db.execute(
+        select(models.Quiz.id, models.Quiz.topic, models.Quiz.question_text, models.Quiz.answer).order_by(models.Quiz.id)
+    )
+    return [tuple(row) for row in result]
+
+async def fetch_answered_quiz_ids(db: AsyncSession, user_id_str: str) -> list[int]:
+    """사용자가 지금까지 푼 적이 있는 퀴즈 id 목록을 반환합니다."""
+    user = await get_user_by_user_id_str(db, user_id_str)
+    if user is None:
+        return []
+    result = await db.execute(
+        select(models.QuizResult.quiz_id).where(models.QuizResult.user_id == user.id).distinct()
+    )
+    return list(result.scalars())
+
+async def fetch_topic_misses_since(db: AsyncSession, user_id_str: str, since_date: date) -> dict[str, int]:
+    """since_date 이후 주제별 오답 수를 quiz_daily_rollup에서 합산해 반환합니다."""
+    user = await get_user_by_user_id_str(db, user_id_str)
+    if user is None:
+        return {}
+    result = await db.execute(
+        select(
+            models.QuizDailyRollup.topic,
+            func.sum(models.QuizDailyRollup.total_count - models.QuizDailyRollup.correct_count)
+        ).where(
+            models.QuizDailyRollup.user_id == user.id,
+            models.QuizDailyRollup.rollup_date >= since_date
+        ).group_by(models.QuizDailyRollup.topic)
+    )
+    return {topic: int(misses) for topic, misses in result if misses}
+
+# --- Quiz Result CRUD ---
+
+async def _increment_quiz_rollup(db: AsyncSession, user_id: int, rollup_date: date, quiz_id: int, is_correct: bool):
+    topic = (await db.execute(select(models.Quiz.topic).where(models.Quiz.id == quiz_id))).scalar()
+    if topic is None:
+        return  # 주제를 알 수 없는 결과는 인지 리포트에서도 제외됩니다.
+    if (await db.execute(quiz_rollup_increment(user_id, rollup_date, topic, is_correct))).rowcount:
+        return
+    try:
+        async with db.begin_nested():
+            db.add(models.QuizDailyRollup(
+                user_id=user_id, rollup_date=rollup_date, topic=topic,
+                total_count=1, correct_count=1 if is_correct else 0
+            ))
+    except IntegrityError:
+        # 다른 연결이 같은 행을 먼저 만든 경우
+        await db.execute(quiz_rollup_increment(user_id, rollup_date, topic, is_correct))
+
+async def save_quiz_result(db: AsyncSession, result_data: dict):
+    """퀴즈 결과를 저장하고, 같은 트랜잭션에서 날짜/주제별 집계(quiz_daily_rollup)를 갱신합니다."""
+    user = await get_or_create_user(db, result_data.get("user_id"))
+
+    db_result_data = result_data.copy()
+    db_result_data['user_id'] = user.id
+    db_result_data.setdefault('created_at', datetime.now())
+
+    new_result = models.QuizResult(**db_result_data)
+    db.add(new_result)
+    # 결과 행을 savepoint 밖에서 먼저 INSERT해 둡니다. (집계 INSERT가 경합으로 롤백되어도 결과 행은 남도록)
+    await db.flush()
+    await _increment_quiz_rollup(db, user.id, db_result_data['created_at'].date(), new_result.quiz_id, new_result.is_correct)
+    await db.commit()
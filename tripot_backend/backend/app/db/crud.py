@@ -1,32 +1,45 @@
 # app/db/crud.py
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case, insert, update, delete, select
+from sqlalchemy.exc import IntegrityError
 from datetime import date, datetime, timedelta, time
+from typing import Iterator
 import json
-import pandas as pd
 
 from . import models, database
 
+def day_range(start_date: date, end_date: date | None = None) -> tuple[datetime, datetime]:
+    """
+    start_date 00:00 이상, (end_date 또는 start_date) 다음날 00:00 미만의 반개구간을 반환합니다.
+    func.date(created_at) == ... 처럼 컬럼에 함수를 씌우지 않아야 created_at 인덱스를 사용할 수 있습니다.
+    """
+    start = datetime.combine(start_date, time.min)
+    end = datetime.combine(end_date or start_date, time.min) + timedelta(days=1)
+    return start, end
+
 # --- User CRUD ---
 
 def get_user_by_user_id_str(db: Session, user_id_str: str) -> models.User | None:
     """user_id_str로 사용자를 조회합니다."""
     return db.query(models.User).filter(models.User.user_id_str == user_id_str).first()
 
-def create_user(db: Session, user_id_str: str, name: str = None) -> models.User:
-    """새로운 사용자를 생성합니다."""
+def create_user(db: Session, user_id_str: str, name: str = None, commit: bool = True) -> models.User:
+    """새로운 사용자를 생성합니다. (commit=False이면 flush만 해서 id를 받고, 커밋은 호출자가 합니다.)"""
     db_user = models.User(user_id_str=user_id_str, name=name)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    if commit:
+        db.commit()
+        db.refresh(db_user)
+    else:
+        db.flush()
     return db_user
 
-def get_or_create_user(db: Session, user_id_str: str, name: str = None) -> models.User:
+def get_or_create_user(db: Session, user_id_str: str, name: str = None, commit: bool = True) -> models.User:
     """사용자가 없으면 생성하고, 있으면 반환합니다."""
     user = get_user_by_user_id_str(db, user_id_str)
     if not user:
-        user = create_user(db, user_id_str, name)
+        user = create_user(db, user_id_str, name, commit=commit)
     return user
 
 # --- Conversation & Summary CRUD ---
@@ -40,16 +53,19 @@ def save_conversation(db: Session, user_id_str: str, user_message: str, ai_messa
     db.add(ai_convo)
     db.commit()
 
-def save_summary(db: Session, user_id_str: str, report_date: date, summary_json: dict):
-    """분석된 리포트를 DB에 저장 또는 업데이트합니다."""
-    user = get_or_create_user(db, user_id_str)
+def save_summary(db: Session, user_id_str: str, report_date: date, summary_json: dict, commit: bool = True):
+    """분석된 리포트를 DB에 저장 또는 업데이트합니다. (여러 건을 모아서 저장할 때는 commit=False 후 호출자가 커밋)"""
+    user = get_or_create_user(db, user_id_str, commit=commit)
     existing = db.query(models.Summary).filter_by(user_id=user.id, report_date=report_date).first()
     if existing:
         existing.summary_json = summary_json
     else:
         new_summary = models.Summary(user_id=user.id, report_date=report_date, summary_json=summary_json)
         db.add(new_summary)
-    db.commit()
+    if commit:
+        db.commit()
+    else:
+        db.flush()
 
 def get_latest_summary(db: Session, user_id_str: str) -> models.Summary | None:
     """사용자 ID로 가장 최신 리포트를 가져옵니다."""
@@ -57,22 +73,43 @@ def get_latest_summary(db: Session, user_id_str: str) -> models.Summary | None:
     if not user: return None
     return db.query(models.Summary).filter_by(user_id=user.id).order_by(models.Summary.report_date.desc()).first()
 
+def get_daily_digest(db: Session, user_id_str: str, digest_date: date) -> models.DailyDigest | None:
+    """특정 날짜의 하루 누적 요약을 가져옵니다."""
+    user = get_user_by_user_id_str(db, user_id_str)
+    if not user: return None
+    return db.query(models.DailyDigest).filter_by(user_id=user.id, digest_date=digest_date).first()
+
 def get_user_ids_with_convos_on_date(db: Session, target_date: date) -> list[str]:
     """특정 날짜에 대화한 모든 사용자 ID 목록을 반환합니다."""
+    start, end = day_range(target_date)
     user_ids = db.query(models.User.user_id_str).join(models.Conversation).filter(
-        func.date(models.Conversation.created_at) == target_date
+        models.Conversation.created_at >= start,
+        models.Conversation.created_at < end
     ).distinct().all()
     return [uid[0] for uid in user_ids]
 
+CONVERSATION_FETCH_BATCH = 500  # 하루치 대화를 읽을 때 한 번에 가져올 행 수 (yield_per)
+
+def format_conversation_line(speaker: str, message: str) -> str:
+    return f"{'사용자' if speaker == 'user' else 'AI'}: {message}"
+
+def iter_conversation_lines(db: Session, user_id_str: str, target_date: date) -> Iterator[str]:
+    """특정 사용자의 하루치 대화를 시간순으로 한 줄씩 돌려줍니다. (ORM 객체 목록을 한꺼번에 만들지 않고 나눠서 읽음)"""
+    user = get_user_by_user_id_str(db, user_id_str)
+    if not user: return
+
+    start, end = day_range(target_date)
+    rows = db.query(models.Conversation.speaker, models.Conversation.message).filter(
+        models.Conversation.user_id == user.id,
+        models.Conversation.created_at >= start,
+        models.Conversation.created_at < end
+    ).order_by(models.Conversation.created_at.asc(), models.Conversation.id.asc()).yield_per(CONVERSATION_FETCH_BATCH)
+    for speaker, message in rows:
+        yield format_conversation_line(speaker, message)
+
 def fetch_conversations_text_by_date(db: Session, user_id_str: str, target_date: date) -> str:
     """특정 사용자의 하루치 대화 내용을 리포트용 텍스트로 조합하여 반환합니다."""
-    conversations = db.query(models.Conversation).join(models.User).filter(
-        models.User.user_id_str == user_id_str,
-        func.date(models.Conversation.created_at) == target_date
-    ).order_by(models.Conversation.created_at.asc()).all()
-    if not conversations: return ""
-    formatted = [f"{'사용자' if c.speaker == 'user' else 'AI'}: {c.message}" for c in conversations]
-    return "\n".join(formatted)
+    return "\n".join(iter_conversation_lines(db, user_id_str, target_date))
 
 # --- Photo & Comment CRUD ---
 
@@ -184,43 +221,89 @@ def update_elderly_answer_log(db: Session, target_date: date, new_log_entry: str
 
 # --- Quiz & Quiz Result CRUD ---
 
+def quiz_rollup_increment(user_id: int, rollup_date: date, topic: str, is_correct: bool):
+    """quiz_daily_rollup의 해당 행을 1문제만큼 늘리는 UPDATE 문 (동기/비동기 crud 공용)"""
+    return update(models.QuizDailyRollup).where(
+        models.QuizDailyRollup.user_id == user_id,
+        models.QuizDailyRollup.rollup_date == rollup_date,
+        models.QuizDailyRollup.topic == topic
+    ).values(
+        total_count=models.QuizDailyRollup.total_count + 1,
+        correct_count=models.QuizDailyRollup.correct_count + (1 if is_correct else 0)
+    )
+
+def _increment_quiz_rollup(db: Session, user_id: int, rollup_date: date, quiz_id: int, is_correct: bool):
+    topic = db.query(models.Quiz.topic).filter(models.Quiz.id == quiz_id).scalar()
+    if topic is None:
+        return  # 주제를 알 수 없는 결과는 인지 리포트에서도 제외됩니다.
+    if db.execute(quiz_rollup_increment(user_id, rollup_date, topic, is_correct)).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.add(models.QuizDailyRollup(
+                user_id=user_id, rollup_date=rollup_date, topic=topic,
+                total_count=1, correct_count=1 if is_correct else 0
+            ))
+    except IntegrityError:
+        # 다른 연결이 같은 행을 먼저 만든 경우
+        db.execute(quiz_rollup_increment(user_id, rollup_date, topic, is_correct))
+
 def save_quiz_result(db: Session, result_data: dict):
-    """퀴즈 결과를 DB에 저장합니다."""
+    """퀴즈 결과를 저장하고, 같은 트랜잭션에서 날짜/주제별 집계(quiz_daily_rollup)를 갱신합니다."""
     user_id_str = result_data.get("user_id")
     user = get_or_create_user(db, user_id_str)
     
     db_result_data = result_data.copy()
     db_result_data['user_id'] = user.id
+    db_result_data.setdefault('created_at', datetime.now())
     
     new_result = models.QuizResult(**db_result_data)
     db.add(new_result)
+    # 결과 행을 savepoint 밖에서 먼저 INSERT해 둡니다. (집계 INSERT가 경합으로 롤백되어도 결과 행은 남도록)
+    db.flush()
+    _increment_quiz_rollup(db, user.id, db_result_data['created_at'].date(), new_result.quiz_id, new_result.is_correct)
     db.commit()
 
-def fetch_quizzes_as_df() -> pd.DataFrame:
-    """DB에서 모든 퀴즈를 불러와 DataFrame으로 반환합니다."""
-    try:
-        engine = database.engine
-        query = "SELECT id, topic, question_text, answer FROM quiz"
-        df = pd.read_sql(query, engine)
-        return df
-    except Exception as e:
-        print(f"❌ 퀴즈 DB 데이터 로드 중 오류 발생: {e}")
-        return pd.DataFrame()
-
-def fetch_quiz_results_with_topic(db: Session, user_id_str: str, start_date: date, end_date: date) -> list:
-    """기간 내 사용자의 퀴즈 결과와 주제를 함께 가져옵니다."""
+def fetch_quiz_topic_totals(db: Session, user_id_str: str, start_date: date, end_date: date) -> list[tuple[str, int, int]]:
+    """기간(양 끝 포함) 내 사용자의 주제별 (주제, 풀이 수, 정답 수)를 quiz_daily_rollup에서 합산해 반환합니다."""
     user = get_user_by_user_id_str(db, user_id_str)
     if not user: return []
-    
-    return db.query(
-        models.QuizResult.is_correct,
-        models.Quiz.topic
+
+    rows = db.query(
+        models.QuizDailyRollup.topic,
+        func.sum(models.QuizDailyRollup.total_count),
+        func.sum(models.QuizDailyRollup.correct_count)
+    ).filter(
+        models.QuizDailyRollup.user_id == user.id,
+        models.QuizDailyRollup.rollup_date >= start_date,
+        models.QuizDailyRollup.rollup_date <= end_date
+    ).group_by(models.QuizDailyRollup.topic).order_by(models.QuizDailyRollup.topic).all()
+    return [(topic, int(total), int(correct)) for topic, total, correct in rows]
+
+def rebuild_quiz_rollup(db: Session) -> int:
+    """
+    quiz_results 전체로 quiz_daily_rollup을 다시 만들고, 만들어진 행 수를 반환합니다. (기존 데이터 백필용)
+    한 번만 실행하는 작업이므로 func.date로 날짜별로 묶습니다.
+    """
+    result_date = func.date(models.QuizResult.created_at)
+    aggregated = select(
+        models.QuizResult.user_id,
+        result_date,
+        models.Quiz.topic,
+        func.count(),
+        func.sum(case((models.QuizResult.is_correct, 1), else_=0))
     ).join(
         models.Quiz, models.QuizResult.quiz_id == models.Quiz.id
-    ).filter(
-        models.QuizResult.user_id == user.id,
-        func.date(models.QuizResult.created_at).between(start_date, end_date)
-    ).all()
+    ).where(
+        models.QuizResult.created_at.isnot(None)
+    ).group_by(models.QuizResult.user_id, result_date, models.Quiz.topic)
+
+    db.execute(delete(models.QuizDailyRollup))
+    db.execute(insert(models.QuizDailyRollup).from_select(
+        ["user_id", "rollup_date", "topic", "total_count", "correct_count"], aggregated
+    ))
+    db.commit()
+    return db.query(models.QuizDailyRollup).count()
 
 def delete_schedules_by_user_id_str(db: Session, user_id_str: str) -> int:
     """사용자의 모든 스케줄을 삭제하고 삭제된 개수를 반환합니다."""
@@ -1,13 +1,57 @@
 # app/database.py
 
-from sqlalchemy import create_engine, text
+import time
+from sqlalchemy import create_engine, text, exc, inspect
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from app.core.config import settings
+from app.core import metrics
+
+class DatabasePoolTimeout(exc.TimeoutError):
+    """커넥션 풀에서 DB_POOL_TIMEOUT_SECONDS 안에 연결을 얻지 못했을 때 발생합니다."""
+
+class _InstrumentedPoolMixin:
+    """연결을 얻기까지 기다린 시간과 타임아웃 횟수를 기록하고, 타임아웃을 명확한 오류로 바꿔 줍니다."""
+    timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError as e:
+            type(self).timeouts += 1
+            raise DatabasePoolTimeout(
+                f"DB 커넥션 풀이 가득 차서 {self._timeout}초 안에 연결을 얻지 못했습니다. "
+                f"({self.status()}) DB_POOL_SIZE / DB_MAX_OVERFLOW 설정을 확인하세요."
+            ) from e
+        finally:
+            metrics.latency_registry.observe(f"db_pool_wait.{self._metrics_name}", (time.perf_counter() - start) * 1000)
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    _metrics_name = "sync"
+    timeouts = 0
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    _metrics_name = "async"
+    timeouts = 0
+
+_POOL_OPTIONS = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,   # MySQL wait_timeout 전에 연결을 교체
+    pool_pre_ping=settings.DB_POOL_PRE_PING,         # 끊어진(stale) 연결을 꺼내기 전에 확인
+)
 
 # 데이터베이스 연결 설정
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, poolclass=InstrumentedQueuePool, **_POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# 비동기 데이터베이스 연결 설정 (웹소켓 대화 경로처럼 이벤트 루프를 막으면 안 되는 곳에서 사용)
+async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool, **_POOL_OPTIONS)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 def init_db():
@@ -30,10 +74,51 @@ def init_db():
         print(f"❌ 데이터베이스 설정 중 오류 발생: {e}")
         raise
 
+def create_missing_indexes(bind=None) -> list[str]:
+    """
+    models.py에 정의되어 있지만 기존 DB에는 아직 없는 인덱스를 만들고, 만든 인덱스 이름 목록을 반환합니다.
+    (create_all은 이미 있는 테이블의 인덱스를 추가하지 않으므로, 기존 DB에는 이 함수로 마이그레이션합니다.)
+    """
+    from . import models
+    bind = bind or engine
+    inspector = inspect(bind)
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name in existing:
+                continue
+            print(f"🔧 인덱스 생성 중: {table.name}.{index.name} ({', '.join(c.name for c in index.columns)})")
+            index.create(bind=bind)
+            created.append(index.name)
+    return created
+
 def get_db():
     """FastAPI 의존성 주입을 위한 DB 세션 생성기"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """FastAPI 의존성 주입을 위한 비동기 DB 세션 생성기"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_stats() -> dict:
+    """동기/비동기 엔진의 커넥션 풀 현황을 반환합니다. (대기 시간은 /internal/metrics의 db_pool_wait.* 참고)"""
+    stats = {}
+    for name, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        stats[name] = {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "timeouts": type(pool).timeouts,
+        }
+    return stats
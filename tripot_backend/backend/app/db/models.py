@@ -1,7 +1,7 @@
 # app/db/models.py
 
 from sqlalchemy import (Column, Integer, String, DateTime, ForeignKey, Text, 
-                        Boolean, Time, Date, JSON)
+                        Boolean, Time, Date, JSON, Index, UniqueConstraint)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -27,6 +27,7 @@ class User(Base):
     
     conversations = relationship("Conversation", back_populates="user_rel")
     summaries = relationship("Summary", back_populates="user_rel")
+    daily_digests = relationship("DailyDigest", back_populates="user_rel")
     quiz_results = relationship("QuizResult", back_populates="user_rel")
 
 class FamilyPhoto(Base):
@@ -43,6 +44,10 @@ class FamilyPhoto(Base):
     user = relationship("User", back_populates="photos")
     comments = relationship("PhotoComment", back_populates="photo", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_family_photos_user_id_created_at", "user_id", "created_at"),
+    )
+
 class PhotoComment(Base):
     __tablename__ = "photo_comments"
     id = Column(Integer, primary_key=True, index=True)
@@ -79,6 +84,13 @@ class Conversation(Base):
     
     user_rel = relationship("User", back_populates="conversations")
 
+    __table_args__ = (
+        # 사용자별 하루치 대화 조회 (user_id = ? AND created_at 범위, created_at 정렬)
+        Index("ix_conversations_user_id_created_at", "user_id", "created_at"),
+        # 특정 날짜에 대화한 사용자 목록 조회 (nightly 리포트 작업)
+        Index("ix_conversations_created_at", "created_at"),
+    )
+
 class Summary(Base):
     __tablename__ = "summaries"
     id = Column(Integer, primary_key=True, index=True)
@@ -89,6 +101,28 @@ class Summary(Base):
     
     user_rel = relationship("User", back_populates="summaries")
 
+    __table_args__ = (
+        Index("ix_summaries_user_id_report_date", "user_id", "report_date"),
+    )
+
+class DailyDigest(Base):
+    """대화 세션이 끝날 때마다 새 발화만 접어 넣어 갱신하는 사용자별 하루 누적 요약"""
+    __tablename__ = "daily_digests"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    digest_date = Column(Date, nullable=False)
+    digest_text = Column(Text, nullable=False)
+    user_turn_count = Column(Integer, nullable=False, default=0)  # 요약에 반영된 사용자 발화 수
+    session_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    user_rel = relationship("User", back_populates="daily_digests")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "digest_date", name="uq_daily_digests_user_id_digest_date"),
+    )
+
 class Quiz(Base):
     __tablename__ = "quiz"
     id = Column(Integer, primary_key=True, index=True)
@@ -111,6 +145,24 @@ class QuizResult(Base):
     
     user_rel = relationship("User", back_populates="quiz_results")
 
+    __table_args__ = (
+        Index("ix_quiz_results_user_id_created_at", "user_id", "created_at"),
+    )
+
+class QuizDailyRollup(Base):
+    """사용자 x 날짜 x 퀴즈 주제별 풀이/정답 수 (퀴즈 결과를 저장할 때 같은 트랜잭션에서 갱신)"""
+    __tablename__ = "quiz_daily_rollup"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    rollup_date = Column(Date, nullable=False)
+    topic = Column(String(255), nullable=False)
+    total_count = Column(Integer, nullable=False, default=0)
+    correct_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "rollup_date", "topic", name="uq_quiz_daily_rollup_user_id_date_topic"),
+    )
+
 class DailyQA(Base):
     __tablename__ = "daily_qa"
     id = Column(Integer, primary_key=True, index=True)
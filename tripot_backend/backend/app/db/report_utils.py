@@ -1,8 +1,8 @@
 # app/db/report_utils.py 파일을 아래 내용으로 전체 교체하세요.
 
 from datetime import date, timedelta
-from app import crud
-from app.database import SessionLocal
+from app.db import crud
+from app.db.database import SessionLocal
 
 def get_all_user_ids_for_yesterday() -> list[str]:
     """
@@ -24,7 +24,7 @@ def fetch_daily_conversations(user_id_str: str, target_date: date) -> str | None
     db = SessionLocal()
     try:
         print(f"🔍 {user_id_str} 사용자의 {target_date} 대화를 crud를 통해 조회 중...")
-        return crud.fetch_conversations_text_by_date(db, user_id=user_id_str, target_date=target_date)
+        return crud.fetch_conversations_text_by_date(db, user_id_str=user_id_str, target_date=target_date)
     finally:
         db.close()
 
@@ -33,7 +33,7 @@ def save_summary_to_db(user_id_str: str, target_date: date, summary_data: dict)
     db = SessionLocal()
     try:
         print(f"💾 {user_id_str}의 {target_date} 요약을 crud를 통해 DB에 저장 중...")
-        crud.save_summary(db, user_id=user_id_str, report_date=target_date, summary_json=summary_data)
+        crud.save_summary(db, user_id_str=user_id_str, report_date=target_date, summary_json=summary_data)
         return True
     except Exception as e:
         print(f"❌ DB 저장 오류: {e}")
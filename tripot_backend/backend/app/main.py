@@ -41,6 +41,22 @@ async def startup_event():
         # 🔽🔽🔽 함수 이름 수정 🔽🔽🔽
         asyncio.create_task(scheduler_service.start()) 
         
+        # 3. OpenAI 연결 예열 (실패해도 서버는 계속 시작)
+        from app.services import ai_service
+        await ai_service.warmup_client()
+        
+        # 4. 세션 기억 생성 백그라운드 워커 시작
+        from app.services.memory_worker import memory_worker
+        memory_worker.start()
+        
+        # 5. 대화 저장 write-behind 버퍼 시작
+        from app.services.conversation_writer import conversation_writer
+        conversation_writer.start()
+        
+        # 6. 퀴즈 문제 은행 적재 (모든 세션이 공유)
+        from app.services.quiz_bank import quiz_bank
+        await quiz_bank.load()
+        
         print("✅ 서버가 성공적으로 시작되었습니다.")
         
     except Exception as e:
@@ -59,6 +75,24 @@ async def shutdown_event():
     except Exception as e:
         print(f"❌ 스케줄러 종료 중 오류 발생: {e}")
 
+    try:
+        from app.services.conversation_writer import conversation_writer
+        await conversation_writer.stop()
+    except Exception as e:
+        print(f"❌ 대화 저장 버퍼 종료 중 오류 발생: {e}")
+
+    try:
+        from app.services.memory_worker import memory_worker
+        await memory_worker.stop()
+    except Exception as e:
+        print(f"❌ 기억 생성 워커 종료 중 오류 발생: {e}")
+
+    try:
+        from app.services import ai_service
+        await ai_service.close_client()
+    except Exception as e:
+        print(f"❌ OpenAI 클라이언트 정리 중 오류 발생: {e}")
+
 # --- 기본 엔드포인트 ---
 @app.get("/", tags=["Root"])
 def read_root():
@@ -1,36 +1,114 @@
 # app/services/ai_service.py
 
 import openai
+import httpx
 import asyncio
 import json
 import os
+import re
 import base64
-import tempfile
 import traceback
+from typing import AsyncIterator
 
 from app.core.config import settings
+from app.core import metrics
 from . import vector_db_service
+from .embedding_cache import embedding_cache
+from .prompt_registry import prompt_registry
+from .intent_router import intent_router, INTENT_START_QUIZ, INTENT_STOP_QUIZ
 
 # OpenAI 클라이언트 초기화
-client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+# - async_client: 웹소켓 대화 경로에서 사용하는 비동기 클라이언트 (크기가 정해진 keep-alive 커넥션 풀)
+# - client: 이벤트 루프가 없는 배치 스크립트(리포트 생성 등)에서 사용하는 동기 클라이언트
+_http_timeout = httpx.Timeout(
+    settings.OPENAI_TIMEOUT_SECONDS,
+    connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS,
+    pool=settings.OPENAI_POOL_TIMEOUT_SECONDS,
+)
+async_client = openai.AsyncOpenAI(
+    api_key=settings.OPENAI_API_KEY,
+    max_retries=settings.OPENAI_MAX_RETRIES,
+    timeout=_http_timeout,
+    http_client=httpx.AsyncClient(
+        timeout=_http_timeout,
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    ),
+)
+client = openai.OpenAI(api_key=settings.OPENAI_API_KEY, timeout=_http_timeout, max_retries=settings.OPENAI_MAX_RETRIES)
+
+async def warmup_client():
+    """서버 시작 시 OpenAI API와의 연결(TCP/TLS)을 미리 열어 첫 대화의 지연을 줄입니다."""
+    results = await asyncio.gather(
+        *(async_client.models.list() for _ in range(max(settings.OPENAI_WARMUP_CONNECTIONS, 0))),
+        return_exceptions=True
+    )
+    failed = [r for r in results if isinstance(r, Exception)]
+    if failed:
+        print(f"⚠️ OpenAI 연결 예열 중 일부 실패 ({len(failed)}/{len(results)}): {failed[0]}")
+    else:
+        print(f"✅ OpenAI 연결 {len(results)}개 예열 완료")
+
+async def close_client():
+    """서버 종료 시 비동기 클라이언트의 커넥션 풀을 정리합니다."""
+    await async_client.close()
 
 # --- 1. Core AI Utilities ---
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+
 async def get_embedding(text: str) -> list[float]:
-    """텍스트를 받아 임베딩 벡터를 반환합니다."""
-    response = await asyncio.to_thread(
-        client.embeddings.create, input=text, model="text-embedding-3-small"
-    )
-    return response.data[0].embedding
+    """텍스트를 받아 임베딩 벡터를 반환합니다. (같은 문장은 캐시에서 바로 반환)"""
+    with metrics.timed("embedding"):
+        if settings.EMBEDDING_CACHE_ENABLED:
+            cached = await embedding_cache.get(EMBEDDING_MODEL, text)
+            if cached is not None:
+                return cached
+
+        response = await async_client.embeddings.create(input=text, model=EMBEDDING_MODEL)
+        embedding = response.data[0].embedding
+
+        if settings.EMBEDDING_CACHE_ENABLED:
+            await embedding_cache.put(EMBEDDING_MODEL, text, embedding)
+        return embedding
 
-async def get_transcript_from_audio(audio_file_path: str) -> str:
-    """오디오 파일 경로를 받아 STT(Speech-to-Text) 결과를 반환합니다."""
-    with open(audio_file_path, "rb") as audio_file:
-        transcript_response = await asyncio.to_thread(
-            client.audio.transcriptions.create, model="whisper-1", file=audio_file, language="ko"
+# 이 크기 이상의 base64 문자열은 이벤트 루프를 막지 않도록 스레드에서 디코딩합니다.
+BASE64_OFFLOAD_THRESHOLD = 64 * 1024
+
+async def decode_audio_base64(audio_base64: str) -> bytes:
+    """base64 오디오 문자열을 bytes로 디코딩합니다. (큰 클립은 스레드에서 처리)"""
+    with metrics.timed("decode"):
+        if len(audio_base64) < BASE64_OFFLOAD_THRESHOLD:
+            return base64.b64decode(audio_base64)
+        return await asyncio.to_thread(base64.b64decode, audio_base64)
+
+async def get_transcript_from_audio(audio_data: bytes | bytearray | memoryview, filename: str = "audio.wav") -> str:
+    """
+    메모리에 있는 오디오 데이터를 받아 STT(Speech-to-Text) 결과를 반환합니다.
+    임시 파일을 만들지 않고 (파일명, 바이트) 형태로 STT 클라이언트에 바로 전달합니다.
+    """
+    if not isinstance(audio_data, bytes):
+        audio_data = bytes(audio_data)
+    with metrics.timed("stt"):
+        transcript_response = await async_client.audio.transcriptions.create(
+            model="whisper-1", file=(filename, audio_data), language="ko"
         )
     return transcript_response.text
 
+def _build_chat_messages(prompt: str | None, messages: list[dict] | None) -> list[dict]:
+    """프롬프트 문자열 또는 메시지 리스트를 Chat API용 메시지 리스트로 변환합니다."""
+    if messages is not None:
+        return messages
+    if prompt is None:
+        raise ValueError("prompt 또는 messages 중 하나는 반드시 제공되어야 합니다.")
+    return [
+        {"role": "system", "content": "당신은 주어진 규칙과 페르소나를 완벽하게 따르는 AI 어시스턴트입니다."},
+        {"role": "user", "content": prompt}
+    ]
+
 async def get_ai_chat_completion(
     prompt: str = None, 
     messages: list[dict] = None, 
@@ -39,62 +117,102 @@ async def get_ai_chat_completion(
     temperature: float = 0.7
 ) -> str:
     """주어진 프롬프트나 메시지 리스트에 대한 AI 챗봇의 응답을 반환합니다."""
-    if messages is None:
-        if prompt is None:
-            raise ValueError("prompt 또는 messages 중 하나는 반드시 제공되어야 합니다.")
-        messages = [
-            {"role": "system", "content": "당신은 주어진 규칙과 페르소나를 완벽하게 따르는 AI 어시스턴트입니다."},
-            {"role": "user", "content": prompt}
-        ]
-    chat_response = await asyncio.to_thread(
-        client.chat.completions.create,
-        model=model, messages=messages, max_tokens=max_tokens, temperature=temperature
-    )
+    messages = _build_chat_messages(prompt, messages)
+    with metrics.timed("llm"):
+        chat_response = await async_client.chat.completions.create(
+            model=model, messages=messages, max_tokens=max_tokens, temperature=temperature
+        )
     return chat_response.choices[0].message.content
 
+async def stream_ai_chat_completion(
+    prompt: str = None, 
+    messages: list[dict] = None, 
+    model: str = "gpt-4o", 
+    max_tokens: int = 150, 
+    temperature: float = 0.7
+) -> AsyncIterator[str]:
+    """get_ai_chat_completion의 스트리밍 버전입니다. 생성되는 토큰 조각을 순서대로 yield합니다."""
+    messages = _build_chat_messages(prompt, messages)
+    # llm_first_token: 스트림 응답이 열릴 때까지, llm: 스트림 종료까지 (소비자 쪽 전송 시간 포함)
+    with metrics.timed("llm"):
+        with metrics.timed("llm_first_token"):
+            stream = await async_client.chat.completions.create(
+                model=model, messages=messages, max_tokens=max_tokens, temperature=temperature, stream=True
+            )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
 # --- 2. Main Conversation Logic ---
 
-def _load_prompt_config(filename: str, key: str):
-    """settings에 정의된 경로에서 프롬프트 파일을 안전하게 읽어옵니다."""
-    prompt_file_path = os.path.join(settings.PROMPTS_DIR, filename)
+async def _build_chat_prompt(user_id: str, user_message: str, memory_snapshot=None) -> str | None:
+    """과거 기억을 검색하여 일반 대화용 최종 프롬프트를 만듭니다. 프롬프트 설정이 없으면 None을 반환합니다."""
+    chat_prefix = prompt_registry.chat_prefix()
+    if not chat_prefix:
+        return None
+
+    relevant_memories = await vector_db_service.search_memories(user_id, user_message, snapshot=memory_snapshot)
+    return f"""{chat_prefix}--- 과거 대화 핵심 기억 ---\n{relevant_memories if relevant_memories else "이전 대화 기록이 없습니다."}\n--------------------\n현재 사용자 메시지: "{user_message}"\nAI 답변:"""
+
+async def generate_chat_reply(user_id: str, user_message: str, memory_snapshot=None) -> str:
+    """
+    이미 변환된 사용자 발화(텍스트)를 받아 AI의 일반 대화 응답을 생성합니다.
+    memory_snapshot: 세션에 미리 불러온 기억 후보 (vector_db_service.prefetch_memories 결과)
+    """
     try:
-        with open(prompt_file_path, 'r', encoding='utf-8') as f:
-            print(f"✅ 프롬프트 로드 성공: {prompt_file_path}")
-            return json.load(f).get(key)
+        final_prompt = await _build_chat_prompt(user_id, user_message, memory_snapshot)
+        if final_prompt is None:
+            return "대화 프롬프트 설정 파일을 불러올 수 없습니다."
+        return await get_ai_chat_completion(prompt=final_prompt)
     except Exception as e:
-        print(f"❌ 프롬프트 로드 실패 ({prompt_file_path}): {e}")
-        return None
+        print(f"❌ AI 대화 응답 생성 오류: {str(e)}\n{traceback.format_exc()}")
+        return "죄송합니다. 답변을 만드는 중에 문제가 발생했어요."
 
-PROMPTS_CONFIG = _load_prompt_config('talk_prompts.json', 'main_chat_prompt')
+async def stream_chat_reply(user_id: str, user_message: str, memory_snapshot=None) -> AsyncIterator[str]:
+    """generate_chat_reply의 스트리밍 버전입니다. 응답을 토큰 조각 단위로 yield합니다."""
+    has_output = False
+    try:
+        final_prompt = await _build_chat_prompt(user_id, user_message, memory_snapshot)
+        if final_prompt is None:
+            yield "대화 프롬프트 설정 파일을 불러올 수 없습니다."
+            return
+        async for token in stream_ai_chat_completion(prompt=final_prompt):
+            has_output = True
+            yield token
+    except Exception as e:
+        print(f"❌ AI 대화 스트리밍 오류: {str(e)}\n{traceback.format_exc()}")
+        if not has_output:
+            yield "죄송합니다. 답변을 만드는 중에 문제가 발생했어요."
+
+async def generate_light_reply(user_message: str, recent_log: list[str]) -> str:
+    """
+    짧은 맞장구처럼 기억 검색이 필요 없는 발화에, 최근 세션 대화만 보고 작은 모델로 답합니다.
+    실패하면 기본 대화 경로와 같은 오류 문구를 반환합니다.
+    """
+    chat_prefix = prompt_registry.chat_prefix()
+    if not chat_prefix:
+        return "대화 프롬프트 설정 파일을 불러올 수 없습니다."
+    recent_conversation = "\n".join(recent_log) if recent_log else "(없음)"
+    prompt = f"""{chat_prefix}--- 방금까지의 대화 ---\n{recent_conversation}\n--------------------\n현재 사용자 메시지: "{user_message}"\nAI 답변:"""
+    try:
+        return await get_ai_chat_completion(prompt=prompt, model=settings.INTENT_FAST_MODEL, max_tokens=80)
+    except Exception as e:
+        print(f"❌ AI 짧은 응답 생성 오류: {e}")
+        return "죄송합니다. 답변을 만드는 중에 문제가 발생했어요."
 
 async def process_user_audio(user_id: str, audio_base64: str) -> tuple[str | None, str]:
-    """사용자의 음성 데이터를 처리하고 AI의 일반 대화 응답을 생성합니다."""
+    """
+    사용자의 음성 데이터를 STT로 변환한 뒤 generate_chat_reply로 응답을 생성합니다.
+    (이미 텍스트가 있는 경우에는 generate_chat_reply를 직접 호출하세요.)
+    """
     try:
-        audio_data = base64.b64decode(audio_base64)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
-            temp_audio.write(audio_data)
-            temp_audio_path = temp_audio.name
-
-        try:
-            user_message = await get_transcript_from_audio(temp_audio_path)
-            if not user_message.strip() or "시청해주셔서 감사합니다" in user_message:
-                return None, "음, 잘 알아듣지 못했어요. 혹시 다시 한번 말씀해주시겠어요?"
-
-            relevant_memories = await vector_db_service.search_memories(user_id, user_message)
-
-            if not PROMPTS_CONFIG:
-                return user_message, "대화 프롬프트 설정 파일을 불러올 수 없습니다."
-
-            system_message = "\n".join(PROMPTS_CONFIG['system_message_base'])
-            examples_text = "\n\n".join([f"상황: {ex['situation']}\n사용자 입력: {ex['user_input']}\nAI 응답: {ex['ai_response']}" for ex in PROMPTS_CONFIG['examples']])
-            
-            final_prompt = f"""# 페르소나\n{system_message}\n# 핵심 대화 규칙\n{"\n".join(PROMPTS_CONFIG['core_conversation_rules'])}\n# 응답 가이드라인\n{"\n".join(PROMPTS_CONFIG['guidelines_and_reactions'])}\n# 절대 금지사항\n{"\n".join(PROMPTS_CONFIG['strict_prohibitions'])}\n# 성공적인 대화 예시\n{examples_text}\n---\n이제 실제 대화를 시작합니다.\n--- 과거 대화 핵심 기억 ---\n{relevant_memories if relevant_memories else "이전 대화 기록이 없습니다."}\n--------------------\n현재 사용자 메시지: "{user_message}"\nAI 답변:"""
-            
-            ai_response = await get_ai_chat_completion(prompt=final_prompt)
-            return user_message, ai_response
-        finally:
-            os.unlink(temp_audio_path)
-            
+        audio_data = await decode_audio_base64(audio_base64)
+        user_message = await get_transcript_from_audio(audio_data)
+        if intent_router.is_stt_noise(user_message):
+            return None, "음, 잘 알아듣지 못했어요. 혹시 다시 한번 말씀해주시겠어요?"
+
+        ai_response = await generate_chat_reply(user_id, user_message)
+        return user_message, ai_response
     except Exception as e:
         print(f"❌ AI 서비스 전체 오류: {str(e)}\n{traceback.format_exc()}")
         return None, "죄송합니다. 음성 처리 중 문제가 발생했어요."
@@ -102,21 +220,21 @@ async def process_user_audio(user_id: str, audio_base64: str) -> tuple[str | Non
 # --- 3. Quiz & Command Logic ---
 
 async def check_quiz_command(user_input_text: str) -> dict | None:
-    """사용자 입력에서 '문제 시작/종료' 명령어를 감지합니다."""
-    user_message_lower = user_input_text.lower()
-    start_keywords = ["문제", "퀴즈"]
-    action_keywords = ["풀래", "내줘", "시작", "줘봐"]
-    stop_keywords = ["그만", "종료", "안할래"]
-
-    if any(kw in user_message_lower for kw in start_keywords):
-        if any(act in user_message_lower for act in action_keywords):
-            return {"type": "command", "action": "start_quiz", "response_text": "네, 좋습니다! 그럼 지금부터 재미있는 문제를 시작해볼까요?"}
-        if any(act in user_message_lower for act in stop_keywords):
-            return {"type": "command", "action": "stop_quiz", "response_text": "네, 알겠습니다. 문제는 여기까지 할게요."}
+    """사용자 입력에서 '문제 시작/종료' 명령어를 감지합니다. (intent_router의 규칙 표 사용)"""
+    intent = intent_router.classify(user_input_text)
+    if intent == INTENT_START_QUIZ:
+        return {"type": "command", "action": "start_quiz", "response_text": "네, 좋습니다! 그럼 지금부터 재미있는 문제를 시작해볼까요?"}
+    if intent == INTENT_STOP_QUIZ:
+        return {"type": "command", "action": "stop_quiz", "response_text": "네, 알겠습니다. 문제는 여기까지 할게요."}
     return None
 
-async def get_quiz_feedback(question: str, user_answer: str, correct_answer: str) -> tuple[str, bool]:
-    """LLM을 통해 퀴즈 답변을 채점하고 피드백을 생성합니다."""
+QUIZ_VERDICT_PATTERN = re.compile(r"\b(?:TRUE|FALSE)\b", re.IGNORECASE)
+
+async def get_quiz_feedback(question: str, user_answer: str, correct_answer: str, raise_on_error: bool = False) -> tuple[str, bool]:
+    """
+    LLM을 통해 퀴즈 답변을 채점하고 피드백을 생성합니다.
+    raise_on_error가 True이면 LLM 오류 시 대체 판정 대신 예외를 그대로 올립니다. (quiz_grader가 대체 판정을 기억하지 않도록)
+    """
     prompt_messages = [
         {"role": "system", "content": "당신은 어르신에게 문제 정답 여부를 판단하고 따뜻한 피드백을 제공하는 친절한 AI 말벗입니다. 사용자의 답변이 정답인지 아닌지 명확하게 판단하여 알려주세요. 추가 질문이나 대화 유도는 절대 하지 마세요. 정답이라면 칭찬과 함께 답변 마지막에 'TRUE'를, 오답이라면 정답을 알려주고 격려하며 'FALSE'를 반드시 포함해주세요. 예시: '정답이에요! 정말 잘하셨어요! TRUE', '아쉽지만 틀렸어요. 정답은 OO였답니다. FALSE'"},
         {"role": "user", "content": f"문제: {question}\n어르신 답변: {user_answer}\n정답: {correct_answer}"}
@@ -124,9 +242,12 @@ async def get_quiz_feedback(question: str, user_answer: str, correct_answer: str
     try:
         raw_llm_response = await get_ai_chat_completion(messages=prompt_messages, max_tokens=100, temperature=0.5)
         is_correct = "TRUE" in raw_llm_response.upper()
-        feedback_text = raw_llm_response.upper().replace("TRUE", "").replace("FALSE", "").strip()
+        # 판정 표시만 지우고 한국어 피드백은 그대로 둡니다.
+        feedback_text = QUIZ_VERDICT_PATTERN.sub("", raw_llm_response).strip()
         return feedback_text, is_correct
     except Exception as e:
+        if raise_on_error:
+            raise
         print(f"❌ LLM 퀴즈 피드백 생성 오류: {e}")
         if str(correct_answer).lower() in str(user_answer).lower():
             return "정답이에요! 정말 대단하세요!", True
@@ -135,29 +256,56 @@ async def get_quiz_feedback(question: str, user_answer: str, correct_answer: str
 
 # --- 4. Report Generation Logic ---
 
-def generate_summary_report(conversation_text: str) -> dict | None:
-    """대화 내용을 분석하여 JSON 형식의 리포트를 생성합니다."""
-    report_prompt_template = _load_prompt_config('report_prompts.json', 'report_analysis_prompt')
-    if not conversation_text or not report_prompt_template:
+REPORT_MODEL = "gpt-4o"
+
+def build_report_messages(conversation_text: str, from_digest: bool = False) -> list[dict] | None:
+    """
+    리포트 분석 요청 메시지를 만듭니다. 대화 내용이나 프롬프트가 없으면 None을 반환합니다.
+    from_digest가 True이면 conversation_text는 대화 원문이 아니라 하루 누적 요약입니다.
+    """
+    system_prompt = prompt_registry.report_system_prompt()
+    if not conversation_text or not system_prompt:
         return None
 
-    persona = report_prompt_template.get('persona', '당신은 전문 대화 분석 AI입니다.')
-    instructions = "\n".join(report_prompt_template.get('instructions', []))
-    output_format_example = json.dumps(report_prompt_template.get('OUTPUT_FORMAT', {}), ensure_ascii=False, indent=2)
+    if from_digest:
+        user_prompt = f"### 분석할 오늘 대화의 누적 요약 (대화 원문 대신 제공됨)\n---\n{conversation_text}\n---"
+    else:
+        user_prompt = f"### 분석할 대화 전문\n---\n{conversation_text}\n---"
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
 
-    system_prompt = f"{persona}\n\n### 지시사항\n{instructions}\n\n### 출력 형식\n모든 결과는 아래와 같은 JSON 형식으로만 출력해야 합니다. JSON 외의 텍스트는 절대 포함하지 마세요.\n{output_format_example}"
-    user_prompt = f"### 분석할 대화 전문\n---\n{conversation_text}\n---"
+def generate_summary_report(conversation_text: str) -> dict | None:
+    """대화 내용을 분석하여 JSON 형식의 리포트를 생성합니다."""
+    messages = build_report_messages(conversation_text)
+    if messages is None:
+        return None
     
     try:
         completion = client.chat.completions.create(
-            model="gpt-4o",
+            model=REPORT_MODEL,
             response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
+            messages=messages
         )
         return json.loads(completion.choices[0].message.content)
     except Exception as e:
         print(f"AI 리포트 생성 중 오류 발생: {e}")
-        return None
\ No newline at end of file
+        return None
+
+async def generate_summary_report_async(conversation_text: str, from_digest: bool = False) -> dict | None:
+    """generate_summary_report의 비동기 버전입니다. (여러 사용자의 리포트를 동시에 생성할 때 사용)"""
+    messages = build_report_messages(conversation_text, from_digest)
+    if messages is None:
+        return None
+
+    try:
+        completion = await async_client.chat.completions.create(
+            model=REPORT_MODEL,
+            response_format={"type": "json_object"},
+            messages=messages
+        )
+        return json.loads(completion.choices[0].message.content)
+    except Exception as e:
+        print(f"AI 리포트 생성 중 오류 발생: {e}")
+        return None
@@ -0,0 +1,100 @@
+# app/services/audio_stream.py
+# 어르신 앱 웹소켓의 바이너리(청크) 오디오 프로토콜을 해석하고 조립하는 모듈
+
+import struct
+
+# --- 프로토콜 정의 (v1) ---
+# 모든 바이너리 프레임은 6바이트 헤더로 시작합니다.
+#   [0]    버전 (1바이트, 현재 1)
+#   [1]    메시지 종류 (1바이트, START / CHUNK / END)
+#   [2:6]  값 (4바이트, big-endian 부호 없는 정수)
+#            START: 전체 오디오 바이트 수 (모르면 0)
+#            CHUNK: 이 청크가 들어갈 오프셋
+#            END  : 클라이언트가 보낸 전체 바이트 수
+# CHUNK 프레임은 헤더 뒤에 가공하지 않은 오디오 바이트가 이어집니다.
+PROTOCOL_VERSION = 1
+MSG_START = 0x01
+MSG_CHUNK = 0x02
+MSG_END = 0x03
+
+HEADER = struct.Struct("!BBI")
+MAX_AUDIO_BYTES = 10 * 1024 * 1024   # 한 발화의 최대 크기 (10MB)
+DEFAULT_BUFFER_BYTES = 256 * 1024    # START에 크기가 없을 때의 초기 버퍼 크기
+
+
+class AudioProtocolError(ValueError):
+    """바이너리 오디오 프레임이 프로토콜에 맞지 않을 때 발생합니다."""
+
+
+class AudioStreamAssembler:
+    """
+    START / CHUNK / END 프레임을 받아 하나의 발화 오디오로 조립합니다.
+    START에서 받은 크기만큼 버퍼를 미리 할당하고, 청크는 복사 한 번으로 채워 넣습니다.
+    """
+    def __init__(self):
+        self._buffer: bytearray | None = None
+        self._received = 0
+
+    @property
+    def is_receiving(self) -> bool:
+        return self._buffer is not None
+
+    def reset(self):
+        self._buffer = None
+        self._received = 0
+
+    def feed(self, frame: bytes) -> memoryview | None:
+        """
+        프레임 하나를 처리합니다.
+        END 프레임으로 발화가 완성되면 조립된 오디오의 memoryview를, 아니면 None을 반환합니다.
+        """
+        if len(frame) < HEADER.size:
+            raise AudioProtocolError("프레임이 헤더보다 짧습니다.")
+
+        version, msg_type, value = HEADER.unpack_from(frame)
+        if version != PROTOCOL_VERSION:
+            raise AudioProtocolError(f"지원하지 않는 프로토콜 버전입니다: {version}")
+
+        if msg_type == MSG_START:
+            self._start(value)
+            return None
+        if msg_type == MSG_CHUNK:
+            self._write_chunk(value, memoryview(frame)[HEADER.size:])
+            return None
+        if msg_type == MSG_END:
+            return self._finish(value)
+        raise AudioProtocolError(f"알 수 없는 메시지 종류입니다: {msg_type}")
+
+    def _start(self, total_size: int):
+        if total_size > MAX_AUDIO_BYTES:
+            raise AudioProtocolError(f"오디오 크기가 너무 큽니다: {total_size} bytes")
+        self._buffer = bytearray(total_size or DEFAULT_BUFFER_BYTES)
+        self._received = 0
+
+    def _write_chunk(self, offset: int, payload: memoryview):
+        if self._buffer is None:
+            raise AudioProtocolError("START 없이 CHUNK가 도착했습니다.")
+        if offset != self._received:
+            raise AudioProtocolError(f"청크 순서가 맞지 않습니다. (예상 {self._received}, 수신 {offset})")
+
+        end = offset + len(payload)
+        if end > MAX_AUDIO_BYTES:
+            raise AudioProtocolError(f"오디오 크기가 너무 큽니다: {end} bytes")
+        if end > len(self._buffer):
+            # START에 적힌 크기보다 많이 오면 버퍼를 두 배씩 늘립니다.
+            self._buffer.extend(bytes(max(end, len(self._buffer) * 2) - len(self._buffer)))
+
+        self._buffer[offset:end] = payload
+        self._received = end
+
+    def _finish(self, total_sent: int) -> memoryview:
+        if self._buffer is None:
+            raise AudioProtocolError("START 없이 END가 도착했습니다.")
+        if total_sent != self._received:
+            received = self._received
+            self.reset()
+            raise AudioProtocolError(f"수신한 크기가 맞지 않습니다. (전송 {total_sent}, 수신 {received})")
+
+        audio = memoryview(self._buffer)[:self._received]
+        self.reset()
+        return audio
@@ -2,8 +2,15 @@
 # 웹소켓 연결을 중앙에서 관리하는 독립 모듈
 
 import json
+import re
+from typing import AsyncIterator
 from fastapi import WebSocket
 
+from app.core import metrics
+
+# 문장 끝으로 볼 위치: 마침표/물음표/느낌표/줄임표/줄바꿈 뒤 (닫는 따옴표·괄호 포함)
+SENTENCE_END_PATTERN = re.compile(r'[.!?。…~\n]+["\'”’)\]]*\s*')
+
 class ConnectionManager:
     """활성 WebSocket 연결을 관리하는 중앙 관리자 클래스"""
     def __init__(self):
@@ -20,7 +27,31 @@ class ConnectionManager:
     async def send_json(self, data: dict, user_id: str):
         if user_id in self.active_connections:
             websocket = self.active_connections[user_id]
-            await websocket.send_text(json.dumps(data, ensure_ascii=False))
+            with metrics.timed("send"):
+                await websocket.send_text(json.dumps(data, ensure_ascii=False))
+
+    async def stream_text(self, tokens: AsyncIterator[str], user_id: str) -> str:
+        """
+        토큰 스트림을 받아 문장이 끝날 때마다 'ai_message_delta' 프레임으로 전송하고,
+        마지막에 전체 문장을 담은 'ai_message_done' 프레임을 보냅니다. 전체 응답 문자열을 반환합니다.
+        """
+        full_text = []
+        pending = ""
+        async for token in tokens:
+            full_text.append(token)
+            pending += token
+            flush_upto = 0
+            for match in SENTENCE_END_PATTERN.finditer(pending):
+                flush_upto = match.end()
+            if flush_upto:
+                await self.send_json({"type": "ai_message_delta", "content": pending[:flush_upto]}, user_id)
+                pending = pending[flush_upto:]
+        if pending:
+            await self.send_json({"type": "ai_message_delta", "content": pending}, user_id)
+
+        response_text = "".join(full_text)
+        await self.send_json({"type": "ai_message_done", "content": response_text}, user_id)
+        return response_text
 
 # 다른 모든 파일에서 이 인스턴스를 공유하여 사용합니다.
 manager = ConnectionManager()
\ No newline at end of file
@@ -0,0 +1,153 @@
+# app/services/conversation_writer.py
+# 대화 저장을 턴 처리 경로에서 떼어내, 모든 웹소켓의 메시지를 모아 한 번에 INSERT하는 write-behind 버퍼
+
+import asyncio
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+
+from app.core import metrics
+from app.core.config import settings
+from app.db import async_crud
+from app.db.database import AsyncSessionLocal
+
+
+class ConversationWriteBuffer:
+    """
+    (user_id_str, speaker, message, created_at) 행을 메모리에 모았다가
+    개수(batch_size)나 시간(flush_interval) 기준에 도달하면 사용자 조회 1번 + multi-row INSERT 1번 + commit 1번으로 저장합니다.
+    flush가 실패하면 행을 버퍼 앞쪽에 되돌려 다음 flush에서 다시 시도하고, 오류는 stats()와 로그로 드러냅니다.
+    created_at은 add_turn 시점에 정해 그대로 넣으므로, 자정을 넘겨 다시 시도한 행도 대화한 날짜로 저장됩니다.
+    """
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int, max_cached_users: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_cached_users = max_cached_users
+
+        self._pending: list[tuple[str, str, str, datetime]] = []
+        self._user_ids: OrderedDict[str, int] = OrderedDict()
+        self._flusher: asyncio.Task | None = None
+        self._flush_lock: asyncio.Lock | None = None
+        self._size_flush: asyncio.Task | None = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.flush_errors = 0
+        self.last_error: str | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._flusher is not None
+
+    def start(self):
+        """주기적 flush 태스크를 시작합니다. (이벤트 루프 안에서 호출)"""
+        if self.is_running:
+            return
+        self._flush_lock = asyncio.Lock()
+        self._flusher = asyncio.create_task(self._flush_loop())
+        print(f"🚀 대화 저장 버퍼 시작 (배치 {self.batch_size}행, 주기 {self.flush_interval}초)")
+
+    async def stop(self):
+        """주기적 flush를 멈추고 남은 행을 모두 저장합니다. 저장하지 못한 행이 있으면 오류 로그를 남깁니다."""
+        if not self.is_running:
+            return
+        self._flusher.cancel()
+        await asyncio.gather(self._flusher, return_exceptions=True)
+        self._flusher = None
+        await self.flush()
+        if self._pending:
+            print(f"❌ 종료 시점에 대화 {len(self._pending)}행을 저장하지 못했습니다. (마지막 오류: {self.last_error})")
+        print("⏹️ 대화 저장 버퍼 종료")
+
+    def add_turn(self, user_id: str, user_message: str, ai_message: str) -> datetime:
+        """한 턴(사용자 발화 + AI 응답)을 버퍼에 넣고, 두 행에 기록할 시각(created_at)을 반환합니다."""
+        if not self.is_running:
+            self.start()
+        now = datetime.now()
+        self._append([(user_id, 'user', user_message, now), (user_id, 'ai', ai_message, now)])
+        if len(self._pending) >= self.batch_size and (self._size_flush is None or self._size_flush.done()):
+            self._size_flush = asyncio.create_task(self.flush())
+        return now
+
+    async def flush(self):
+        """버퍼에 쌓인 행을 한 트랜잭션으로 저장합니다."""
+        if not self._pending:
+            return
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                with metrics.timed("db_flush"):
+                    await self._write(batch)
+                self.written += len(batch)
+            except Exception as e:
+                self.flush_errors += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"❌ 대화 {len(batch)}행 일괄 저장 실패, 다음 flush에서 다시 시도합니다: {e}\n{traceback.format_exc()}")
+                self._pending = batch + self._pending
+                self._trim()
+
+    def stats(self) -> dict:
+        return {
+            "pending_rows": len(self._pending),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flush_errors": self.flush_errors,
+            "last_error": self.last_error,
+        }
+
+    # --- Internal ---
+
+    def _append(self, rows: list[tuple]):
+        self._pending.extend(rows)
+        self.enqueued += len(rows)
+        self._trim()
+
+    def _trim(self):
+        """DB 장애가 길어져도 메모리가 무한히 늘지 않도록 가장 오래된 행부터 버립니다."""
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+            print(f"⚠️ 대화 저장 버퍼가 가득 차서 오래된 {overflow}행을 버렸습니다.")
+
+    async def _write(self, batch: list[tuple[str, str, str, datetime]]):
+        async with AsyncSessionLocal() as db:
+            user_ids: dict[str, int] = {}
+            for user_id, *_ in batch:
+                if user_id not in user_ids and user_id in self._user_ids:
+                    self._user_ids.move_to_end(user_id)
+                    user_ids[user_id] = self._user_ids[user_id]
+            unknown = {user_id for user_id, *_ in batch} - user_ids.keys()
+            if unknown:
+                found = await async_crud.get_or_create_user_ids(db, unknown)
+                user_ids.update(found)
+                self._remember_user_ids(found)
+            await async_crud.bulk_insert_conversations(db, [
+                {"user_id": user_ids[user_id], "speaker": speaker, "message": message, "created_at": created_at}
+                for user_id, speaker, message, created_at in batch
+            ])
+            await db.commit()
+
+    def _remember_user_ids(self, user_ids: dict[str, int]):
+        self._user_ids.update(user_ids)
+        while len(self._user_ids) > self.max_cached_users:
+            self._user_ids.popitem(last=False)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+# 서버 전체에서 공유하는 버퍼 인스턴스
+conversation_writer = ConversationWriteBuffer(
+    batch_size=settings.CONVERSATION_WRITE_BATCH_SIZE,
+    flush_interval=settings.CONVERSATION_WRITE_FLUSH_SECONDS,
+    max_pending=settings.CONVERSATION_WRITE_MAX_PENDING,
+    max_cached_users=settings.CONVERSATION_WRITE_USER_CACHE_SIZE,
+)
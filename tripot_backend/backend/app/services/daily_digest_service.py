@@ -0,0 +1,120 @@
+# app/services/daily_digest_service.py
+# 사용자별 하루 누적 요약(daily_digests)을 세션이 끝날 때마다 새 발화만 접어 넣어 갱신하는 서비스
+# 야간 리포트는 하루치 대화 원문 대신 이 요약에서 시작하고, 가족은 당일 요약을 바로 볼 수 있습니다.
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+
+from app.core.config import settings
+from app.db import async_crud
+from app.db.database import AsyncSessionLocal
+from app.services import ai_service
+from app.services.vector_db_service import USER_LINE_PREFIX
+
+DIGEST_SYSTEM_MESSAGE = """
+당신은 어르신과 AI의 하루 대화를 누적 요약하는 AI입니다.
+'지금까지의 요약'에 '새 대화'의 내용을 합쳐, 오늘 하루 전체에 대한 하나의 요약으로 다시 작성하세요.
+규칙:
+- 대화에 나온 사실만 사용하고 추측하지 마세요.
+- 활동, 식사, 수면, 약 복용, 건강/몸 상태, 감정, 필요하다고 말한 물품은 빠짐없이 남기세요.
+- 지명, 인명, 병원, 약 이름 등 모든 고유명사는 반드시 포함하세요.
+- 기존 요약의 내용은 새 대화와 충돌하지 않는 한 지우지 마세요.
+- 존댓말 서술형으로, 대화 형식이 아닌 요약문만 출력하세요.
+"""
+
+# 같은 사용자의 세션이 동시에 끝났을 때 요약 갱신이 서로 덮어쓰지 않도록 사용자별로 직렬화합니다.
+# user_id -> [잠금, 잠금을 쓰거나 기다리는 작업 수]. 마지막 작업이 끝나면 항목을 지워 사용자 수만큼 쌓이지 않게 합니다.
+_user_locks: dict[str, list] = {}
+
+
+def count_user_turns(session_log: list[str]) -> int:
+    return sum(1 for line in session_log if line.startswith(USER_LINE_PREFIX))
+
+
+def split_by_date(session_log: list[str], log_dates: list[date]) -> list[tuple[date, list[str]]]:
+    """세션 로그를 줄마다 기록된 날짜로 나눕니다. (자정을 넘긴 세션은 날짜별 조각 여러 개가 됩니다.)"""
+    parts: list[tuple[date, list[str]]] = []
+    for line, line_date in zip(session_log, log_dates):
+        if not parts or parts[-1][0] != line_date:
+            parts.append((line_date, []))
+        parts[-1][1].append(line)
+    return parts
+
+
+async def fold_session_by_date(user_id: str, session_log: list[str], log_dates: list[date]) -> int:
+    """세션 로그를 발화가 있었던 날짜별로 나눠 각 날짜의 누적 요약에 반영하고, 갱신한 요약 수를 반환합니다."""
+    updated = 0
+    for digest_date, lines in split_by_date(session_log, log_dates):
+        if await fold_session(user_id, lines, digest_date):
+            updated += 1
+    return updated
+
+
+async def fold_session(user_id: str, session_log: list[str], digest_date: date) -> bool:
+    """
+    세션 로그의 새 발화를 digest_date의 누적 요약에 반영합니다. 반영할 발화가 없으면 False를 반환합니다.
+    digest_date는 워커가 실행된 날이 아니라 발화가 있었던 날이어야 합니다. (fold_session_by_date 참고)
+    """
+    if not settings.DAILY_DIGEST_ENABLED:
+        return False
+    new_user_turns = count_user_turns(session_log)
+    if not new_user_turns:
+        return False
+
+    async with _user_lock(user_id):
+        async with AsyncSessionLocal() as db:
+            user = await async_crud.get_or_create_user(db, user_id)
+            digest = await async_crud.get_daily_digest(db, user.id, digest_date)
+        previous_text = digest.digest_text if digest else ""
+
+        # LLM 호출 동안에는 DB 연결을 잡고 있지 않습니다.
+        digest_text = await ai_service.get_ai_chat_completion(
+            messages=_build_fold_messages(previous_text, session_log),
+            max_tokens=settings.DAILY_DIGEST_MAX_TOKENS,
+            temperature=0.3
+        )
+
+        async with AsyncSessionLocal() as db:
+            await async_crud.save_daily_digest(db, user.id, digest_date, digest_text, new_user_turns)
+    print(f"🗒️ [{user_id}] 님의 {digest_date} 누적 요약을 갱신했습니다. (새 발화 {new_user_turns}개)")
+    return True
+
+
+async def get_covering_digest(db, user_id_str: str, target_date: date) -> str | None:
+    """
+    그날 저장된 사용자 발화가 모두, 그리고 그것만 반영된 누적 요약이 있으면 그 텍스트를, 없으면 None을 반환합니다.
+    (세션 처리 실패 등으로 빠지거나 더 들어간 발화가 있으면 야간 리포트는 대화 원문을 사용해야 합니다.)
+    """
+    user = await async_crud.get_user_by_user_id_str(db, user_id_str)
+    if user is None:
+        return None
+    digest = await async_crud.get_daily_digest(db, user.id, target_date)
+    if digest is not None and digest.user_turn_count == await async_crud.count_user_turns_on_date(db, user.id, target_date):
+        return digest.digest_text
+    return None
+
+
+@asynccontextmanager
+async def _user_lock(user_id: str):
+    entry = _user_locks.setdefault(user_id, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _user_locks[user_id]
+
+
+def _build_fold_messages(previous_text: str, session_log: list[str]) -> list[dict]:
+    new_conversation = "\n".join(session_log)
+    user_message = (
+        f"--- 지금까지의 요약 ---\n{previous_text or '(아직 없음)'}\n"
+        f"--- 새 대화 ---\n{new_conversation}\n-----------------\n\n오늘 하루 누적 요약:"
+    )
+    return [
+        {"role": "system", "content": DIGEST_SYSTEM_MESSAGE},
+        {"role": "user", "content": user_message}
+    ]
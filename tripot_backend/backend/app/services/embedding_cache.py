@@ -0,0 +1,157 @@
+# app/services/embedding_cache.py
+# 임베딩 결과를 (프로세스 내 LRU -> 로컬 SQLite) 2단계로 캐싱하는 모듈
+
+import os
+import re
+import time
+import array
+import sqlite3
+import asyncio
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from app.core.config import settings
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,!?~…。"
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키를 만들기 위해 텍스트를 정규화합니다. (유니코드 NFC, 공백 정리, 소문자, 앞뒤 문장부호 제거)"""
+    text = unicodedata.normalize("NFC", text)
+    text = _WHITESPACE.sub(" ", text).strip(_EDGE_PUNCTUATION)
+    return text.lower()
+
+
+def make_key(model: str, text: str) -> str:
+    """모델명과 정규화된 텍스트로 캐시 키(sha256)를 만듭니다."""
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    임베딩 벡터 캐시입니다.
+    1단계는 프로세스 메모리의 LRU, 2단계는 서버 재시작 후에도 유지되는 로컬 SQLite 파일입니다.
+    벡터는 float32 바이트로 저장하며, SQLite는 행 수가 한도를 넘으면 오래 쓰지 않은 항목부터 지웁니다.
+    """
+    def __init__(self, db_path: str | None, max_memory_items: int, max_db_items: int):
+        self.max_memory_items = max_memory_items
+        self.max_db_items = max_db_items
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._disk_items = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+                self._conn = sqlite3.connect(db_path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    " key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+                self._conn.commit()
+                (self._disk_items,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            except Exception as e:
+                print(f"❌ 임베딩 캐시 DB 초기화 실패 ({db_path}): {e}. 메모리 캐시만 사용합니다.")
+                self._conn = None
+
+    # --- Public API ---
+
+    async def get(self, model: str, text: str) -> list[float] | None:
+        key = make_key(model, text)
+        vector = self._memory_get(key)
+        if vector is not None:
+            self.memory_hits += 1
+            return vector
+
+        if self._conn is not None:
+            vector = await asyncio.to_thread(self._disk_get, key)
+            if vector is not None:
+                self.disk_hits += 1
+                self._memory_put(key, vector)
+                return vector
+
+        self.misses += 1
+        return None
+
+    async def put(self, model: str, text: str, vector: list[float]):
+        key = make_key(model, text)
+        self._memory_put(key, vector)
+        if self._conn is not None:
+            await asyncio.to_thread(self._disk_put, key, vector)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_items": len(self._memory),
+            "disk_items": self._disk_items,
+        }
+
+    # --- Memory tier ---
+
+    def _memory_get(self, key: str) -> list[float] | None:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+        return vector
+
+    def _memory_put(self, key: str, vector: list[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    # --- Disk tier (워커 스레드에서 실행) ---
+
+    def _disk_get(self, key: str) -> list[float] | None:
+        with self._lock:
+            row = self._conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE embeddings SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return array.array("f", row[0]).tolist()
+
+    def _disk_put(self, key: str, vector: list[float]):
+        blob = array.array("f", vector).tobytes()
+        with self._lock:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                (key, blob, time.time())
+            ).rowcount
+            if not inserted:
+                # 이미 있는 키(동시에 같은 문장을 임베딩한 경우 등)는 덮어쓰기만 하고 개수는 늘리지 않습니다.
+                self._conn.execute("UPDATE embeddings SET vector = ?, last_used = ? WHERE key = ?", (blob, time.time(), key))
+            self._disk_items += inserted
+            if self._disk_items > self.max_db_items:
+                # 한도를 넘으면 90%까지 한꺼번에 줄여서, 쓰기마다 정리 작업이 일어나지 않도록 합니다.
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    " SELECT key FROM embeddings ORDER BY last_used ASC LIMIT"
+                    " (SELECT MAX(COUNT(*) - ?, 0) FROM embeddings))",
+                    (int(self.max_db_items * 0.9),)
+                )
+                (self._disk_items,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            self._conn.commit()
+
+
+# 서버 전체에서 공유하는 캐시 인스턴스
+embedding_cache = EmbeddingCache(
+    db_path=settings.EMBEDDING_CACHE_DB_PATH if settings.EMBEDDING_CACHE_ENABLED else None,
+    max_memory_items=settings.EMBEDDING_CACHE_MEMORY_ITEMS,
+    max_db_items=settings.EMBEDDING_CACHE_MAX_DB_ITEMS,
+)
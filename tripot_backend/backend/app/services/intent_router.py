@@ -0,0 +1,130 @@
+# app/services/intent_router.py
+# 사용자 발화를 (퀴즈 명령 / 인사 / 짧은 맞장구 / STT 환각 / 일반 대화)로 나누는 규칙 기반 분류기
+# 일반 대화만 기억 검색 + gpt-4o 경로로 보내고, 나머지는 바로 답하거나 가벼운 경로로 처리합니다.
+
+import re
+import random
+import threading
+from collections import Counter
+
+from app.services.prompt_registry import prompt_registry
+from app.services.quiz_grader import normalize_text
+
+INTENT_START_QUIZ = "start_quiz"
+INTENT_STOP_QUIZ = "stop_quiz"
+INTENT_STT_NOISE = "stt_noise"      # Whisper가 무음/잡음에서 만들어 내는 문구
+INTENT_GREETING = "greeting"        # 인사 -> 정해진 답변으로 바로 응답
+INTENT_ACK = "ack"                  # 짧은 맞장구 -> 기억 검색 없이 작은 모델로 응답
+INTENT_CHAT = "chat"                # 일반 대화 -> 기억 검색 + 기본 모델
+INTENT_QUIZ_ANSWER = "quiz_answer"  # 퀴즈 진행 중 답변 (분류하지 않고 집계만 함)
+
+# --- 키워드 표: 발화 어디에든 들어 있으면 해당 그룹이 켜집니다. (공백/문장부호를 지운 뒤 비교) ---
+KEYWORD_TABLE = {
+    "quiz": ("문제", "퀴즈"),
+    "quiz_start": ("풀래", "내줘", "시작", "줘봐"),
+    "quiz_stop": ("그만", "종료", "안할래"),
+}
+
+# --- 규칙 표: 위에서부터 확인해, 필요한 그룹이 모두 켜진 첫 규칙의 의도로 분류합니다. ---
+RULE_TABLE = (
+    (INTENT_START_QUIZ, ("quiz", "quiz_start")),
+    (INTENT_STOP_QUIZ, ("quiz", "quiz_stop")),
+)
+
+# --- 발화 전체가 이 표현 중 하나일 때만 해당 의도로 봅니다. ('네네네'처럼 반복한 것도 포함) ---
+WHOLE_UTTERANCE_TABLE = {
+    INTENT_GREETING: ("안녕", "안녕하세요", "안녕하셨어요", "여보세요", "반가워", "반가워요", "반갑습니다"),
+    INTENT_ACK: (
+        "네", "예", "응", "어", "음", "아", "오", "그래", "그래요", "그렇구나", "그렇군요", "그럼", "그럼요",
+        "알았어", "알았어요", "알겠어", "알겠어요", "알겠습니다", "좋아", "좋아요", "맞아", "맞아요",
+        "오케이", "고마워", "고마워요", "감사해요", "감사합니다",
+    ),
+}
+
+DEFAULT_FAST_REPLIES = {
+    INTENT_GREETING: ["네, 안녕하세요! 오늘 하루는 어떻게 보내고 계세요?"],
+}
+
+# --- Whisper가 무음/잡음에서 만들어 내는 문구: 발화의 (거의) 전부가 이 문구일 때만 잡음으로 봅니다. ---
+# 'MBC 뉴스 봤어'처럼 실제 대화 속에 들어 있는 경우까지 버리지 않도록 키워드 표와 따로 둡니다.
+STT_HALLUCINATION_PHRASES = (
+    "시청해주셔서 감사합니다", "시청해 주셔서 고맙습니다", "구독과 좋아요", "좋아요와 구독",
+    "다음 영상에서 만나요", "MBC 뉴스", "자막 제공", "한국어 자막",
+)
+STT_HALLUCINATION_MIN_COVERAGE = 0.8   # 정규화한 발화 길이 중 환각 문구가 차지해야 하는 비율
+
+_REPEATED = re.compile(r"^(.+?)\1+$")
+
+
+class KeywordMatcher:
+    """
+    여러 키워드를 정규식 하나(긴 키워드 우선 alternation)로 묶어 발화를 한 번만 훑어 찾는 다중 패턴 매처입니다.
+    전방 탐색을 써서 겹쳐 있는 키워드도 모두 찾습니다.
+    """
+    def __init__(self, table: dict[str, tuple[str, ...]]):
+        self._groups_by_keyword: dict[str, set[str]] = {}
+        for group, keywords in table.items():
+            for keyword in keywords:
+                self._groups_by_keyword.setdefault(normalize_text(keyword), set()).add(group)
+        alternation = "|".join(re.escape(k) for k in sorted(self._groups_by_keyword, key=len, reverse=True))
+        self._pattern = re.compile(f"(?=({alternation}))")
+
+    def groups(self, normalized_text: str) -> set[str]:
+        found: set[str] = set()
+        for match in self._pattern.finditer(normalized_text):
+            found |= self._groups_by_keyword[match.group(1)]
+        return found
+
+
+class IntentRouter:
+    """발화를 분류하고, 의도별로 처리한 발화 수를 집계합니다."""
+    def __init__(self):
+        self._matcher = KeywordMatcher(KEYWORD_TABLE)
+        self._hallucinations = tuple(normalize_text(phrase) for phrase in STT_HALLUCINATION_PHRASES)
+        self._whole_utterances = {
+            normalize_text(phrase): intent
+            for intent, phrases in WHOLE_UTTERANCE_TABLE.items() for phrase in phrases
+        }
+        self._counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def classify(self, user_message: str) -> str:
+        """발화 하나의 의도를 반환합니다. (집계는 record로 따로 합니다.)"""
+        text = normalize_text(user_message)
+        if not text or self._is_hallucination(text):
+            return INTENT_STT_NOISE
+        groups = self._matcher.groups(text)
+        for intent, required_groups in RULE_TABLE:
+            if all(group in groups for group in required_groups):
+                return intent
+        repeated = _REPEATED.match(text)
+        return self._whole_utterances.get(text) or (repeated and self._whole_utterances.get(repeated.group(1))) or INTENT_CHAT
+
+    def is_stt_noise(self, transcript: str) -> bool:
+        return self.classify(transcript) == INTENT_STT_NOISE
+
+    def fast_reply(self, intent: str) -> str:
+        """바로 보낼 정해진 답변 (talk_prompts.json의 fast_replies, 없으면 기본값)"""
+        replies = prompt_registry.fast_replies().get(intent) or DEFAULT_FAST_REPLIES[intent]
+        return random.choice(replies)
+
+    def record(self, intent: str):
+        with self._lock:
+            self._counts[intent] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = sum(self._counts.values())
+            return {"total": total, "by_intent": dict(self._counts)}
+
+    # --- Internal ---
+
+    def _is_hallucination(self, normalized_text: str) -> bool:
+        return any(
+            phrase in normalized_text and len(phrase) >= STT_HALLUCINATION_MIN_COVERAGE * len(normalized_text)
+            for phrase in self._hallucinations
+        )
+
+
+# 서버 전체에서 공유하는 분류기
+intent_router = IntentRouter()
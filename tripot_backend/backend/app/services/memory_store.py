@@ -0,0 +1,289 @@
+# app/services/memory_store.py
+# 장기 기억(임베딩 + 메타데이터) 저장소 인터페이스와 백엔드 구현 (Pinecone / 로컬 NumPy)
+
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.core.config import settings
+
+EMBEDDING_DIMENSION = 1536
+
+# 검색 결과 점수 = 유사도 * 0.7 + 최신성 * 0.3 (최신성은 30일에 걸쳐 1 -> 0으로 감소)
+SIMILARITY_WEIGHT = 0.7
+RECENCY_WEIGHT = 0.3
+TIME_DECAY_SECONDS = 30 * 24 * 60 * 60  # 30일
+
+
+def recency_score(timestamp, now: int):
+    """timestamp(스칼라 또는 배열)의 최신성 점수를 0 이상으로 계산합니다."""
+    return np.maximum(0, (timestamp - (now - TIME_DECAY_SECONDS)) / TIME_DECAY_SECONDS)
+
+
+class MemorySnapshot:
+    """
+    한 사용자의 기억 벡터(행 단위로 정규화된 float32 행렬)와 메타데이터 묶음입니다.
+    complete가 True이면 해당 사용자의 기억 전체를 담고 있다는 뜻입니다.
+    """
+    __slots__ = ("vectors", "timestamps", "metadata", "complete")
+
+    def __init__(self, vectors: np.ndarray, metadata: list[dict], complete: bool = True):
+        self.vectors = vectors
+        self.metadata = metadata
+        self.timestamps = np.array([m.get('timestamp', 0) for m in metadata], dtype=np.int64)
+        self.complete = complete
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+    def rank(self, query_vector, top_k: int) -> list[dict]:
+        """코사인 유사도 top_k 선택 + 최신성 혼합 점수 정렬을 벡터 연산으로 처리합니다."""
+        if len(self) == 0:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        similarities = self.vectors @ (query / norm)
+
+        k = min(top_k, len(similarities))
+        candidates = np.argpartition(-similarities, k - 1)[:k]
+
+        now = int(time.time())
+        scores = similarities[candidates] * SIMILARITY_WEIGHT + recency_score(self.timestamps[candidates], now) * RECENCY_WEIGHT
+        order = candidates[np.argsort(-scores)]
+        final_scores = dict(zip(candidates.tolist(), scores.tolist()))
+
+        return [
+            {
+                'text': self.metadata[i].get('text', ''),
+                'score': final_scores[i],
+                'similarity': float(similarities[i]),
+                'timestamp': int(self.timestamps[i]),
+            }
+            for i in order.tolist()
+        ]
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class MemoryStore:
+    """
+    장기 기억 저장소의 공통 인터페이스입니다.
+    - upsert: {'id', 'values', 'metadata': {'user_id', 'text', 'timestamp', 'memory_type'}} 형태의 벡터 목록을 저장
+    - search: 유사도 상위 top_k개를 뽑아 최신성을 섞은 점수로 다시 정렬한 [{'text', 'score', ...}] 목록을 반환
+    - fetch_candidates: 세션 동안 로컬에서 순위를 매길 수 있도록 사용자의 기억을 최대 limit개까지 벡터와 함께 가져옴
+    """
+    async def upsert(self, vectors: list[dict]):
+        raise NotImplementedError
+
+    async def search(self, user_id: str, query_vector: list[float], top_k: int) -> list[dict]:
+        raise NotImplementedError
+
+    async def fetch_candidates(self, user_id: str, limit: int) -> MemorySnapshot | None:
+        raise NotImplementedError
+
+
+class PineconeMemoryStore(MemoryStore):
+    """원격 Pinecone 인덱스를 사용하는 저장소 (user_id 메타데이터로 필터링)"""
+    def __init__(self, api_key: str, index_name: str):
+        from pinecone import Pinecone, ServerlessSpec
+
+        pc = Pinecone(api_key=api_key)
+        if index_name not in pc.list_indexes().names():
+            print(f"Pinecone 인덱스 '{index_name}'가 없으므로 새로 생성합니다.")
+            pc.create_index(
+                name=index_name,
+                dimension=EMBEDDING_DIMENSION,
+                metric="cosine",
+                spec=ServerlessSpec(cloud="aws", region="us-east-1")
+            )
+        self.index = pc.Index(index_name)
+        print(f"✅ Pinecone '{index_name}' 인덱스에 성공적으로 연결되었습니다.")
+
+    async def upsert(self, vectors: list[dict]):
+        await asyncio.to_thread(self.index.upsert, vectors=vectors)
+
+    async def search(self, user_id: str, query_vector: list[float], top_k: int) -> list[dict]:
+        results = await asyncio.to_thread(
+            self.index.query,
+            vector=query_vector,
+            top_k=top_k,
+            filter={'user_id': user_id},
+            include_metadata=True
+        )
+        if not results['matches']:
+            return []
+
+        now = int(time.time())
+        ranked_memories = []
+        for match in results['matches']:
+            metadata = match.get('metadata', {})
+            timestamp = metadata.get('timestamp', now)
+            final_score = (match['score'] * SIMILARITY_WEIGHT) + (float(recency_score(timestamp, now)) * RECENCY_WEIGHT)
+            ranked_memories.append({'text': metadata.get('text', ''), 'score': final_score, 'timestamp': timestamp})
+
+        ranked_memories.sort(key=lambda x: x['score'], reverse=True)
+        return ranked_memories
+
+    async def fetch_candidates(self, user_id: str, limit: int) -> MemorySnapshot | None:
+        # Pinecone에는 메타데이터 필터만으로 목록을 가져오는 API가 없으므로,
+        # 균등한 방향의 벡터로 질의하여 해당 사용자의 기억을 최대 limit개(값 포함)까지 받아옵니다.
+        probe = [1.0 / np.sqrt(EMBEDDING_DIMENSION)] * EMBEDDING_DIMENSION
+        results = await asyncio.to_thread(
+            self.index.query,
+            vector=probe,
+            top_k=limit,
+            filter={'user_id': user_id},
+            include_metadata=True,
+            include_values=True
+        )
+        matches = results['matches']
+        if not matches:
+            return MemorySnapshot(np.zeros((0, EMBEDDING_DIMENSION), dtype=np.float32), [], complete=True)
+
+        vectors = _normalize_rows(np.asarray([m['values'] for m in matches], dtype=np.float32))
+        metadata = [dict(m.get('metadata', {}), id=m['id']) for m in matches]
+        return MemorySnapshot(vectors, metadata, complete=len(matches) < limit)
+
+
+class LocalMemoryStore(MemoryStore):
+    """
+    프로세스 내부에서 동작하는 저장소입니다.
+    사용자별로 정규화된 임베딩 행렬을 '<user>.npy'(memory-map으로 로드)에, 메타데이터를 '<user>.json'에 저장하고
+    검색은 행렬-벡터 곱 한 번으로 코사인 유사도를 구한 뒤 같은 자리에서 최신성 점수를 섞어 정렬합니다.
+    열어 둔 사용자 스냅샷은 최대 max_users명까지 LRU로 보관하고, 파일 읽기는 이벤트 루프 밖(스레드)에서 합니다.
+    """
+    def __init__(self, data_dir: str, max_users: int):
+        self.data_dir = data_dir
+        self.max_users = max_users
+        os.makedirs(self.data_dir, exist_ok=True)
+        self._users: OrderedDict[str, MemorySnapshot] = OrderedDict()
+        self._lock = threading.Lock()
+        print(f"✅ 로컬 기억 저장소를 사용합니다: {self.data_dir}")
+
+    # --- Public API ---
+
+    async def upsert(self, vectors: list[dict]):
+        by_user: dict[str, list[dict]] = {}
+        for vector in vectors:
+            by_user.setdefault(vector['metadata']['user_id'], []).append(vector)
+        for user_id, user_vectors in by_user.items():
+            await asyncio.to_thread(self._append, user_id, user_vectors)
+
+    async def search(self, user_id: str, query_vector: list[float], top_k: int) -> list[dict]:
+        user = await self._load_async(user_id)
+        if user is None:
+            return []
+        return user.rank(query_vector, top_k)
+
+    async def fetch_candidates(self, user_id: str, limit: int) -> MemorySnapshot | None:
+        user = await self._load_async(user_id)
+        if user is None:
+            return MemorySnapshot(np.zeros((0, EMBEDDING_DIMENSION), dtype=np.float32), [], complete=True)
+        if len(user) <= limit:
+            return user
+        # 가장 최근 기억 limit개만 세션에 올립니다.
+        recent = np.argsort(-user.timestamps)[:limit]
+        return MemorySnapshot(
+            np.asarray(user.vectors[recent]), [user.metadata[i] for i in recent.tolist()], complete=False
+        )
+
+    # --- Storage ---
+
+    def _paths(self, user_id: str) -> tuple[str, str]:
+        safe_name = re.sub(r'[^0-9A-Za-z_.-]', '_', user_id)
+        base = os.path.join(self.data_dir, safe_name)
+        return f"{base}.npy", f"{base}.json"
+
+    def _cached(self, user_id: str) -> MemorySnapshot | None:
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is not None:
+                self._users.move_to_end(user_id)
+            return user
+
+    def _remember(self, user_id: str, user: MemorySnapshot):
+        """self._lock을 잡은 상태에서 호출합니다."""
+        self._users[user_id] = user
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+
+    async def _load_async(self, user_id: str) -> MemorySnapshot | None:
+        """메모리에 있으면 바로 반환하고, 없을 때만 파일 읽기를 스레드에서 수행합니다. (웹소켓 턴 중 이벤트 루프를 막지 않도록)"""
+        user = self._cached(user_id)
+        if user is not None:
+            return user
+        return await asyncio.to_thread(self._load, user_id)
+
+    def _load(self, user_id: str) -> MemorySnapshot | None:
+        with self._lock:
+            return self._load_locked(user_id)
+
+    def _load_locked(self, user_id: str) -> MemorySnapshot | None:
+        """self._lock을 잡은 상태에서 호출합니다."""
+        user = self._users.get(user_id)
+        if user is not None:
+            self._users.move_to_end(user_id)
+            return user
+
+        vectors_path, metadata_path = self._paths(user_id)
+        if not os.path.exists(vectors_path) or not os.path.exists(metadata_path):
+            return None
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        vectors = np.load(vectors_path, mmap_mode='r')
+        user = MemorySnapshot(vectors, metadata)
+        self._remember(user_id, user)
+        return user
+
+    def _append(self, user_id: str, new_vectors: list[dict]):
+        """
+        새 벡터를 정규화하여 기존 행렬 뒤에 붙이고, 임시 파일에 쓴 뒤 교체합니다.
+        기존 스냅샷 읽기부터 교체까지 한 번에 self._lock 안에서 해, 같은 사용자의 upsert가 겹쳐도 서로의 벡터를 덮어쓰지 않습니다.
+        """
+        matrix = _normalize_rows(np.asarray([v['values'] for v in new_vectors], dtype=np.float32))
+        new_metadata = [dict(v['metadata'], id=v['id']) for v in new_vectors]
+
+        with self._lock:
+            existing = self._load_locked(user_id)
+            if existing is not None:
+                matrix = np.vstack([np.asarray(existing.vectors), matrix])
+                new_metadata = existing.metadata + new_metadata
+
+            vectors_path, metadata_path = self._paths(user_id)
+            with open(f"{vectors_path}.tmp", 'wb') as f:
+                np.save(f, matrix)
+            with open(f"{metadata_path}.tmp", 'w', encoding='utf-8') as f:
+                json.dump(new_metadata, f, ensure_ascii=False)
+            os.replace(f"{vectors_path}.tmp", vectors_path)
+            os.replace(f"{metadata_path}.tmp", metadata_path)
+
+            self._remember(user_id, MemorySnapshot(np.load(vectors_path, mmap_mode='r'), new_metadata))
+
+
+def create_memory_store() -> MemoryStore | None:
+    """settings.MEMORY_STORE_BACKEND에 따라 저장소를 생성합니다. 실패하면 None을 반환합니다."""
+    backend = settings.MEMORY_STORE_BACKEND.lower()
+    try:
+        if backend == "local":
+            return LocalMemoryStore(settings.LOCAL_MEMORY_DIR, settings.LOCAL_MEMORY_MAX_USERS)
+        if backend == "pinecone":
+            if not settings.PINECONE_API_KEY:
+                print("❌ PINECONE_API_KEY가 설정되지 않아 Pinecone 기억 저장소를 사용할 수 없습니다.")
+                return None
+            return PineconeMemoryStore(settings.PINECONE_API_KEY, settings.PINECONE_INDEX_NAME)
+        print(f"❌ 알 수 없는 MEMORY_STORE_BACKEND 값입니다: {settings.MEMORY_STORE_BACKEND}")
+    except Exception as e:
+        print(f"❌ 기억 저장소({backend}) 초기화 중 오류 발생: {e}")
+    return None
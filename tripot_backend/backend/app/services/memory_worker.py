@@ -0,0 +1,172 @@
+# app/services/memory_worker.py
+# 웹소켓 종료 후 세션 기억 생성(요약 LLM -> 임베딩 -> 저장)과 하루 누적 요약 갱신을 백그라운드에서 처리하는 작업 큐
+
+import asyncio
+import traceback
+from datetime import date
+
+from app.core.config import settings
+from app.services import vector_db_service, daily_digest_service
+
+
+class MemoryConsolidationWorker:
+    """
+    크기가 제한된 asyncio.Queue와 워커 태스크 풀로 세션 기억을 만듭니다.
+    만들어진 벡터는 바로 저장하지 않고 모아 두었다가, 개수나 시간 기준에 도달하면 한 번에 upsert합니다.
+    upsert가 실패하면 벡터를 앞쪽에 되돌려 다음 flush에서 다시 시도하되, max_pending개를 넘으면 오래된 것부터 버립니다.
+    """
+    def __init__(self, concurrency: int, queue_size: int, batch_size: int, flush_interval: float, max_pending: int):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._flusher: asyncio.Task | None = None
+        self._pending: list[dict] = []
+        self._flush_lock: asyncio.Lock | None = None
+
+        self.submitted = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.failed = 0
+        self.upserted = 0
+        self.upsert_errors = 0
+        self.digests_updated = 0
+        self.digest_failed = 0
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self):
+        """워커와 주기적 flush 태스크를 시작합니다. (이벤트 루프 안에서 호출)"""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._flush_lock = asyncio.Lock()
+        self._workers = [asyncio.create_task(self._worker_loop(i)) for i in range(self.concurrency)]
+        self._flusher = asyncio.create_task(self._flush_loop())
+        print(f"🚀 기억 생성 워커 {self.concurrency}개 시작 (큐 크기 {self.queue_size}, 배치 {self.batch_size})")
+
+    async def stop(self, timeout: float = 30.0):
+        """큐에 남은 작업을 최대 timeout초 동안 처리한 뒤 워커를 멈추고 남은 벡터를 저장합니다."""
+        if not self.is_running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ 기억 생성 큐를 모두 비우지 못했습니다. (남은 작업 {self._queue.qsize()}개)")
+
+        for task in [*self._workers, self._flusher]:
+            task.cancel()
+        await asyncio.gather(*self._workers, self._flusher, return_exceptions=True)
+        self._workers = []
+        self._flusher = None
+        await self.flush()
+        print("⏹️ 기억 생성 워커 종료")
+
+    def submit(self, user_id: str, session_log: list[str], log_dates: list[date]) -> bool:
+        """
+        세션 로그를 큐에 넣고 바로 반환합니다. 사용자 발화가 없거나 큐가 가득 차면 False를 반환합니다.
+        log_dates는 session_log의 줄마다 그 말이 오간 날짜로, 누적 요약을 워커가 실행된 날이 아닌 대화한 날에 반영하는 데 씁니다.
+        """
+        if not vector_db_service.has_user_turns(session_log):
+            self.skipped += 1
+            return False
+        if not self.is_running:
+            self.start()
+        try:
+            self._queue.put_nowait((user_id, list(session_log), list(log_dates)))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            print(f"⚠️ 기억 생성 큐가 가득 차서 [{user_id}] 님의 세션을 건너뜁니다.")
+            return False
+        self.submitted += 1
+        return True
+
+    async def flush(self):
+        """모아 둔 벡터를 한 번의 upsert로 저장합니다. 저장소가 없으면 모아 둔 벡터를 버립니다."""
+        if not self._pending:
+            return
+        if vector_db_service.memory_store is None:
+            self.failed += len(self._pending)
+            self._pending = []
+            return
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                await vector_db_service.memory_store.upsert(batch)
+                self.upserted += len(batch)
+                print(f"✅ 기억 {len(batch)}개를 저장소에 일괄 저장했습니다.")
+            except Exception as e:
+                self.upsert_errors += 1
+                print(f"❌ 기억 일괄 저장 실패 ({len(batch)}개), 다음 flush에서 다시 시도합니다: {e}")
+                self._pending = batch + self._pending
+                self._trim()
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "pending_upserts": len(self._pending),
+            "submitted": self.submitted,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "upserted": self.upserted,
+            "upsert_errors": self.upsert_errors,
+            "digests_updated": self.digests_updated,
+            "digest_failed": self.digest_failed,
+        }
+
+    # --- Internal ---
+
+    def _trim(self):
+        """저장소 장애가 길어져도 메모리가 무한히 늘지 않도록 가장 오래된 벡터부터 버립니다."""
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.failed += overflow
+            print(f"⚠️ 저장 대기 중인 기억이 너무 많아 오래된 {overflow}개를 버렸습니다.")
+
+    async def _worker_loop(self, worker_no: int):
+        while True:
+            user_id, session_log, log_dates = await self._queue.get()
+            try:
+                vector = await vector_db_service.build_memory_vector(user_id, session_log)
+                if vector is not None:
+                    self._pending.append(vector)
+                    self._trim()
+                    if len(self._pending) >= self.batch_size:
+                        await self.flush()
+            except Exception as e:
+                self.failed += 1
+                print(f"❌ [워커 {worker_no}] [{user_id}] 기억 생성 실패: {e}\n{traceback.format_exc()}")
+
+            try:
+                # 같은 세션 로그로 대화한 날짜별 누적 요약도 갱신합니다.
+                self.digests_updated += await daily_digest_service.fold_session_by_date(user_id, session_log, log_dates)
+            except Exception as e:
+                self.digest_failed += 1
+                print(f"❌ [워커 {worker_no}] [{user_id}] 누적 요약 갱신 실패: {e}\n{traceback.format_exc()}")
+            finally:
+                self._queue.task_done()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+# 서버 전체에서 공유하는 워커 인스턴스
+memory_worker = MemoryConsolidationWorker(
+    concurrency=settings.MEMORY_WORKER_CONCURRENCY,
+    queue_size=settings.MEMORY_WORKER_QUEUE_SIZE,
+    batch_size=settings.MEMORY_UPSERT_BATCH_SIZE,
+    flush_interval=settings.MEMORY_UPSERT_FLUSH_SECONDS,
+    max_pending=settings.MEMORY_UPSERT_MAX_PENDING,
+)
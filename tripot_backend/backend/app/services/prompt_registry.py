@@ -0,0 +1,126 @@
+# app/services/prompt_registry.py
+# prompts/*.json 파일을 한 번만 읽어 미리 조립해 두고, 파일이 바뀌었을 때만 다시 읽는 모듈
+
+import os
+import json
+import threading
+from typing import Any, Callable
+
+from app.core.config import settings
+
+TALK_PROMPTS_FILE = 'talk_prompts.json'
+REPORT_PROMPTS_FILE = 'report_prompts.json'
+QUIZ_PROMPTS_FILE = 'quiz_prompts.json'
+
+
+# --- Compilers: JSON 원본 -> 매 턴 바로 쓸 수 있는 문자열 ---
+
+def _compile_talk_prompts(raw: dict) -> dict:
+    """일반 대화 프롬프트에서 기억/사용자 메시지 앞까지의 고정 부분을 미리 조립합니다."""
+    config = raw.get('main_chat_prompt')
+    if not config:
+        return {}
+
+    system_message = "\n".join(config['system_message_base'])
+    core_rules = "\n".join(config['core_conversation_rules'])
+    guidelines = "\n".join(config['guidelines_and_reactions'])
+    prohibitions = "\n".join(config['strict_prohibitions'])
+    examples_text = "\n\n".join([f"상황: {ex['situation']}\n사용자 입력: {ex['user_input']}\nAI 응답: {ex['ai_response']}" for ex in config['examples']])
+
+    chat_prefix = (
+        f"# 페르소나\n{system_message}\n# 핵심 대화 규칙\n{core_rules}\n# 응답 가이드라인\n{guidelines}\n"
+        f"# 절대 금지사항\n{prohibitions}\n# 성공적인 대화 예시\n{examples_text}\n---\n이제 실제 대화를 시작합니다.\n"
+    )
+    return {"chat_prefix": chat_prefix, "start_question": config.get('start_question'), "fast_replies": raw.get('fast_replies', {})}
+
+def _compile_report_prompts(raw: dict) -> dict:
+    """리포트 분석용 system 프롬프트를 미리 조립합니다."""
+    template = raw.get('report_analysis_prompt')
+    if not template:
+        return {}
+
+    persona = template.get('persona', '당신은 전문 대화 분석 AI입니다.')
+    instructions = "\n".join(template.get('instructions', []))
+    output_format_example = json.dumps(template.get('OUTPUT_FORMAT', {}), ensure_ascii=False, indent=2)
+
+    system_prompt = f"{persona}\n\n### 지시사항\n{instructions}\n\n### 출력 형식\n모든 결과는 아래와 같은 JSON 형식으로만 출력해야 합니다. JSON 외의 텍스트는 절대 포함하지 마세요.\n{output_format_example}"
+    return {"system_prompt": system_prompt, "output_format": template.get('OUTPUT_FORMAT', {})}
+
+def _compile_quiz_prompts(raw: dict) -> dict:
+    """퀴즈 프롬프트는 템플릿 모음 그대로 사용합니다."""
+    return raw
+
+
+class PromptRegistry:
+    """
+    프롬프트 파일별로 (mtime, 조립된 결과)를 보관합니다.
+    조회할 때마다 os.stat으로 수정 시각만 확인하고, 바뀐 경우에만 파일을 다시 읽고 조립합니다.
+    """
+    def __init__(self, prompts_dir: str, compilers: dict[str, Callable[[dict], dict]]):
+        self.prompts_dir = prompts_dir
+        self.compilers = compilers
+        self._entries: dict[str, tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, filename: str) -> dict:
+        """조립된 프롬프트 딕셔너리를 반환합니다. 파일을 읽을 수 없으면 마지막으로 성공한 값(없으면 {})을 반환합니다."""
+        path = os.path.join(self.prompts_dir, filename)
+        entry = self._entries.get(filename)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError as e:
+            if entry is None:
+                print(f"❌ 프롬프트 로드 실패 ({path}): {e}")
+                self._entries[filename] = (-1.0, {})
+            return self._entries[filename][1]
+
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is not None and entry[0] == mtime:
+                return entry[1]
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    compiled = self.compilers[filename](json.load(f))
+                print(f"✅ 프롬프트 로드 성공: {path}")
+            except Exception as e:
+                print(f"❌ 프롬프트 로드 실패 ({path}): {e}")
+                compiled = entry[1] if entry else {}
+            self._entries[filename] = (mtime, compiled)
+            return compiled
+
+    def preload(self):
+        """모든 프롬프트 파일을 미리 읽어 둡니다."""
+        for filename in self.compilers:
+            self.get(filename)
+
+    # --- 편의 함수 ---
+
+    def chat_prefix(self) -> str | None:
+        return self.get(TALK_PROMPTS_FILE).get("chat_prefix")
+
+    def start_question(self, default: str) -> str:
+        return self.get(TALK_PROMPTS_FILE).get("start_question") or default
+
+    def fast_replies(self) -> dict[str, list[str]]:
+        return self.get(TALK_PROMPTS_FILE).get("fast_replies", {})
+
+    def report_system_prompt(self) -> str | None:
+        return self.get(REPORT_PROMPTS_FILE).get("system_prompt")
+
+    def report_output_format(self) -> dict:
+        return self.get(REPORT_PROMPTS_FILE).get("output_format", {})
+
+    def quiz_prompts(self) -> dict[str, Any]:
+        return self.get(QUIZ_PROMPTS_FILE)
+
+
+# 서버 전체에서 공유하는 레지스트리 인스턴스
+prompt_registry = PromptRegistry(settings.PROMPTS_DIR, {
+    TALK_PROMPTS_FILE: _compile_talk_prompts,
+    REPORT_PROMPTS_FILE: _compile_report_prompts,
+    QUIZ_PROMPTS_FILE: _compile_quiz_prompts,
+})
+prompt_registry.preload()
@@ -0,0 +1,112 @@
+# app/services/quiz_bank.py
+# quiz 테이블 전체를 프로세스 메모리에 한 번만 올려 두고 모든 세션이 공유하는 퀴즈 문제 은행
+# 읽기 전용 QuizBank를 통째로 교체하는 방식이라, 다시 읽는 동안에도 진행 중인 세션은 이전 은행을 그대로 사용합니다.
+
+import time
+import random
+
+from app.core.config import settings
+from app.db import async_crud
+from app.db.database import AsyncSessionLocal
+
+
+class QuizRecord:
+    """퀴즈 한 문제. 문제 수만큼 만들어지므로 __slots__로 인스턴스 딕셔너리를 없앱니다."""
+    __slots__ = ("id", "topic", "question_text", "answer")
+
+    def __init__(self, id: int, topic: str, question_text: str, answer: str):
+        self.id = id
+        self.topic = topic
+        self.question_text = question_text
+        self.answer = answer
+
+    def __repr__(self) -> str:
+        return f"QuizRecord(id={self.id}, topic={self.topic!r})"
+
+
+class QuizBank:
+    """
+    만든 뒤에는 바꾸지 않는 퀴즈 목록입니다.
+    문제는 튜플 하나에, 주제별 색인은 그 튜플의 위치(정수) 튜플로 보관합니다.
+    주제별 위치는 적재할 때 한 번 섞어 두며, quiz_selector는 이 순서를 사용자마다 다른 지점부터 따라갑니다.
+    ordinals는 퀴즈 id -> 위치(0부터 연속된 번호) 표로, id가 아무리 커도 문제 수만큼의 비트맵으로 푼 문제를 표시할 수 있게 합니다.
+    """
+    __slots__ = ("records", "topic_index", "ordinals", "signature")
+
+    def __init__(self, records: list[QuizRecord], signature: tuple = ()):
+        self.records: tuple[QuizRecord, ...] = tuple(records)
+        self.ordinals: dict[int, int] = {record.id: position for position, record in enumerate(self.records)}
+        topic_index: dict[str, list[int]] = {}
+        for position, record in enumerate(self.records):
+            topic_index.setdefault(record.topic, []).append(position)
+        for positions in topic_index.values():
+            random.shuffle(positions)
+        self.topic_index: dict[str, tuple[int, ...]] = {topic: tuple(positions) for topic, positions in topic_index.items()}
+        self.signature = signature  # 적재 시점의 quiz 테이블 상태 (변경 감지용)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def topics(self) -> list[str]:
+        return list(self.topic_index)
+
+    def sample(self, k: int, topic: str | None = None) -> list[QuizRecord]:
+        """
+        겹치지 않는 문제 최대 k개를 무작위로 고릅니다. (topic을 주면 해당 주제에서만)
+        random.sample은 range/튜플에서 k개만 뽑으므로 전체 문제 수와 관계없이 O(k)입니다.
+        """
+        positions = self.topic_index.get(topic, ()) if topic is not None else range(len(self.records))
+        k = min(k, len(positions))
+        return [self.records[position] for position in random.sample(positions, k)]
+
+
+class QuizBankStore:
+    """
+    현재 QuizBank 하나를 보관합니다. refresh_if_stale()은 최대 check_interval초에 한 번
+    quiz 테이블의 (문제 수, 최대 id, 최근 생성 시각)만 조회하고, 달라졌을 때만 전체를 다시 읽어 교체합니다.
+    (scripts/insert_data.py처럼 테이블을 다시 채우는 경우를 감지하며, 기존 행을 제자리에서 수정한 것은 감지하지 않습니다.)
+    """
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._bank = QuizBank([])
+        self._last_checked = 0.0
+        self.reloads = 0
+
+    @property
+    def current(self) -> QuizBank:
+        return self._bank
+
+    async def load(self):
+        """quiz 테이블 전체를 읽어 새 QuizBank로 교체합니다. 실패하면 기존 은행을 유지합니다."""
+        try:
+            async with AsyncSessionLocal() as db:
+                signature = await async_crud.get_quiz_table_signature(db)
+                rows = await async_crud.fetch_all_quizzes(db)
+        except Exception as e:
+            print(f"❌ 퀴즈 DB 데이터 로드 중 오류 발생: {e}")
+            return
+        self._last_checked = time.monotonic()
+        # 참조 하나만 바꾸므로 읽는 쪽은 항상 온전한 이전/새 은행 중 하나를 보게 됩니다.
+        self._bank = QuizBank([QuizRecord(*row) for row in rows], signature)
+        self.reloads += 1
+        print(f"✅ 퀴즈 {len(self._bank)}문제를 불러왔습니다. (주제 {len(self._bank.topic_index)}개)")
+
+    async def refresh_if_stale(self) -> QuizBank:
+        """확인 주기가 지났고 quiz 테이블이 바뀌었으면 다시 읽은 뒤, 현재 은행을 반환합니다."""
+        if time.monotonic() - self._last_checked < self.check_interval:
+            return self._bank
+        self._last_checked = time.monotonic()
+        try:
+            async with AsyncSessionLocal() as db:
+                signature = await async_crud.get_quiz_table_signature(db)
+        except Exception as e:
+            print(f"⚠️ 퀴즈 테이블 변경 확인 실패 (기존 문제 사용): {e}")
+            return self._bank
+        if signature != self._bank.signature:
+            await self.load()
+        return self._bank
+
+
+# 서버 전체에서 공유하는 퀴즈 은행
+quiz_bank = QuizBankStore(check_interval=settings.QUIZ_BANK_CHECK_SECONDS)
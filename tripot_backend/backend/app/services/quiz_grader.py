@@ -0,0 +1,276 @@
+# app/services/quiz_grader.py
+# 퀴즈 답변을 LLM 없이 먼저 채점하는 모듈
+# 정답 형식(숫자, 숫자/단어 나열, 여러 정답 중 하나, 짧은 단어)에 맞춰 규칙으로 판정하고,
+# 규칙으로 판단할 수 없는 답변만 LLM에 묻고 그 판정을 (퀴즈 id, 정규화된 답변)으로 기억해 둡니다.
+
+import re
+import unicodedata
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.services.quiz_bank import QuizRecord
+
+ALTERNATIVE_SEPARATOR = "/"   # quiz1.csv: "나비 / 나라 / 나무"
+SEQUENCE_SEPARATOR = ","      # quiz1.csv: "사과, 의자, 하늘, 연필, 자동차", "9, 2, 7"
+
+# 숫자 뒤에 붙는 단위/어미 (앞에 있는 것부터 확인해 떼어 냅니다)
+NUMBER_SUFFIXES = ("입니다", "이에요", "예요", "이요", "이죠", "요", "개", "자루", "마리", "명", "번", "살", "원", "이")
+COUNTERS = ("개", "자루", "마리", "명", "번", "살", "원")
+SINO_DIGITS = {"영": 0, "공": 0, "일": 1, "이": 2, "삼": 3, "사": 4, "오": 5, "육": 6, "칠": 7, "팔": 8, "구": 9}
+SINO_UNITS = {"십": 10, "백": 100}
+NATIVE_UNITS = {"하나": 1, "둘": 2, "셋": 3, "넷": 4, "다섯": 5, "여섯": 6, "일곱": 7, "여덟": 8, "아홉": 9}
+NATIVE_TENS = {"열": 10, "스물": 20, "서른": 30, "마흔": 40, "쉰": 50}
+# 관형사형(한 개, 두 자루 ...)은 '네(예)', '세' 같은 말과 헷갈리므로 단위가 붙어 있을 때만 숫자로 봅니다.
+# 한자어 수사('오', '사', '이')도 '오이', '사요'처럼 보통 단어의 일부일 수 있어, 어미를 뗀 경우에는 단위가 있을 때만 숫자로 봅니다.
+NATIVE_DETERMINERS = {"한": 1, "두": 2, "세": 3, "석": 3, "네": 4, "스무": 20}
+
+# 단어 정답은 답변 전체가 '(말머리) + 정답 + (조사/어미)'일 때만 맞은 것으로 봅니다.
+# '사과 말고 배', '해바라기'처럼 정답을 포함하기만 한 답변은 LLM에 맡깁니다.
+ANSWER_PREFIXES = ("정답은", "답은", "그건", "음", "어", "아", "네", "예")
+ANSWER_ENDINGS = (
+    "", "요", "이요", "예요", "이에요", "입니다", "이죠", "죠", "이지", "지", "이야", "야", "이다", "다",
+    "인가요", "인가", "일까요", "같아요", "인것같아요", "인것같아",
+)
+
+DONT_KNOW_MARKERS = ("모르", "몰라", "기억안", "기억이안", "생각안", "생각이안", "잊어")
+NEGATION_MARKERS = ("아니", "않", "아닌")
+
+_PUNCTUATION = re.compile(r"[\W_]+")
+_DIGITS = re.compile(r"\d+")
+_TOKEN = re.compile(r"[\w]+")
+
+
+def normalize_text(text: str) -> str:
+    """유니코드 정규화 후 소문자로 바꾸고 공백과 문장부호를 모두 지웁니다. ("자동 차!" -> "자동차")"""
+    return _PUNCTUATION.sub("", unicodedata.normalize("NFC", str(text)).lower())
+
+
+def parse_korean_number(word: str) -> int | None:
+    """'팔', '십오', '이십', '여덟', '열다섯', '스물' 같은 한 단어를 정수로 바꿉니다. 숫자가 아니면 None."""
+    if word in NATIVE_UNITS:
+        return NATIVE_UNITS[word]
+    for tens_word, tens in NATIVE_TENS.items():
+        if word.startswith(tens_word):
+            rest = word[len(tens_word):]
+            if not rest:
+                return tens
+            if rest in NATIVE_UNITS:
+                return tens + NATIVE_UNITS[rest]
+    if word and all(ch in SINO_DIGITS or ch in SINO_UNITS for ch in word):
+        total, current = 0, 0
+        for ch in word:
+            if ch in SINO_UNITS:
+                total += (current or 1) * SINO_UNITS[ch]
+                current = 0
+            else:
+                current = SINO_DIGITS[ch]
+        return total + current
+    return None
+
+
+def extract_numbers(text: str, split_digits: bool = False) -> list[int]:
+    """
+    답변에 나온 숫자를 말한 순서대로 뽑습니다. 아라비아 숫자와 한자어/고유어 수사를 모두 인식합니다.
+    split_digits가 True이면 '927', '구이칠'처럼 붙여 말한 한 자리 숫자 나열을 한 자리씩 나눕니다.
+    """
+    numbers: list[int] = []
+    tokens = _TOKEN.findall(unicodedata.normalize("NFC", str(text)))
+    for i, token in enumerate(tokens):
+        digits = _DIGITS.match(token)
+        if digits:
+            if split_digits:
+                numbers.extend(int(d) for d in digits.group())
+            else:
+                numbers.append(int(digits.group()))
+            continue
+        word, has_counter = _strip_number_suffixes(token)
+        next_is_counter = i + 1 < len(tokens) and tokens[i + 1].startswith(COUNTERS)
+        if word in NATIVE_DETERMINERS:
+            if has_counter or next_is_counter:
+                numbers.append(NATIVE_DETERMINERS[word])
+            continue
+        value = parse_korean_number(word)
+        if value is None:
+            continue
+        is_sino = all(ch in SINO_DIGITS or ch in SINO_UNITS for ch in word)
+        if is_sino and word != token and not (has_counter or next_is_counter):
+            continue
+        if split_digits and all(ch in SINO_DIGITS for ch in word):
+            numbers.extend(SINO_DIGITS[ch] for ch in word)
+        elif numbers and value < 10 and word in NATIVE_UNITS and i > 0 and tokens[i - 1] in NATIVE_TENS:
+            numbers[-1] += value  # '열 다섯' -> 15
+        else:
+            numbers.append(value)
+    return numbers
+
+
+def grade_locally(correct_answer: str, user_answer: str) -> bool | None:
+    """정답 형식에 맞는 규칙으로 채점합니다. 규칙만으로 확실히 판단할 수 없으면 None을 반환합니다."""
+    correct_answer = str(correct_answer).strip()
+    verdict = _grade_by_kind(correct_answer, user_answer)
+    if verdict is None and any(marker in normalize_text(user_answer) for marker in DONT_KNOW_MARKERS):
+        return False
+    return verdict
+
+
+class QuizGrader:
+    """
+    규칙 채점 -> LLM 판정 메모 -> LLM 순서로 채점합니다.
+    LLM 판정은 (퀴즈 id, 정규화된 답변) 단위로 LRU에 보관해, 같은 문제에 같은 답을 하면 다시 묻지 않습니다.
+    """
+    def __init__(self, memo_max_items: int):
+        self.memo_max_items = memo_max_items
+        self._memo: OrderedDict[tuple[int, str], bool] = OrderedDict()
+
+        self.local = 0
+        self.memo_hits = 0
+        self.llm_calls = 0
+
+    async def grade(self, quiz: QuizRecord, user_answer: str, llm_module=None) -> tuple[bool, str | None]:
+        """(정답 여부, LLM이 만든 피드백)을 반환합니다. 피드백이 None이면 호출자가 quiz_prompts.json 템플릿을 사용합니다."""
+        correct_answer = str(quiz.answer)
+        verdict = grade_locally(correct_answer, user_answer)
+        if verdict is not None:
+            self.local += 1
+            return verdict, None
+
+        key = (quiz.id, normalize_text(user_answer))
+        memoized = self._memo.get(key)
+        if memoized is not None:
+            self._memo.move_to_end(key)
+            self.memo_hits += 1
+            return memoized, None
+
+        if llm_module is None:
+            return key[1] == normalize_text(correct_answer), None
+        try:
+            self.llm_calls += 1
+            feedback_text, verdict = await llm_module.get_quiz_feedback(
+                question=quiz.question_text,
+                user_answer=user_answer,
+                correct_answer=correct_answer,
+                raise_on_error=True
+            )
+        except Exception as e:
+            # LLM 실패 시 판정은 기억하지 않고, 정답이 답변에 들어 있는지만 봅니다.
+            print(f"❌ LLM 퀴즈 채점 오류: {e}")
+            return normalize_text(correct_answer) in key[1], None
+
+        self._memo[key] = verdict
+        while len(self._memo) > self.memo_max_items:
+            self._memo.popitem(last=False)
+        return verdict, feedback_text or None
+
+    def stats(self) -> dict:
+        graded = self.local + self.memo_hits + self.llm_calls
+        return {
+            "memo_items": len(self._memo),
+            "local": self.local,
+            "memo_hits": self.memo_hits,
+            "llm_calls": self.llm_calls,
+            "local_rate": round((self.local + self.memo_hits) / graded, 4) if graded else 0.0,
+        }
+
+
+# --- Internal ---
+
+def _strip_number_suffixes(token: str) -> tuple[str, bool]:
+    """'여덟개요' -> ('여덟', True), '여덟이요' -> ('여덟', False). 단어가 빈 문자열이 되도록 떼지는 않습니다."""
+    has_counter = False
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in NUMBER_SUFFIXES:
+            if token.endswith(suffix) and len(token) > len(suffix):
+                token = token[:-len(suffix)]
+                has_counter = has_counter or suffix in COUNTERS
+                stripped = True
+                break
+    return token, has_counter
+
+def _matches_word(answer_text: str, user_text: str) -> bool:
+    """정규화된 답변이 말머리를 뗀 뒤 정답 그대로이거나 정답 + 조사/어미인지 확인합니다. ('서울이요' O, '서울 말고 부산' X)"""
+    while True:
+        if user_text.startswith(answer_text) and user_text[len(answer_text):] in ANSWER_ENDINGS:
+            return True
+        prefix = next((p for p in ANSWER_PREFIXES if user_text.startswith(p) and len(user_text) > len(p)), None)
+        if prefix is None:
+            return False
+        user_text = user_text[len(prefix):]
+
+def _is_negated(user_answer: str) -> bool:
+    text = normalize_text(user_answer)
+    return any(marker in text for marker in NEGATION_MARKERS) or "안" in _TOKEN.findall(str(user_answer))
+
+def _grade_by_kind(correct_answer: str, user_answer: str) -> bool | None:
+    user_text = normalize_text(user_answer)
+    if not user_text:
+        return None
+
+    # 여러 정답 중 하나 ("나비 / 나라 / 나무"): 나열된 것 외의 답도 맞을 수 있어 불일치는 LLM에 맡깁니다.
+    if ALTERNATIVE_SEPARATOR in correct_answer:
+        alternatives = [normalize_text(a) for a in correct_answer.split(ALTERNATIVE_SEPARATOR) if normalize_text(a)]
+        if any(_matches_word(a, user_text) for a in alternatives) and not _is_negated(user_answer):
+            return True
+        return None
+
+    # 숫자 또는 단어 나열 ("9, 2, 7", "사과, 의자, 하늘")
+    items = [item.strip() for item in correct_answer.split(SEQUENCE_SEPARATOR) if item.strip()]
+    if len(items) > 1:
+        if all(item.isdigit() for item in items):
+            return _grade_number_sequence([int(item) for item in items], user_answer)
+        return _grade_word_sequence([normalize_text(item) for item in items], user_text)
+
+    # 숫자 하나 ("8")
+    if correct_answer.isdigit():
+        numbers = extract_numbers(user_answer)
+        if not numbers:
+            return None
+        if all(n == int(correct_answer) for n in numbers):
+            return True
+        if int(correct_answer) not in numbers:
+            return False
+        return None  # "7 빼기 2는 5"처럼 문제의 숫자를 함께 말한 경우
+
+    # 짧은 단어/문장 ("서울", "작다")
+    answer_text = normalize_text(correct_answer)
+    if not answer_text or _is_negated(user_answer):
+        return None
+    if _matches_word(answer_text, user_text):
+        return True
+    # 용언은 활용형도 인정합니다. ("작다" -> "작아요")
+    if len(answer_text) >= 2 and answer_text.endswith("다"):
+        stem = answer_text[:-1]
+        if user_text.startswith(stem) and len(user_text) <= len(stem) + 3:
+            return True
+    return None
+
+def _grade_number_sequence(expected: list[int], user_answer: str) -> bool | None:
+    numbers = extract_numbers(user_answer, split_digits=all(n < 10 for n in expected))
+    if numbers == expected:
+        return True
+    if len(numbers) == len(expected):
+        return False
+    return None
+
+def _grade_word_sequence(expected: list[str], user_text: str) -> bool | None:
+    position = 0
+    in_order = True
+    for item in expected:
+        found = user_text.find(item, position)
+        if found < 0:
+            in_order = False
+            break
+        position = found + len(item)
+    if in_order:
+        return True
+    present = sum(1 for item in expected if item in user_text)
+    if present == len(expected):
+        return None  # 모두 말했지만 순서가 다름: 순서를 묻는 문제인지 알 수 없어 LLM에 맡깁니다.
+    if present * 2 <= len(expected):
+        return False
+    return None
+
+
+# 서버 전체에서 공유하는 채점기 (LLM 판정 메모 포함)
+quiz_grader = QuizGrader(memo_max_items=settings.QUIZ_GRADE_MEMO_MAX_ITEMS)
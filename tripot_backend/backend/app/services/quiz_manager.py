@@ -2,24 +2,27 @@
 
 import json
 import random
-import pandas as pd
 import uuid
 import asyncio
 
+from app.services.prompt_registry import prompt_registry
+from app.services.quiz_bank import QuizBankStore, QuizRecord
+from app.services.quiz_selector import quiz_selector
+from app.services.quiz_grader import quiz_grader
+
 # 이 파일은 이제 DB에 직접 접근하지 않으므로, sqlalchemy 관련 임포트는 제거합니다.
 
 class QuizManager:
     """
     퀴즈의 논리와 상태를 관리합니다. (DB 접근 로직 제거)
     """
-    def __init__(self, quizzes_df: pd.DataFrame, prompts_file_path: str, llm_module=None):
-        self.all_quizzes = quizzes_df
-        self.quiz_prompts = self._load_prompts(prompts_file_path)
+    def __init__(self, quiz_bank: QuizBankStore, llm_module=None):
+        self.quiz_bank = quiz_bank  # 모든 세션이 공유하는 문제 은행 (문제는 start_quiz 시점의 은행에서 고름)
         self.llm_module = llm_module
 
         # 퀴즈 상태 변수들
         self.is_quiz_active = False
-        self.current_quizzes = []
+        self.current_quizzes: list[QuizRecord] = []
         self.current_quiz_index = 0
         self.correct_answers_count = 0
         self.current_quiz_session_id = None
@@ -28,18 +31,15 @@ class QuizManager:
         if self.llm_module is None:
             print("⚠️ 경고: QuizManager에 LLM 모듈이 제공되지 않았습니다.")
 
-    def _load_prompts(self, prompts_file_path: str) -> dict:
-        """프롬프트 JSON 파일을 로드합니다."""
-        try:
-            with open(prompts_file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"❌ 퀴즈 프롬프트 파일 로드 오류 ('{prompts_file_path}'): {e}")
-            return {}
+    @property
+    def quiz_prompts(self) -> dict:
+        """공유 프롬프트 레지스트리의 퀴즈 프롬프트 (파일이 바뀌면 자동으로 다시 읽힘)"""
+        return prompt_registry.quiz_prompts()
 
     def start_quiz(self, user_id: str, num_quizzes: int = 1) -> tuple[str, str | None]:
         """퀴즈를 시작하고 (시작 메시지, 첫 문제)를 반환합니다."""
-        if self.all_quizzes.empty:
+        bank = self.quiz_bank.current
+        if not len(bank):
             return "죄송해요, 아직 퀴즈가 준비되지 않았어요.", None
 
         self.is_quiz_active = True
@@ -48,8 +48,8 @@ class QuizManager:
         self.user_id = user_id
         self.current_quiz_session_id = str(uuid.uuid4())
 
-        num_to_sample = min(num_quizzes, len(self.all_quizzes))
-        self.current_quizzes = self.all_quizzes.sample(n=num_to_sample).to_dict(orient='records')
+        # 사용자가 아직 안 푼 문제부터, 최근 오답이 많은 주제에 가중치를 두어 고릅니다.
+        self.current_quizzes = quiz_selector.select(user_id, bank, num_quizzes)
         
         start_msg = random.choice(self.quiz_prompts.get('quiz_start_prompts', ["퀴즈 시작!"]))
         start_msg = start_msg.format(num_quizzes=len(self.current_quizzes))
@@ -67,7 +67,7 @@ class QuizManager:
         return template.format(
             current_quiz_number=self.current_quiz_index + 1,
             total_quizzes=len(self.current_quizzes),
-            question_text=current_quiz['question_text']
+            question_text=current_quiz.question_text
         )
 
     async def process_answer(self, user_answer: str) -> tuple[str, dict | None]:
@@ -78,15 +78,16 @@ class QuizManager:
             return "지금은 퀴즈 진행 중이 아니에요.", None
 
         current_quiz = self.current_quizzes[self.current_quiz_index]
-        correct_answer = str(current_quiz['answer'])
+        correct_answer = str(current_quiz.answer)
         
         feedback_text, is_correct = await self._get_feedback_and_correctness(current_quiz, user_answer, correct_answer)
+        quiz_selector.record_result(self.user_id, current_quiz, is_correct)
 
         # DB에 저장할 결과 데이터 생성
         result_to_save = {
             "user_id": self.user_id,
-            "quiz_id": current_quiz['id'],
-            "question_text": current_quiz['question_text'],
+            "quiz_id": current_quiz.id,
+            "question_text": current_quiz.question_text,
             "user_answer": user_answer,
             "correct_answer": correct_answer,
             "is_correct": is_correct,
@@ -102,25 +103,19 @@ class QuizManager:
         return final_response, result_to_save
 
     async def _get_feedback_and_correctness(self, current_quiz, user_answer, correct_answer) -> tuple[str, bool]:
-        """LLM 또는 규칙 기반으로 피드백과 정답 여부를 결정합니다."""
-        is_correct = False
-        if self.llm_module:
-            feedback_text, is_correct = await self.llm_module.get_quiz_feedback(
-                question=current_quiz['question_text'],
-                user_answer=user_answer,
-                correct_answer=correct_answer
-            )
-            if is_correct:
-                self.correct_answers_count += 1
+        """
+        규칙 채점으로 정답 여부를 정하고, 규칙으로 판단할 수 없는 답변만 LLM에 묻습니다. (quiz_grader)
+        LLM이 피드백을 만들지 않은 경우에는 quiz_prompts.json의 템플릿으로 피드백을 만듭니다.
+        """
+        is_correct, feedback_text = await quiz_grader.grade(current_quiz, user_answer, self.llm_module)
+        if is_correct:
+            self.correct_answers_count += 1
+        if feedback_text:
             return feedback_text, is_correct
-        else: # LLM 없을 때의 기본 로직
-            if str(user_answer).strip().lower() == correct_answer.strip().lower():
-                is_correct = True
-                self.correct_answers_count += 1
-                return random.choice(self.quiz_prompts.get('quiz_correct_feedback', ["정답!"])), True
-            else:
-                feedback = random.choice(self.quiz_prompts.get('quiz_incorrect_feedback', ["아쉽네요."]))
-                return feedback.format(correct_answer=correct_answer), False
+        if is_correct:
+            return random.choice(self.quiz_prompts.get('quiz_correct_feedback', ["정답!"])), True
+        feedback = random.choice(self.quiz_prompts.get('quiz_incorrect_feedback', ["아쉽네요."]))
+        return feedback.format(correct_answer=correct_answer), False
 
     def _get_next_message(self) -> str:
         """다음 문제 또는 퀴즈 종료 메시지를 반환합니다."""
@@ -0,0 +1,197 @@
+# app/services/quiz_selector.py
+# 사용자별로 이미 낸 문제를 비트맵으로 기억해, 안 푼 문제부터 주제를 고루 섞어 출제하는 모듈
+# 최근 오답이 많은 주제(quiz_daily_rollup)일수록 더 자주 뽑힙니다.
+
+import random
+import asyncio
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from app.core.config import settings
+from app.db import async_crud
+from app.db.database import AsyncSessionLocal
+from app.services.quiz_bank import QuizBank, QuizRecord
+
+
+class SeenBitmap:
+    """문제 은행의 위치(QuizBank.ordinals)를 비트 번호로 쓰는 집합. 크기는 문제 수로 고정되어 5만 문제여도 사용자당 약 6KB입니다."""
+    __slots__ = ("bits",)
+
+    def __init__(self, size: int, ordinals=()):
+        self.bits = bytearray((size + 7) >> 3)
+        for ordinal in ordinals:
+            self.add(ordinal)
+
+    def add(self, ordinal: int):
+        self.bits[ordinal >> 3] |= 1 << (ordinal & 7)
+
+    def __contains__(self, ordinal: int) -> bool:
+        return bool(self.bits[ordinal >> 3] & (1 << (ordinal & 7)))
+
+    def __iter__(self):
+        for byte_index, byte in enumerate(self.bits):
+            if byte:
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield (byte_index << 3) | bit
+
+    def clear(self):
+        self.bits = bytearray(len(self.bits))
+
+
+class UserQuizState:
+    """
+    한 사용자의 출제 상태.
+    seen은 지금 묶인 은행(bank)의 위치 기준 비트맵이며, 은행이 다시 적재되면 bind()가 퀴즈 id를 거쳐 새 위치로 옮깁니다.
+    cursors[topic] = (시작 위치, 지금까지 지나온 수): 은행의 주제별 (섞인) 순서를 시작 위치부터 한 바퀴 돌며 안 푼 문제를 찾습니다.
+    지나온 위치는 다시 보지 않으므로 문제 하나를 고르는 비용은 분할 상환 O(1)입니다.
+    """
+    __slots__ = ("answered_ids", "seen", "topic_misses", "bank", "cursors")
+
+    def __init__(self, answered_ids: list[int], topic_misses: dict[str, int]):
+        self.answered_ids = answered_ids  # 처음 은행에 묶기 전까지만 보관
+        self.seen = SeenBitmap(0)
+        self.topic_misses = topic_misses
+        self.bank: QuizBank | None = None
+        self.cursors: dict[str, tuple[int, int]] = {}
+
+    def bind(self, bank: QuizBank):
+        """
+        state를 bank에 묶습니다. 은행이 바뀌면 위치도 바뀌므로 푼 문제를 id로 옮기고 순회를 새로 시작합니다.
+        (사용자마다 은행이 바뀐 뒤 처음 출제할 때 한 번, 문제 수에 비례하는 비용)
+        """
+        if self.bank is None:
+            seen_ids = self.answered_ids
+            self.answered_ids = []
+        else:
+            seen_ids = [self.bank.records[ordinal].id for ordinal in self.seen]
+        self.seen = SeenBitmap(len(bank), (bank.ordinals[quiz_id] for quiz_id in seen_ids if quiz_id in bank.ordinals))
+        self.reset_cursors(bank)
+
+    def reset_cursors(self, bank: QuizBank):
+        self.bank = bank
+        self.cursors = {topic: (random.randrange(len(positions)), 0) for topic, positions in bank.topic_index.items()}
+
+    def mark_seen(self, record: QuizRecord):
+        self.seen.add(self.bank.ordinals[record.id])
+
+    def has_unseen(self, topic: str) -> bool:
+        return self.cursors[topic][1] < len(self.bank.topic_index[topic])
+
+    def next_unseen(self, topic: str) -> QuizRecord | None:
+        positions = self.bank.topic_index[topic]
+        start, walked = self.cursors[topic]
+        while walked < len(positions):
+            position = positions[(start + walked) % len(positions)]
+            walked += 1
+            if position not in self.seen:
+                self.cursors[topic] = (start, walked)
+                return self.bank.records[position]
+        self.cursors[topic] = (start, walked)
+        return None
+
+
+class QuizSelector:
+    """
+    사용자별 UserQuizState를 LRU로 보관합니다.
+    상태는 세션이 시작될 때 load()로 한 번 만들고(푼 문제 id + 최근 주제별 오답 수), 이후에는 출제/채점 때마다 메모리에서 갱신하므로
+    퀴즈를 시작할 때 quiz_results를 훑지 않습니다.
+    """
+    def __init__(self, max_users: int, miss_lookback_days: int, miss_weight: float):
+        self.max_users = max_users
+        self.miss_lookback_days = miss_lookback_days
+        self.miss_weight = miss_weight
+        self._states: OrderedDict[str, UserQuizState] = OrderedDict()
+        self._loading: dict[str, asyncio.Task] = {}
+
+        self.loads = 0
+        self.round_resets = 0
+
+    async def load(self, user_id: str):
+        """사용자의 출제 상태가 메모리에 없으면 DB에서 만들어 둡니다. 동시에 여러 번 불려도 조회는 한 번만 합니다."""
+        if user_id in self._states:
+            self._states.move_to_end(user_id)
+            return
+        task = self._loading.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self._load_state(user_id))
+            self._loading[user_id] = task
+            task.add_done_callback(lambda _: self._loading.pop(user_id, None))
+        await asyncio.shield(task)
+
+    def select(self, user_id: str, bank: QuizBank, k: int) -> list[QuizRecord]:
+        """
+        안 푼 문제 k개를 고릅니다. 주제는 한 퀴즈 안에서 겹치지 않게 고르되(모든 주제를 쓰면 다시 허용),
+        가중치 1 + QUIZ_MISS_WEIGHT * 최근 오답 수에 비례해 뽑습니다.
+        모든 문제를 다 풀었으면 푼 기록을 비우고 새 바퀴를 시작합니다. 상태가 아직 없으면 무작위로 고릅니다.
+        """
+        state = self._states.get(user_id)
+        if state is None or not len(bank):
+            return bank.sample(k)
+        if state.bank is not bank:
+            state.bind(bank)
+
+        chosen: list[QuizRecord] = []
+        used_topics: set[str] = set()
+        while len(chosen) < min(k, len(bank)):
+            topics = [topic for topic in bank.topic_index if state.has_unseen(topic)]
+            if not topics:
+                state.seen.clear()
+                for record in chosen:
+                    state.mark_seen(record)
+                state.reset_cursors(bank)
+                self.round_resets += 1
+                continue
+            fresh_topics = [topic for topic in topics if topic not in used_topics]
+            if not fresh_topics:
+                used_topics.clear()
+                fresh_topics = topics
+            topic = random.choices(fresh_topics, weights=[self._topic_weight(state, topic) for topic in fresh_topics])[0]
+            record = state.next_unseen(topic)
+            if record is None:
+                continue
+            state.mark_seen(record)
+            used_topics.add(topic)
+            chosen.append(record)
+        return chosen
+
+    def record_result(self, user_id: str, record: QuizRecord, is_correct: bool):
+        """채점 결과를 오답 가중치에 반영합니다."""
+        state = self._states.get(user_id)
+        if state is not None and not is_correct:
+            state.topic_misses[record.topic] = state.topic_misses.get(record.topic, 0) + 1
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._states),
+            "loads": self.loads,
+            "round_resets": self.round_resets,
+        }
+
+    # --- Internal ---
+
+    async def _load_state(self, user_id: str):
+        try:
+            async with AsyncSessionLocal() as db:
+                answered_ids = await async_crud.fetch_answered_quiz_ids(db, user_id)
+                since = date.today() - timedelta(days=self.miss_lookback_days)
+                topic_misses = await async_crud.fetch_topic_misses_since(db, user_id, since)
+        except Exception as e:
+            print(f"⚠️ [{user_id}] 퀴즈 출제 기록 로드 실패 (무작위 출제): {e}")
+            return
+        self._states[user_id] = UserQuizState(answered_ids, topic_misses)
+        self._states.move_to_end(user_id)
+        self.loads += 1
+        while len(self._states) > self.max_users:
+            self._states.popitem(last=False)
+
+    def _topic_weight(self, state: UserQuizState, topic: str) -> float:
+        return 1.0 + self.miss_weight * state.topic_misses.get(topic, 0)
+
+
+# 서버 전체에서 공유하는 출제 엔진
+quiz_selector = QuizSelector(
+    max_users=settings.QUIZ_SELECTOR_MAX_USERS,
+    miss_lookback_days=settings.QUIZ_MISS_LOOKBACK_DAYS,
+    miss_weight=settings.QUIZ_MISS_WEIGHT,
+)
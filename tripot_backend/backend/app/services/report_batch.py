@@ -0,0 +1,200 @@
+# app/services/report_batch.py
+# 일일 리포트를 실시간 호출 대신 배치 파일(JSONL)로 처리하기 위한 모듈
+#   1) write_batch_file   : 날짜별 누적 요약(없으면 나눠 읽은 대화 원문 조각) + 리포트 프롬프트로 요청 JSONL을 만듭니다. (OpenAI Batch API 입력 형식)
+#   2) process_batch_locally: 테스트용으로 LLM 없이 결과 JSONL을 채웁니다.
+#   3) ingest_results     : 결과 JSONL을 읽어 summaries 테이블에 일괄 저장합니다.
+
+import re
+import copy
+import json
+from collections import Counter
+from datetime import date
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.db import async_crud, crud
+from app.db.database import AsyncSessionLocal, SessionLocal
+from app.services import ai_service, report_summarizer
+from app.services.prompt_registry import prompt_registry
+from app.services.report_cache import report_cache
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+CUSTOM_ID_SEPARATOR = "|"
+INGEST_COMMIT_EVERY = 500  # 결과를 저장할 때 이만큼마다 커밋
+
+
+_PART_SUFFIX = re.compile(r"\|(\d+)/(\d+)$")
+
+
+def make_custom_id(target_date: date, user_id: str, part: int = 1, parts: int = 1) -> str:
+    """'<날짜>|<사용자>' 형식이며, 긴 대화를 나눈 요청이면 뒤에 '|<조각 번호>/<조각 수>'가 붙습니다."""
+    custom_id = f"{target_date.isoformat()}{CUSTOM_ID_SEPARATOR}{user_id}"
+    return f"{custom_id}{CUSTOM_ID_SEPARATOR}{part}/{parts}" if parts > 1 else custom_id
+
+def parse_custom_id(custom_id: str) -> tuple[date, str, int, int]:
+    """custom_id를 (날짜, 사용자, 조각 번호, 조각 수)로 나눕니다."""
+    date_part, rest = custom_id.split(CUSTOM_ID_SEPARATOR, 1)
+    part, parts = 1, 1
+    match = _PART_SUFFIX.search(rest)
+    if match:
+        part, parts = int(match.group(1)), int(match.group(2))
+        rest = rest[:match.start()]
+    return date.fromisoformat(date_part), rest, part, parts
+
+
+def build_batch_request(target_date: date, user_id: str, conversation_text: str, from_digest: bool = False,
+                        part: int = 1, parts: int = 1) -> dict | None:
+    """한 사용자의 하루치(또는 그 한 조각) 리포트 요청 한 줄을 만듭니다. 대화 내용이나 프롬프트가 없으면 None을 반환합니다."""
+    messages = ai_service.build_report_messages(conversation_text, from_digest)
+    if messages is None:
+        return None
+    return {
+        "custom_id": make_custom_id(target_date, user_id, part, parts),
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": ai_service.REPORT_MODEL,
+            "response_format": {"type": "json_object"},
+            "messages": messages,
+        },
+    }
+
+
+async def write_batch_file(path: str, target_dates: list[date], force: bool = False) -> int:
+    """target_dates에 대화한 사용자들의 리포트 요청을 JSONL 파일로 쓰고, 쓴 요청 수를 반환합니다."""
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for target_date in target_dates:
+            async with AsyncSessionLocal() as db:
+                user_ids = await async_crud.get_user_ids_with_convos_on_date(db, target_date, exclude_summarized=not force)
+                for user_id in user_ids:
+                    # 대화가 길면 조각마다 요청을 하나씩 만들고, 결과를 저장할 때 다시 합칩니다.
+                    report_inputs, from_digest = await report_summarizer.fetch_report_inputs(db, user_id, target_date)
+                    for part, report_input in enumerate(report_inputs, 1):
+                        request = build_batch_request(target_date, user_id, report_input, from_digest, part, len(report_inputs))
+                        if request is None:
+                            continue
+                        f.write(json.dumps(request, ensure_ascii=False) + "\n")
+                        written += 1
+            print(f"📝 [{target_date}] 요청 {len(user_ids)}건 확인, 누적 {written}건 작성")
+    return written
+
+
+def process_batch_locally(requests_path: str, results_path: str) -> int:
+    """
+    LLM을 호출하지 않고 결과 JSONL을 채우는 테스트용 처리기입니다.
+    리포트 형식(OUTPUT_FORMAT)의 틀에 사용자 발화 일부와 자주 나온 단어를 채워 넣습니다.
+    """
+    output_format = prompt_registry.report_output_format()
+    processed = 0
+    with open(requests_path, 'r', encoding='utf-8') as src, open(results_path, 'w', encoding='utf-8') as dst:
+        for line in src:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            conversation_text = request["body"]["messages"][-1]["content"]
+            report = _local_report(output_format, conversation_text)
+            result = {
+                "id": f"local-{processed}",
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": {"choices": [{"message": {"role": "assistant", "content": json.dumps(report, ensure_ascii=False)}}]},
+                },
+                "error": None,
+            }
+            dst.write(json.dumps(result, ensure_ascii=False) + "\n")
+            processed += 1
+    return processed
+
+
+def ingest_results(results_path: str) -> dict:
+    """
+    결과 JSONL을 읽어 성공한 리포트를 summaries 테이블에 저장하고, 저장/실패 건수를 반환합니다.
+    여러 조각으로 나뉜 요청은 모든 조각이 성공했을 때만 합쳐서 저장합니다.
+    실패한 요청이나 형식이 잘못된 줄, 저장에 실패한 줄은 건너뛰고 failures에 모읍니다. (같은 파일을 다시 넣어도 덮어쓰기이므로 안전)
+    줄마다 SAVEPOINT 안에서 저장하므로 한 줄이 실패해도 같은 배치의 다른 줄은 그대로 남습니다.
+    """
+    saved = 0
+    failures: list[tuple[str, str]] = []
+    partial_reports: dict[tuple[date, str], dict[int, dict]] = {}
+    failed_groups: set[tuple[date, str]] = set()
+    uncommitted_users: set[str] = set()  # 커밋한 뒤에 리포트 캐시를 무효화할 사용자
+    db = SessionLocal()
+    try:
+        with open(results_path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                custom_id = f"line {line_no}"
+                group = None
+                try:
+                    result = json.loads(line)
+                    custom_id = result.get("custom_id", custom_id)
+                    target_date, user_id, part, parts = parse_custom_id(custom_id)
+                    group = (target_date, user_id)
+                    report_json = _extract_report(result)
+                except (ValueError, KeyError, IndexError, TypeError) as e:
+                    failures.append((custom_id, f"{type(e).__name__}: {e}"))
+                    if group is not None:
+                        failed_groups.add(group)
+                        partial_reports.pop(group, None)
+                    continue
+
+                if group in failed_groups:
+                    continue
+                if parts > 1:
+                    received = partial_reports.setdefault(group, {})
+                    received[part] = report_json
+                    if len(received) < parts:
+                        continue
+                    report_json = report_summarizer.merge_partial_reports([received[i] for i in sorted(received)])
+                    del partial_reports[group]
+
+                try:
+                    with db.begin_nested():
+                        crud.save_summary(db, user_id, target_date, report_json, commit=False)
+                except SQLAlchemyError as e:
+                    failures.append((make_custom_id(target_date, user_id), f"{type(e).__name__}: {e}"))
+                    continue
+                saved += 1
+                uncommitted_users.add(user_id)
+                if saved % INGEST_COMMIT_EVERY == 0:
+                    _commit_and_invalidate(db, uncommitted_users)
+        _commit_and_invalidate(db, uncommitted_users)
+    finally:
+        db.close()
+
+    for (target_date, user_id), received in partial_reports.items():
+        failures.append((make_custom_id(target_date, user_id), f"조각 일부만 도착했습니다. (받은 조각 {sorted(received)})"))
+    return {"saved": saved, "failed": len(failures), "failures": failures}
+
+
+# --- Internal ---
+
+def _commit_and_invalidate(db, user_ids: set[str]):
+    db.commit()
+    for user_id in user_ids:
+        report_cache.invalidate_user(user_id)
+    user_ids.clear()
+
+def _extract_report(result: dict) -> dict:
+    """배치 결과 한 줄에서 리포트 JSON을 꺼냅니다. 실패한 요청이면 ValueError를 발생시킵니다."""
+    if result.get("error"):
+        raise ValueError(f"요청 실패: {result['error']}")
+    response = result.get("response") or {}
+    if response.get("status_code") != 200:
+        raise ValueError(f"응답 코드 {response.get('status_code')}")
+    content = response["body"]["choices"][0]["message"]["content"]
+    return json.loads(content)
+
+_WORD = re.compile(r"[0-9A-Za-z가-힣]{2,}")
+
+def _local_report(output_format: dict, user_prompt: str) -> dict:
+    user_lines = [line.split(":", 1)[1].strip() for line in user_prompt.splitlines() if line.startswith("사용자:")]
+    keywords = [word for word, _ in Counter(_WORD.findall(" ".join(user_lines))).most_common(3)]
+    report = copy.deepcopy(output_format)
+    report.setdefault("일일_대화_요약", {})
+    report["일일_대화_요약"]["요약"] = " ".join(user_lines)[:200]
+    report["키워드_분석"] = keywords
+    return report
@@ -0,0 +1,103 @@
+# app/services/report_cache.py
+# 가족 앱이 자주 조회하는 어르신별 리포트 응답(홈/상세)을 메모리에 캐싱하는 모듈
+# 리포트의 재료(summaries, quiz_results, daily_qa)를 쓰는 서비스/엔드포인트가 커밋한 뒤 해당 항목을 무효화합니다.
+# (커밋 전에 무효화하면 동시에 조회한 쪽이 이전 내용을 새 세대 번호로 다시 캐시할 수 있습니다.)
+
+import time
+import threading
+from collections import OrderedDict
+
+from app.core.config import settings
+
+HOME_REPORT = "home"
+FULL_REPORT = "full"
+
+
+class ReportCache:
+    """
+    (리포트 종류, 어르신 user_id_str) -> 조립이 끝난 응답 딕셔너리를 보관하는 TTL + LRU 캐시입니다.
+    다른 프로세스(야간 리포트 스크립트 등)에서 쓴 내용은 무효화할 수 없으므로, 그 경우에는 TTL이 최대 지연 시간이 됩니다.
+    반환된 딕셔너리는 캐시와 공유되므로 호출자가 수정하면 안 됩니다.
+    """
+    def __init__(self, max_items: int, ttl_seconds: float):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str], tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        # 조회(DB) 도중에 무효화가 일어나면 그 결과를 캐시에 넣지 않도록 세대 번호를 둡니다.
+        self._user_generations: dict[str, int] = {}
+        self._global_generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_items > 0 and self.ttl_seconds > 0
+
+    def get(self, kind: str, user_id_str: str) -> dict | None:
+        if not self.enabled:
+            return None
+        key = (kind, user_id_str)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self, user_id_str: str) -> tuple[int, int]:
+        """조회를 시작하기 전에 받아 두었다가 put에 넘깁니다."""
+        with self._lock:
+            return self._global_generation, self._user_generations.get(user_id_str, 0)
+
+    def put(self, kind: str, user_id_str: str, payload: dict, generation: tuple[int, int]):
+        """generation을 받은 뒤 해당 어르신의 캐시가 무효화되었다면 저장하지 않습니다."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation != (self._global_generation, self._user_generations.get(user_id_str, 0)):
+                return
+            self._entries[(kind, user_id_str)] = (time.monotonic() + self.ttl_seconds, payload)
+            self._entries.move_to_end((kind, user_id_str))
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id_str: str):
+        """한 어르신의 모든 리포트 캐시를 지웁니다."""
+        with self._lock:
+            self._user_generations[user_id_str] = self._user_generations.get(user_id_str, 0) + 1
+            for kind in (HOME_REPORT, FULL_REPORT):
+                if self._entries.pop((kind, user_id_str), None) is not None:
+                    self.invalidations += 1
+
+    def invalidate_kind(self, kind: str):
+        """특정 종류의 리포트 캐시를 모두 지웁니다. (모든 어르신에게 공통인 '오늘의 질문'이 바뀐 경우 등)"""
+        with self._lock:
+            self._global_generation += 1
+            keys = [key for key in self._entries if key[0] == kind]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "items": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+# 서버 전체에서 공유하는 캐시 인스턴스
+report_cache = ReportCache(
+    max_items=settings.REPORT_CACHE_MAX_ITEMS,
+    ttl_seconds=settings.REPORT_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,109 @@
+# app/services/report_runner.py
+# 여러 날짜 x 여러 사용자의 일일 리포트를 동시에 생성하는 비동기 러너 (scripts/generate_reports.py에서 사용)
+
+import time
+import asyncio
+import traceback
+from datetime import date, timedelta
+
+from app.db import async_crud
+from app.db.database import AsyncSessionLocal
+from app.services import report_summarizer
+from app.services.report_cache import report_cache
+
+
+def date_range(start_date: date, end_date: date) -> list[date]:
+    """start_date부터 end_date까지(양 끝 포함) 날짜 목록을 반환합니다."""
+    return [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+
+class ReportRunner:
+    """
+    날짜별로 리포트가 필요한 사용자를 찾아, 최대 concurrency명까지 동시에 (누적 요약/대화 조회 -> LLM 분석 -> 저장)을 수행합니다.
+    리포트는 사용자마다 바로 커밋되므로, 작업이 중간에 멈춰도 다시 실행하면 이미 저장된 사용자는 건너뜁니다.
+    """
+    def __init__(self, concurrency: int, force: bool = False):
+        self.concurrency = concurrency
+        self.force = force  # True이면 이미 리포트가 있는 사용자도 다시 생성
+
+        self.generated = 0
+        self.skipped_existing = 0
+        self.empty = 0
+        self.from_digest = 0
+        self.chunked = 0
+        self.failures: list[tuple[date, str, str]] = []
+
+    async def run(self, target_dates: list[date]) -> dict:
+        """target_dates의 리포트를 생성하고 처리 결과 요약을 반환합니다."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+
+        for target_date in target_dates:
+            user_ids = await self._find_targets(target_date)
+            if not user_ids:
+                print(f"✅ [{target_date}] 리포트를 생성할 사용자가 없습니다.")
+                continue
+            print(f"👥 [{target_date}] {len(user_ids)}명의 리포트를 생성합니다. (동시 {self.concurrency}명)")
+            await asyncio.gather(*(self._process_user(semaphore, target_date, user_id) for user_id in user_ids))
+
+        return self.summary(time.perf_counter() - started)
+
+    def summary(self, elapsed_seconds: float) -> dict:
+        return {
+            "generated": self.generated,
+            "skipped_existing": self.skipped_existing,
+            "empty": self.empty,
+            "from_digest": self.from_digest,
+            "chunked": self.chunked,
+            "failed": len(self.failures),
+            "elapsed_seconds": round(elapsed_seconds, 1),
+            "reports_per_minute": round(self.generated / elapsed_seconds * 60, 1) if elapsed_seconds > 0 else 0.0,
+        }
+
+    # --- Internal ---
+
+    async def _find_targets(self, target_date: date) -> list[str]:
+        async with AsyncSessionLocal() as db:
+            user_ids = await async_crud.get_user_ids_with_convos_on_date(db, target_date)
+            if self.force:
+                return user_ids
+            pending = await async_crud.get_user_ids_with_convos_on_date(db, target_date, exclude_summarized=True)
+        skipped = len(user_ids) - len(pending)
+        if skipped:
+            self.skipped_existing += skipped
+            print(f"⏭️ [{target_date}] 이미 리포트가 있는 {skipped}명은 건너뜁니다.")
+        return pending
+
+    async def _process_user(self, semaphore: asyncio.Semaphore, target_date: date, user_id: str):
+        async with semaphore:
+            try:
+                # 누적 요약이 그날 대화를 모두 담고 있으면 원문 대신 요약에서 시작하고,
+                # 아니면 대화 원문을 토큰 예산 단위 조각으로 나눠 읽습니다.
+                async with AsyncSessionLocal() as db:
+                    report_inputs, from_digest = await report_summarizer.fetch_report_inputs(db, user_id, target_date)
+                if not report_inputs:
+                    self.empty += 1
+                    return
+                if from_digest:
+                    self.from_digest += 1
+                elif len(report_inputs) > 1:
+                    self.chunked += 1
+
+                # LLM 호출 동안에는 DB 연결을 잡고 있지 않습니다.
+                report_json = await report_summarizer.summarize(report_inputs, from_digest)
+                if not report_json:
+                    self._fail(target_date, user_id, "AI 리포트 생성 실패")
+                    return
+
+                async with AsyncSessionLocal() as db:
+                    await async_crud.save_summary(db, user_id, target_date, report_json)
+                report_cache.invalidate_user(user_id)
+                self.generated += 1
+                print(f"🎉 [{target_date}] 사용자 [{user_id}] 리포트 저장 완료 ({self.generated}건)")
+            except Exception as e:
+                self._fail(target_date, user_id, f"{type(e).__name__}: {e}")
+                traceback.print_exc()
+
+    def _fail(self, target_date: date, user_id: str, reason: str):
+        self.failures.append((target_date, user_id, reason))
+        print(f"❌ [{target_date}] 사용자 [{user_id}] 리포트 실패: {reason}")
@@ -3,16 +3,41 @@
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
 import json
-import pandas as pd
 
 from app.db import crud
+from app.services.report_cache import report_cache, HOME_REPORT, FULL_REPORT
 
 # --- Public Functions ---
 
 def get_home_screen_report(db: Session, user_id_str: str) -> dict:
     """
     사용자 ID로 최신 리포트를 조회하여 HomeScreen에 맞는 간략한 형태로 반환합니다.
+    (캐시에 있으면 DB 조회 없이 바로 반환합니다.)
     """
+    cached = report_cache.get(HOME_REPORT, user_id_str)
+    if cached is not None:
+        return cached
+
+    generation = report_cache.generation(user_id_str)
+    report_data = _build_home_screen_report(db, user_id_str)
+    report_cache.put(HOME_REPORT, user_id_str, report_data, generation)
+    return report_data
+
+def get_full_report(db: Session, user_id_str: str) -> dict:
+    """
+    최신 리포트와 인지 퀴즈 결과를 종합하여 ReportScreen에 맞는 상세 형태로 반환합니다.
+    (캐시에 있으면 DB 조회 없이 바로 반환합니다.)
+    """
+    cached = report_cache.get(FULL_REPORT, user_id_str)
+    if cached is not None:
+        return cached
+
+    generation = report_cache.generation(user_id_str)
+    report_data = _build_full_report(db, user_id_str)
+    report_cache.put(FULL_REPORT, user_id_str, report_data, generation)
+    return report_data
+
+def _build_home_screen_report(db: Session, user_id_str: str) -> dict:
     latest_summary = crud.get_latest_summary(db, user_id_str)
     
     if not latest_summary or not latest_summary.summary_json:
@@ -24,10 +49,7 @@ def get_home_screen_report(db: Session, user_id_str: str) -> dict:
 
     return _transform_summary_to_homescreen(summary_data, report_date)
 
-def get_full_report(db: Session, user_id_str: str) -> dict:
-    """
-    최신 리포트와 인지 퀴즈 결과를 종합하여 ReportScreen에 맞는 상세 형태로 반환합니다.
-    """
+def _build_full_report(db: Session, user_id_str: str) -> dict:
     # 1. 최신 대화 요약 리포트 가져오기
     latest_summary = crud.get_latest_summary(db, user_id_str)
     
@@ -60,41 +82,43 @@ def get_full_report(db: Session, user_id_str: str) -> dict:
     
     return summary_data
 
+def get_today_digest(db: Session, user_id_str: str) -> dict:
+    """
+    세션이 끝날 때마다 갱신되는 오늘의 누적 요약을 반환합니다. (야간 리포트 생성 전 당일 리포트용)
+    """
+    today = date.today()
+    digest = crud.get_daily_digest(db, user_id_str, today)
+    if not digest:
+        return {"report_date": str(today), "summary": "오늘은 아직 대화 요약이 없습니다.", "session_count": 0, "updated_at": None}
+
+    return {
+        "report_date": str(today),
+        "summary": digest.digest_text,
+        "session_count": digest.session_count,
+        "updated_at": digest.updated_at.isoformat() if digest.updated_at else None,
+    }
+
 # --- Helper Functions (Private) ---
 
 def _process_cognitive_data(db: Session, user_id_str: str, days_back: int) -> dict:
-    """DB에서 퀴즈 결과를 가져와 통계를 계산하고 가공합니다."""
+    """퀴즈 일별 집계(quiz_daily_rollup)를 주제별로 합산하여 인지 상태 통계를 만듭니다."""
     end_date = date.today()
     start_date = end_date - timedelta(days=days_back)
     
-    # crud를 통해 퀴즈 결과와 주제를 함께 가져옴
-    results = crud.fetch_quiz_results_with_topic(db, user_id_str, start_date, end_date)
+    # 기간 x 주제 수만큼의 작은 집계 행만 DB에서 합산해 옵니다.
+    topic_totals = crud.fetch_quiz_topic_totals(db, user_id_str, start_date, end_date)
     
-    if not results:
+    if not topic_totals:
         return _get_default_cognitive_report_data()
 
-    df_results = pd.DataFrame(results, columns=['is_correct', 'topic'])
-    
-    total_quizzes_count = len(df_results)
-    total_correct_count = int(df_results['is_correct'].sum())
-
-    topic_summary_list = []
-    if not df_results.empty:
-        topic_grouped = df_results.groupby('topic').agg(
-            total_for_topic=('is_correct', 'size'),
-            correct_for_topic=('is_correct', 'sum')
-        ).reset_index()
-        
-        topic_grouped['incorrect_for_topic'] = topic_grouped['total_for_topic'] - topic_grouped['correct_for_topic']
-        
-        # topic, total, incorrect 키를 가진 딕셔너리 리스트로 변환
-        topic_summary_list = topic_grouped[['topic', 'total_for_topic', 'incorrect_for_topic']].rename(
-            columns={'total_for_topic': 'total', 'incorrect_for_topic': 'incorrect'}
-        ).to_dict(orient='records')
+    topic_summary_list = [
+        {"topic": topic, "total": total, "incorrect": total - correct}
+        for topic, total, correct in topic_totals
+    ]
 
     return {
-        "total_quizzes_count": total_quizzes_count,
-        "total_correct_count": total_correct_count,
+        "total_quizzes_count": sum(total for _, total, _ in topic_totals),
+        "total_correct_count": sum(correct for _, _, correct in topic_totals),
         "topic_summary": topic_summary_list
     }
 
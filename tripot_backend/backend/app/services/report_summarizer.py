@@ -0,0 +1,141 @@
+# app/services/report_summarizer.py
+# 하루치 대화가 아주 긴 경우를 위한 map-reduce 리포트 요약
+#   map   : 대화 원문을 토큰 예산 단위 조각으로 나눠 조각마다 같은 리포트 형식(JSON)으로 동시에 요약
+#   reduce: 조각별 JSON을 리포트 형식 그대로 하나로 합침 (LLM 호출 없이)
+
+import copy
+import json
+import asyncio
+from datetime import date
+from typing import AsyncIterable
+
+from app.core.config import settings
+from app.db import async_crud
+from app.services import ai_service, daily_digest_service
+
+MEAL_TIME_KEY = "식사_시간"
+MEAL_MENTIONED_KEY = "언급_여부"
+RECOMMENDED_TOPICS_KEY = "자녀를_위한_추천_대화_주제"
+MAX_RECOMMENDED_TOPICS = 3
+TEXT_JOINER = " / "
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토큰 수를 글자 수로 어림합니다.
+    한글은 gpt-4o 토크나이저에서 대체로 한 글자가 한 토큰 이하이므로, 조각 크기를 넘기지 않는 보수적인 추정입니다.
+    """
+    return len(text)
+
+
+async def chunk_lines(lines: AsyncIterable[str], token_budget: int) -> list[str]:
+    """줄 단위로 읽으면서, 줄을 자르지 않고 token_budget을 넘지 않도록 묶은 조각 목록을 반환합니다."""
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    async for line in lines:
+        line_tokens = estimate_tokens(line) + 1  # 줄바꿈 포함
+        if current and current_tokens + line_tokens > token_budget:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+async def fetch_report_inputs(db, user_id_str: str, target_date: date) -> tuple[list[str], bool]:
+    """
+    야간 리포트에 넣을 텍스트 조각 목록과 누적 요약 사용 여부를 반환합니다.
+    그날 대화를 모두 담은 누적 요약이 있으면 [요약] 하나를, 없으면 대화 원문을 나눠 읽은 조각들을 돌려줍니다.
+    """
+    digest = await daily_digest_service.get_covering_digest(db, user_id_str, target_date)
+    if digest:
+        return [digest], True
+    lines = async_crud.stream_conversation_lines(db, user_id_str, target_date)
+    return await chunk_lines(lines, settings.REPORT_CHUNK_TOKEN_BUDGET), False
+
+
+async def summarize(inputs: list[str], from_digest: bool = False) -> dict | None:
+    """조각이 하나면 그대로, 여러 개면 동시에 요약한 뒤 합칩니다. 한 조각이라도 실패하면 None을 반환합니다."""
+    if not inputs:
+        return None
+    if len(inputs) == 1:
+        return await ai_service.generate_summary_report_async(inputs[0], from_digest)
+
+    semaphore = asyncio.Semaphore(settings.REPORT_CHUNK_CONCURRENCY)
+
+    async def summarize_chunk(chunk: str) -> dict | None:
+        async with semaphore:
+            return await ai_service.generate_summary_report_async(chunk, from_digest)
+
+    parts = await asyncio.gather(*(summarize_chunk(chunk) for chunk in inputs))
+    if any(part is None for part in parts):
+        # 일부 조각만으로 만든 리포트는 하루를 온전히 반영하지 못하므로 실패로 처리해 다시 시도하게 합니다.
+        return None
+    return merge_partial_reports(parts)
+
+
+def merge_partial_reports(parts: list[dict]) -> dict:
+    """
+    조각별 리포트(JSON)를 같은 형식의 리포트 하나로 합칩니다.
+    - 객체는 키별로 재귀적으로 합치고, 목록은 순서를 유지한 채 중복을 제거하며 이어 붙입니다.
+    - 문자열은 서로 다른 내용만 ' / '로 잇습니다.
+    - 식사 상태는 식사 시간별로 합치되 한 조각이라도 '있음'이면 그 조각의 내용을 씁니다.
+    - 추천 대화 주제는 앞에서부터 3개만 남깁니다.
+    """
+    merged: dict = {}
+    for part in parts:
+        merged = _merge_value(merged, part)
+    if isinstance(merged.get(RECOMMENDED_TOPICS_KEY), list):
+        merged[RECOMMENDED_TOPICS_KEY] = merged[RECOMMENDED_TOPICS_KEY][:MAX_RECOMMENDED_TOPICS]
+    return merged
+
+
+# --- Internal ---
+
+def _merge_value(current, new):
+    if current is None:
+        return copy.deepcopy(new)
+    if isinstance(current, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            current[key] = _merge_value(current.get(key), value)
+        return current
+    if isinstance(current, list) and isinstance(new, list):
+        if _is_meal_list(current) and _is_meal_list(new):
+            return _merge_meals(current, new)
+        return _merge_lists(current, new)
+    if isinstance(current, str) and isinstance(new, str):
+        if not new or new in current.split(TEXT_JOINER):
+            return current
+        return f"{current}{TEXT_JOINER}{new}" if current else new
+    return current
+
+def _merge_lists(current: list, new: list) -> list:
+    seen = {json.dumps(item, ensure_ascii=False, sort_keys=True) for item in current}
+    for item in new:
+        key = json.dumps(item, ensure_ascii=False, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            current.append(copy.deepcopy(item))
+    return current
+
+def _is_meal_list(items: list) -> bool:
+    return bool(items) and all(isinstance(item, dict) and MEAL_TIME_KEY in item for item in items)
+
+def _merge_meals(current: list[dict], new: list[dict]) -> list[dict]:
+    by_time = {item[MEAL_TIME_KEY]: item for item in current}
+    for item in new:
+        existing = by_time.get(item[MEAL_TIME_KEY])
+        if existing is None:
+            current.append(copy.deepcopy(item))
+            by_time[item[MEAL_TIME_KEY]] = current[-1]
+        elif existing.get(MEAL_MENTIONED_KEY) != "있음" and item.get(MEAL_MENTIONED_KEY) == "있음":
+            existing.clear()
+            existing.update(copy.deepcopy(item))
+        elif existing.get(MEAL_MENTIONED_KEY) == "있음" and item.get(MEAL_MENTIONED_KEY) == "있음":
+            # 같은 끼니가 여러 조각에 언급되면 세부 내용만 이어 붙입니다.
+            for key in ("감정", "세부_내용"):
+                existing[key] = _merge_value(existing.get(key), item.get(key, ""))
+    return current
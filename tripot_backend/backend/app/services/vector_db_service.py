@@ -2,39 +2,28 @@
 
 import uuid
 import time
-import asyncio
-from pinecone import Pinecone, ServerlessSpec
 
 from app.core.config import settings
+from app.core import metrics
 from . import ai_service # 개선된 ai_service를 임포트
+from .memory_store import create_memory_store, MemorySnapshot
 
-# Pinecone 클라이언트 초기화 및 인덱스 연결
-try:
-    pc = Pinecone(api_key=settings.PINECONE_API_KEY)
-    
-    if settings.PINECONE_INDEX_NAME not in pc.list_indexes().names():
-        print(f"Pinecone 인덱스 '{settings.PINECONE_INDEX_NAME}'가 없으므로 새로 생성합니다.")
-        pc.create_index(
-            name=settings.PINECONE_INDEX_NAME, 
-            dimension=1536,
-            metric="cosine", 
-            spec=ServerlessSpec(cloud="aws", region="us-east-1")
-        )
-    
-    index = pc.Index(settings.PINECONE_INDEX_NAME)
-    print(f"✅ Pinecone '{settings.PINECONE_INDEX_NAME}' 인덱스에 성공적으로 연결되었습니다.")
-except Exception as e:
-    print(f"❌ Pinecone 초기화 중 오류 발생: {e}")
-    index = None
+# 기억 저장소 초기화 (settings.MEMORY_STORE_BACKEND: 'pinecone' 또는 'local')
+memory_store = create_memory_store()
 
 
-async def create_memory_for_pinecone(user_id: str, current_session_log: list[str]):
-    """세션 대화 내용을 바탕으로 Pinecone에 기억을 저장합니다."""
-    if not index:
-        print("Pinecone 인덱스가 없어 기억을 저장할 수 없습니다.")
-        return
+USER_LINE_PREFIX = "사용자:"
 
-    if not current_session_log: return
+def has_user_turns(session_log: list[str]) -> bool:
+    """세션 로그에 사용자 발화가 하나라도 있는지 확인합니다. (시작 인사만 있는 세션은 제외)"""
+    return any(line.startswith(USER_LINE_PREFIX) for line in session_log)
+
+async def build_memory_vector(user_id: str, current_session_log: list[str]) -> dict | None:
+    """세션 대화 내용을 요약/임베딩하여 저장소에 넣을 벡터(id, values, metadata)를 만듭니다. 저장소가 없으면 만들지 않습니다."""
+    if not memory_store:
+        return None
+    if not current_session_log or not has_user_turns(current_session_log):
+        return None
     print(f"🧠 [{user_id}] 님의 세션 기억 생성을 시작합니다.")
 
     memory_text = ""
@@ -84,43 +73,59 @@ async def create_memory_for_pinecone(user_id: str, current_session_log: list[str
             'memory_type': memory_type
         }
     }
-    await asyncio.to_thread(index.upsert, vectors=[vector_to_upsert])
-    print(f"✅ [{user_id}] 님의 새로운 기억이 Pinecone에 저장되었습니다.")
+    return vector_to_upsert
+
+async def create_memory_from_session(user_id: str, current_session_log: list[str]):
+    """세션 대화 내용을 바탕으로 기억 저장소에 기억을 즉시 저장합니다. (웹소켓 종료 시에는 memory_worker 사용)"""
+    if not memory_store:
+        print("기억 저장소가 없어 기억을 저장할 수 없습니다.")
+        return
+
+    vector_to_upsert = await build_memory_vector(user_id, current_session_log)
+    if vector_to_upsert is None:
+        return
+    await memory_store.upsert([vector_to_upsert])
+    print(f"✅ [{user_id}] 님의 새로운 기억이 저장되었습니다.")
+
 
+async def prefetch_memories(user_id: str) -> MemorySnapshot | None:
+    """웹소켓 세션 시작 시 사용자의 기억 후보를 벡터와 함께 미리 불러옵니다."""
+    if not memory_store:
+        return None
+    try:
+        snapshot = await memory_store.fetch_candidates(user_id, settings.MEMORY_PREFETCH_LIMIT)
+        print(f"📥 [{user_id}] 님의 기억 후보 {len(snapshot) if snapshot else 0}개를 세션에 불러왔습니다.")
+        return snapshot
+    except Exception as e:
+        print(f"❌ [{user_id}] 기억 미리 불러오기 실패: {e}")
+        return None
 
-async def search_memories(user_id: str, query_message: str, top_k: int = 5) -> str:
-    """과거 기억을 검색하고, 관련도와 최신성을 고려하여 최종 기억 목록을 반환합니다."""
-    if not index:
-        print("Pinecone 인덱스가 없어 기억을 검색할 수 없습니다.")
+async def search_memories(user_id: str, query_message: str, top_k: int = 5, snapshot: MemorySnapshot | None = None) -> str:
+    """
+    과거 기억을 검색하고, 관련도와 최신성을 고려하여 최종 기억 목록을 반환합니다.
+    snapshot(세션에 미리 불러온 기억)이 있으면 먼저 로컬에서 순위를 매기고,
+    후보가 전체 기억이 아니면서 유사도가 낮을 때만 저장소에 다시 질의합니다.
+    """
+    if not memory_store:
+        print("기억 저장소가 없어 기억을 검색할 수 없습니다.")
         return ""
         
     query_embedding = await ai_service.get_embedding(query_message)
-    results = await asyncio.to_thread(
-        index.query, 
-        vector=query_embedding, 
-        top_k=top_k, 
-        filter={'user_id': user_id}, 
-        include_metadata=True
-    )
-    
-    if not results['matches']:
-        return ""
 
-    now = int(time.time())
     ranked_memories = []
-    time_decay_factor = 30 * 24 * 60 * 60  # 30일
+    with metrics.timed("vector_query"):
+        if snapshot is not None:
+            ranked_memories = snapshot.rank(query_embedding, top_k)
+            best_similarity = max((m['similarity'] for m in ranked_memories), default=0.0)
+            if not snapshot.complete and best_similarity < settings.MEMORY_PREFETCH_MIN_SIMILARITY:
+                ranked_memories = []
+
+        if not ranked_memories and (snapshot is None or not snapshot.complete):
+            ranked_memories = await memory_store.search(user_id, query_embedding, top_k)
+    if not ranked_memories:
+        return ""
 
-    for match in results['matches']:
-        similarity_score = match['score']
-        metadata = match.get('metadata', {})
-        timestamp = metadata.get('timestamp', now)
-        
-        recency_score = max(0, (timestamp - (now - time_decay_factor)) / time_decay_factor)
-        final_score = (similarity_score * 0.7) + (recency_score * 0.3)
-        ranked_memories.append({'text': metadata.get('text', ''), 'score': final_score})
-        
-    ranked_memories.sort(key=lambda x: x['score'], reverse=True)
     top_memories = [item['text'] for item in ranked_memories[:3]]
     
     print(f"🔍 [{user_id}] 님의 과거 기억 {len(top_memories)}개를 검색했습니다.")
-    return "\n".join(top_memories)
\ No newline at end of file
+    return "\n".join(top_memories)
@@ -0,0 +1,34 @@
+# scripts/backfill_quiz_rollup.py
+# 기존 quiz_results로 quiz_daily_rollup(사용자 x 날짜 x 주제별 풀이/정답 수)을 다시 만드는 스크립트
+# 테이블을 처음 도입할 때 한 번 실행하면, 이후에는 퀴즈 결과를 저장할 때마다 자동으로 갱신됩니다.
+# 사용법: docker-compose exec backend python scripts/backfill_quiz_rollup.py
+
+import sys
+from pathlib import Path
+
+# --- 스크립트가 'app' 모듈을 찾을 수 있도록 경로 설정 ---
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root))
+# ---------------------------------------------------------
+
+from app.db import crud, models
+from app.db.database import SessionLocal, engine
+
+def main():
+    print("--- 🔧 퀴즈 일별 집계(quiz_daily_rollup) 백필 시작 ---")
+    models.QuizDailyRollup.__table__.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        rows = crud.rebuild_quiz_rollup(db)
+    except Exception as e:
+        db.rollback()
+        print(f"❌ 백필 중 오류 발생: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"✅ 집계 {rows}행을 만들었습니다.")
+
+if __name__ == "__main__":
+    main()
@@ -1,67 +1,115 @@
 # scripts/generate_reports.py
 
-import os
 import sys
+import asyncio
+import argparse
 from pathlib import Path
 from datetime import date, timedelta
 
 # --- 스크립트가 'app' 모듈을 찾을 수 있도록 경로 설정 ---
 # 이 스크립트 파일의 위치를 기준으로 프로젝트 루트 경로를 계산합니다.
 # scripts -> backend -> project root
-project_root = Path(__file__).resolve().parents[1] 
+project_root = Path(__file__).resolve().parents[1]
 sys.path.append(str(project_root))
 # ---------------------------------------------------------
 
 # 이제 app 내부의 모듈을 안전하게 임포트할 수 있습니다.
-from app.services import ai_service
-from app.db import report_utils
+from app.core.config import settings
+from app.db.database import async_engine
+from app.services import ai_service, report_batch
+from app.services.report_runner import ReportRunner, date_range
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="대화 기록이 있는 사용자의 일일 리포트를 생성하여 DB에 저장합니다.")
+    parser.add_argument("--date", type=date.fromisoformat, help="리포트를 생성할 날짜 (YYYY-MM-DD, 기본값: 어제)")
+    parser.add_argument("--start", type=date.fromisoformat, help="백필 시작 날짜 (YYYY-MM-DD, --end와 함께 사용)")
+    parser.add_argument("--end", type=date.fromisoformat, help="백필 종료 날짜 (YYYY-MM-DD, 포함)")
+    parser.add_argument("--concurrency", type=int, default=settings.REPORT_CONCURRENCY, help="동시에 처리할 사용자 수")
+    parser.add_argument("--force", action="store_true", help="이미 리포트가 있는 사용자도 다시 생성")
+
+    # 배치 파일 모드: 요청 만들기와 실행을 분리합니다. (요청 JSONL -> 배치 처리 -> 결과 JSONL -> DB 저장)
+    batch = parser.add_mutually_exclusive_group()
+    batch.add_argument("--emit-batch", metavar="REQUESTS_JSONL", help="LLM을 호출하지 않고 리포트 요청을 JSONL 배치 파일로 저장")
+    batch.add_argument("--ingest-results", metavar="RESULTS_JSONL", help="배치 결과 JSONL을 읽어 summaries 테이블에 저장")
+    batch.add_argument("--process-batch-locally", nargs=2, metavar=("REQUESTS_JSONL", "RESULTS_JSONL"),
+                       help="(테스트용) LLM 없이 요청 파일로 결과 파일을 채움")
+    args = parser.parse_args()
+
+    if (args.start is None) != (args.end is None):
+        parser.error("--start와 --end는 함께 지정해야 합니다.")
+    if args.start and args.date:
+        parser.error("--date와 --start/--end는 함께 쓸 수 없습니다.")
+    if args.start and args.start > args.end:
+        parser.error("--start가 --end보다 늦을 수 없습니다.")
+    return args
+
+def resolve_dates(args: argparse.Namespace) -> list[date]:
+    if args.start:
+        return date_range(args.start, args.end)
+    return [args.date or date.today() - timedelta(days=1)]
+
+async def emit_batch(args: argparse.Namespace):
+    target_dates = resolve_dates(args)
+    print(f"--- 📝 {target_dates[0]} ~ {target_dates[-1]} 리포트 요청 배치 파일 생성 ---")
+    try:
+        written = await report_batch.write_batch_file(args.emit_batch, target_dates, force=args.force)
+    finally:
+        await async_engine.dispose()
+    print(f"✅ 요청 {written}건을 {args.emit_batch}에 저장했습니다.")
+    return 0
+
+def ingest_results(args: argparse.Namespace):
+    print(f"--- 💾 배치 결과 {args.ingest_results} 저장 ---")
+    result = report_batch.ingest_results(args.ingest_results)
+    print(f"저장 {result['saved']}건 / 실패 {result['failed']}건")
+    for custom_id, reason in result["failures"]:
+        print(f"  ❌ {custom_id}: {reason}")
+    return 1 if result["failures"] else 0
+
+def process_batch_locally(args: argparse.Namespace):
+    requests_path, results_path = args.process_batch_locally
+    processed = report_batch.process_batch_locally(requests_path, results_path)
+    print(f"✅ (로컬 처리) 요청 {processed}건의 결과를 {results_path}에 저장했습니다.")
+    return 0
+
+async def run(args: argparse.Namespace):
+    target_dates = resolve_dates(args)
+    print(f"--- 📅 {target_dates[0]} ~ {target_dates[-1]} 리포트 생성 작업 시작 ---")
+
+    runner = ReportRunner(concurrency=args.concurrency, force=args.force)
+    try:
+        summary = await runner.run(target_dates)
+    finally:
+        await ai_service.close_client()
+        await async_engine.dispose()
+
+    print("\n--- 📊 작업 결과 ---")
+    print(f"생성 {summary['generated']}건 / 기존 리포트 건너뜀 {summary['skipped_existing']}건 / "
+          f"대화 없음 {summary['empty']}건 / 실패 {summary['failed']}건 (누적 요약 사용 {summary['from_digest']}건, 나눠서 요약 {summary['chunked']}건)")
+    print(f"소요 시간 {summary['elapsed_seconds']}초, 처리량 {summary['reports_per_minute']}건/분")
+    for target_date, user_id, reason in runner.failures:
+        print(f"  ❌ {target_date} [{user_id}]: {reason}")
+
+    if runner.failures:
+        print("⚠️ 실패한 사용자는 같은 명령으로 다시 실행하면 이어서 처리됩니다.")
+        return 1
+    print("--- ✅ 모든 작업 완료 ---")
+    return 0
 
 def main():
     """
-    어제 대화 기록이 있는 모든 사용자에 대해 일일 리포트를 생성하고 DB에 저장합니다.
+    어제(또는 지정한 날짜/기간) 대화 기록이 있는 모든 사용자에 대해 일일 리포트를 생성하고 DB에 저장합니다.
+    --emit-batch / --process-batch-locally / --ingest-results로 배치 파일 방식으로도 처리할 수 있습니다.
     """
-    yesterday = date.today() - timedelta(days=1)
-    print(f"--- 📅 {yesterday} 리포트 생성 작업 시작 ---")
-
-    # 1. 어제 대화한 모든 사용자 ID 가져오기
-    user_ids = report_utils.get_all_user_ids_for_yesterday()
-    if not user_ids:
-        print("✅ 어제 대화한 사용자가 없습니다. 작업을 종료합니다.")
-        return
-
-    print(f"👥 총 {len(user_ids)}명의 사용자에 대한 리포트를 생성합니다: {user_ids}")
-
-    # 2. 각 사용자에 대해 리포트 생성 및 저장
-    for user_id in user_ids:
-        print(f"\n--- 🔄 사용자 [{user_id}] 처리 시작 ---")
-        
-        # 2-1. 사용자의 어제 대화 내용 가져오기
-        conversation_text = report_utils.fetch_daily_conversations(user_id, yesterday)
-        if not conversation_text:
-            print(f"💬 사용자 [{user_id}]의 대화 내용이 없습니다. 건너뜁니다.")
-            continue
-        
-        print(f"📝 대화 내용 로드 완료 (길이: {len(conversation_text)})")
-        
-        # 2-2. AI를 통해 리포트 생성
-        # ai_service에 이미 만들어 둔 함수를 재사용합니다.
-        report_json = ai_service.generate_summary_report(conversation_text)
-        if not report_json:
-            print(f"❌ AI 리포트 생성 실패. 다음 사용자로 넘어갑니다.")
-            continue
-
-        print(f"🤖 AI 리포트 생성 완료")
-
-        # 2-3. 생성된 리포트를 DB에 저장
-        # report_utils에 만들어 둔 함수를 재사용합니다.
-        success = report_utils.save_summary_to_db(user_id, yesterday, report_json)
-        if success:
-            print(f"🎉 사용자 [{user_id}]의 리포트가 성공적으로 저장되었습니다.")
-        else:
-            print(f"❌ 사용자 [{user_id}]의 리포트 저장에 실패했습니다.")
-    
-    print("\n--- ✅ 모든 작업 완료 ---")
+    args = parse_args()
+    if args.emit_batch:
+        sys.exit(asyncio.run(emit_batch(args)))
+    if args.ingest_results:
+        sys.exit(ingest_results(args))
+    if args.process_batch_locally:
+        sys.exit(process_batch_locally(args))
+    sys.exit(asyncio.run(run(args)))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,30 @@
+# scripts/migrate_indexes.py
+# 기존 DB에 models.py의 복합 인덱스(conversations, quiz_results, summaries, family_photos)를 추가하는 마이그레이션 스크립트
+# 새로 만드는 DB는 서버 시작 시 create_all로 인덱스가 함께 생성되므로 실행할 필요가 없습니다.
+# 사용법: docker-compose exec backend python scripts/migrate_indexes.py
+
+import sys
+from pathlib import Path
+
+# --- 스크립트가 'app' 모듈을 찾을 수 있도록 경로 설정 ---
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root))
+# ---------------------------------------------------------
+
+from app.db import database
+
+def main():
+    print("--- 🔧 인덱스 마이그레이션 시작 ---")
+    try:
+        created = database.create_missing_indexes()
+    except Exception as e:
+        print(f"❌ 인덱스 생성 중 오류 발생: {e}")
+        sys.exit(1)
+
+    if created:
+        print(f"✅ 인덱스 {len(created)}개를 생성했습니다: {created}")
+    else:
+        print("✅ 추가할 인덱스가 없습니다. 이미 최신 상태입니다.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+# tests/conftest.py
+# app.core.config가 요구하는 환경 변수를 테스트용 값으로 채웁니다. (실제 DB/외부 API에는 연결하지 않음)
+
+import os
+
+for key, value in {
+    "OPENAI_API_KEY": "test",
+    "PINECONE_API_KEY": "test",
+    "MYSQL_USER": "test",
+    "MYSQL_PASSWORD": "test",
+    "MYSQL_HOST": "127.0.0.1",
+    "MYSQL_DATABASE": "test",
+    "MYSQL_ROOT_PASSWORD": "test",
+}.items():
+    os.environ.setdefault(key, value)
@@ -0,0 +1,85 @@
+# tests/test_conversation_writer.py
+# 대화 저장 버퍼가 턴 시각을 그대로 저장하고(자정 넘어 재시도해도), 사용자 id 캐시를 제한하는지 확인합니다.
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.db import models
+from app.db.database import Base
+from app.services import conversation_writer as writer_module
+from app.services.conversation_writer import ConversationWriteBuffer
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'convos.db'}")
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def prepare():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(prepare())
+    monkeypatch.setattr(writer_module, "AsyncSessionLocal", factory)
+    yield factory
+    asyncio.run(engine.dispose())
+
+
+def test_retried_rows_keep_the_turn_time(session_factory, monkeypatch):
+    buffer = ConversationWriteBuffer(batch_size=100, flush_interval=60, max_pending=100, max_cached_users=10)
+    turn_time = datetime(2026, 10, 1, 23, 59, 30)
+    original_write = buffer._write
+    attempts = []
+
+    async def fail_once(batch):
+        attempts.append(len(batch))
+        if len(attempts) == 1:
+            raise ConnectionError("DB 연결 실패")
+        await original_write(batch)
+
+    monkeypatch.setattr(buffer, "_write", fail_once)
+
+    class _Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return turn_time
+
+    async def run():
+        writer_module.datetime = _Clock
+        try:
+            assert buffer.add_turn("senior", "잘 자요", "안녕히 주무세요") == turn_time
+        finally:
+            writer_module.datetime = datetime
+        await buffer.flush()   # 실패 -> 버퍼 앞쪽으로 되돌림
+        await buffer.flush()   # (자정 이후) 재시도
+        await buffer.stop()
+        async with session_factory() as db:
+            return list((await db.execute(select(models.Conversation.created_at))).scalars())
+
+    created = asyncio.run(run())
+    assert attempts == [2, 2]
+    assert created == [turn_time, turn_time]
+
+
+def test_user_id_cache_is_bounded(session_factory):
+    buffer = ConversationWriteBuffer(batch_size=100, flush_interval=60, max_pending=100, max_cached_users=2)
+
+    async def run():
+        for user_id in ("a", "b", "c"):
+            buffer.add_turn(user_id, "안녕", "안녕하세요")
+        await buffer.flush()
+        buffer.add_turn("a", "또 왔어", "반가워요")
+        await buffer.flush()
+        await buffer.stop()
+        async with session_factory() as db:
+            return (await db.execute(select(models.Conversation.user_id, models.User.user_id_str).join(models.User))).all()
+
+    rows = asyncio.run(run())
+    assert len(buffer._user_ids) == 2
+    assert len(rows) == 8
+    assert all(user_id_str in ("a", "b", "c") for _, user_id_str in rows)
+    assert len({user_id for user_id, user_id_str in rows if user_id_str == "a"}) == 1
@@ -0,0 +1,77 @@
+# tests/test_daily_digest.py
+# 자정을 넘긴 세션의 발화가 대화한 날짜별 누적 요약에 나뉘어 반영되는지 확인합니다.
+
+import asyncio
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.db import models
+from app.db.database import Base
+from app.services import daily_digest_service
+
+DAY_1 = date(2026, 10, 1)
+DAY_2 = date(2026, 10, 2)
+
+SESSION_LOG = ["AI: 안녕하세요", "사용자: 아직 안 잤어", "AI: 늦었네요", "사용자: 이제 잘게", "AI: 주무세요"]
+LOG_DATES = [DAY_1, DAY_1, DAY_1, DAY_2, DAY_2]
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'digest.db'}")
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def prepare():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def fake_completion(messages, **kwargs):
+        return messages[-1]["content"].split("--- 새 대화 ---\n")[1].split("\n-----")[0]
+
+    asyncio.run(prepare())
+    monkeypatch.setattr(daily_digest_service, "AsyncSessionLocal", factory)
+    monkeypatch.setattr(daily_digest_service.ai_service, "get_ai_chat_completion", fake_completion)
+    yield factory
+    asyncio.run(engine.dispose())
+
+
+def test_split_by_date():
+    assert daily_digest_service.split_by_date(SESSION_LOG, LOG_DATES) == [
+        (DAY_1, SESSION_LOG[:3]),
+        (DAY_2, SESSION_LOG[3:]),
+    ]
+
+
+def test_session_across_midnight_folds_into_each_day(session_factory):
+    async def run():
+        updated = await daily_digest_service.fold_session_by_date("senior", SESSION_LOG, LOG_DATES)
+        async with session_factory() as db:
+            user = (await db.execute(models.User.__table__.select())).first()
+            db.add_all([
+                models.Conversation(user_id=user.id, speaker="user", message="아직 안 잤어", created_at=datetime(2026, 10, 1, 23, 59)),
+                models.Conversation(user_id=user.id, speaker="user", message="이제 잘게", created_at=datetime(2026, 10, 2, 0, 1)),
+            ])
+            await db.commit()
+            covering = [await daily_digest_service.get_covering_digest(db, "senior", day) for day in (DAY_1, DAY_2)]
+        return updated, covering
+
+    updated, covering = asyncio.run(run())
+    assert updated == 2
+    assert "아직 안 잤어" in covering[0] and "이제 잘게" not in covering[0]
+    assert "이제 잘게" in covering[1] and "아직 안 잤어" not in covering[1]
+    assert daily_digest_service._user_locks == {}
+
+
+def test_digest_with_extra_turns_is_not_covering(session_factory):
+    async def run():
+        # 다른 날의 발화까지 반영된 요약은 그날의 원문을 대신할 수 없습니다.
+        await daily_digest_service.fold_session("senior", SESSION_LOG, DAY_1)
+        async with session_factory() as db:
+            user = (await db.execute(models.User.__table__.select())).first()
+            db.add(models.Conversation(user_id=user.id, speaker="user", message="아직 안 잤어", created_at=datetime(2026, 10, 1, 23, 59)))
+            await db.commit()
+            return await daily_digest_service.get_covering_digest(db, "senior", DAY_1)
+
+    assert asyncio.run(run()) is None
@@ -0,0 +1,20 @@
+# tests/test_embedding_cache.py
+# 디스크 캐시의 항목 수가 같은 키를 다시 저장해도 늘어나지 않는지 확인합니다.
+
+import asyncio
+
+from app.services.embedding_cache import EmbeddingCache
+
+
+def test_replacing_a_key_does_not_count_as_a_new_item(tmp_path):
+    cache = EmbeddingCache(db_path=str(tmp_path / "embeddings.db"), max_memory_items=1, max_db_items=3)
+
+    async def run():
+        for _ in range(5):
+            await cache.put("model", "같은 문장", [0.1, 0.2])
+        await cache.put("model", "다른 문장", [0.3, 0.4])
+
+    asyncio.run(run())
+    assert cache.stats()["disk_items"] == 2
+    (rows,) = cache._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+    assert rows == 2
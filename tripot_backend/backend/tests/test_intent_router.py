@@ -0,0 +1,59 @@
+# tests/test_intent_router.py
+# 발화 의도 분류(IntentRouter.classify)를 확인합니다.
+
+import pytest
+
+from app.services.intent_router import (
+    IntentRouter, INTENT_START_QUIZ, INTENT_STOP_QUIZ, INTENT_STT_NOISE, INTENT_GREETING, INTENT_ACK, INTENT_CHAT,
+)
+
+
+@pytest.fixture(scope="module")
+def router():
+    return IntentRouter()
+
+
+@pytest.mark.parametrize("utterance, expected", [
+    # 퀴즈 명령
+    ("문제 풀래", INTENT_START_QUIZ),
+    ("퀴즈 시작해 줘", INTENT_START_QUIZ),
+    ("문제 내줘요", INTENT_START_QUIZ),
+    ("퀴즈 그만할래", INTENT_STOP_QUIZ),
+    ("문제 종료", INTENT_STOP_QUIZ),
+    # 인사 / 맞장구 (반복 포함)
+    ("안녕하세요!", INTENT_GREETING),
+    ("여보세요?", INTENT_GREETING),
+    ("네", INTENT_ACK),
+    ("네네", INTENT_ACK),
+    ("그래요 그래요", INTENT_ACK),
+    ("알겠습니다.", INTENT_ACK),
+    # STT 환각 / 빈 발화
+    ("", INTENT_STT_NOISE),
+    ("...", INTENT_STT_NOISE),
+    ("시청해주셔서 감사합니다.", INTENT_STT_NOISE),
+    ("MBC 뉴스", INTENT_STT_NOISE),
+    ("구독과 좋아요!", INTENT_STT_NOISE),
+    # 환각 문구가 들어 있어도 실제 대화면 일반 대화
+    ("MBC 뉴스 봤어", INTENT_CHAT),
+    ("좋아요와 구독 부탁", INTENT_CHAT),
+    ("어제 MBC 뉴스에서 날씨가 춥대", INTENT_CHAT),
+    # 일반 대화
+    ("네, 오늘 병원에 다녀왔어요", INTENT_CHAT),
+    ("안녕하세요 오늘 날씨가 좋네요", INTENT_CHAT),
+    ("문제가 좀 있어", INTENT_CHAT),
+])
+def test_classify(router, utterance, expected):
+    assert router.classify(utterance) == expected
+
+
+def test_is_stt_noise(router):
+    assert router.is_stt_noise("시청해 주셔서 고맙습니다")
+    assert not router.is_stt_noise("MBC 뉴스 봤어")
+
+
+def test_record_counts_by_intent():
+    router = IntentRouter()
+    router.record(INTENT_CHAT)
+    router.record(INTENT_CHAT)
+    router.record(INTENT_ACK)
+    assert router.stats() == {"total": 3, "by_intent": {INTENT_CHAT: 2, INTENT_ACK: 1}}
@@ -0,0 +1,35 @@
+# tests/test_internal_metrics.py
+# 내부 지표 엔드포인트가 내부 토큰 없이는 열리지 않는지 확인합니다.
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import metrics
+from app.core.config import settings
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(metrics.router, prefix="/api/v1/internal")
+    return TestClient(app)
+
+
+def test_metrics_hidden_when_no_token_is_configured(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "")
+    assert client.get("/api/v1/internal/metrics", headers={"X-Internal-Token": ""}).status_code == 404
+
+
+def test_metrics_rejects_missing_or_wrong_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "secret")
+    assert client.get("/api/v1/internal/metrics").status_code == 401
+    assert client.get("/api/v1/internal/metrics", headers={"X-Internal-Token": "wrong"}).status_code == 401
+    assert client.get("/api/v1/internal/metrics", headers={"X-Internal-Token": "토큰".encode()}).status_code == 401
+
+
+def test_metrics_with_internal_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "secret")
+    response = client.get("/api/v1/internal/metrics", headers={"X-Internal-Token": "secret"})
+    assert response.status_code == 200
+    assert {"db_pool", "intents", "latency_ms"} <= response.json().keys()
@@ -0,0 +1,35 @@
+# tests/test_memory_store.py
+# 로컬 기억 저장소가 같은 사용자의 동시 upsert에서 벡터를 잃지 않는지, Pinecone 키 없이 설정을 만들 수 있는지 확인합니다.
+
+import asyncio
+
+import numpy as np
+
+from app.core.config import Settings
+from app.services.memory_store import LocalMemoryStore, EMBEDDING_DIMENSION
+
+
+def _vector(n: int) -> dict:
+    values = np.zeros(EMBEDDING_DIMENSION, dtype=np.float32)
+    values[n % EMBEDDING_DIMENSION] = 1.0
+    return {"id": f"m{n}", "values": values.tolist(), "metadata": {"user_id": "senior", "text": f"기억 {n}", "timestamp": n}}
+
+
+def test_concurrent_upserts_keep_every_vector(tmp_path):
+    store = LocalMemoryStore(str(tmp_path), max_users=10)
+
+    async def run():
+        await asyncio.gather(*(store.upsert([_vector(n)]) for n in range(20)))
+
+    asyncio.run(run())
+    reopened = LocalMemoryStore(str(tmp_path), max_users=10)
+    snapshot = reopened._load("senior")
+    assert sorted(item["id"] for item in snapshot.metadata) == sorted(f"m{n}" for n in range(20))
+    assert snapshot.vectors.shape == (20, EMBEDDING_DIMENSION)
+
+
+def test_settings_without_pinecone_key(monkeypatch):
+    monkeypatch.delenv("PINECONE_API_KEY", raising=False)
+    monkeypatch.setenv("MEMORY_STORE_BACKEND", "local")
+    settings = Settings(_env_file=None)
+    assert settings.PINECONE_API_KEY == ""
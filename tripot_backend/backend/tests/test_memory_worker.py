@@ -0,0 +1,83 @@
+# tests/test_memory_worker.py
+# 기억 저장소가 없거나 일괄 저장이 실패했을 때 저장 대기 벡터가 무한히 쌓이지 않는지 확인합니다.
+
+import asyncio
+
+from app.services import vector_db_service
+from app.services.memory_worker import MemoryConsolidationWorker
+
+SESSION_LOG = ["AI: 안녕하세요", "사용자: 산책 다녀왔어", "AI: 좋네요", "사용자: 공원에 갔어"]
+
+
+class FlakyStore:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.saved: list[dict] = []
+
+    async def upsert(self, vectors):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("저장소 연결 실패")
+        self.saved.extend(vectors)
+
+
+def _worker(max_pending: int = 10) -> MemoryConsolidationWorker:
+    worker = MemoryConsolidationWorker(concurrency=1, queue_size=10, batch_size=50, flush_interval=60, max_pending=max_pending)
+    worker._flush_lock = asyncio.Lock()
+    return worker
+
+
+def _vector(n: int) -> dict:
+    return {"id": str(n), "values": [0.0], "metadata": {}}
+
+
+def test_no_vector_is_built_without_a_store(monkeypatch):
+    monkeypatch.setattr(vector_db_service, "memory_store", None)
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("저장소가 없으면 요약/임베딩을 호출하지 않아야 합니다.")
+
+    monkeypatch.setattr(vector_db_service.ai_service, "get_ai_chat_completion", fail)
+    monkeypatch.setattr(vector_db_service.ai_service, "get_embedding", fail)
+    assert asyncio.run(vector_db_service.build_memory_vector("senior", SESSION_LOG)) is None
+
+
+def test_flush_without_a_store_drops_pending(monkeypatch):
+    monkeypatch.setattr(vector_db_service, "memory_store", None)
+    worker = _worker()
+    worker._pending = [_vector(1), _vector(2)]
+    asyncio.run(worker.flush())
+    assert worker._pending == []
+    assert worker.failed == 2
+
+
+def test_failed_batch_is_retried_on_next_flush(monkeypatch):
+    store = FlakyStore(failures=1)
+    monkeypatch.setattr(vector_db_service, "memory_store", store)
+    worker = _worker()
+    worker._pending = [_vector(1), _vector(2)]
+
+    async def run():
+        await worker.flush()
+        assert [v["id"] for v in worker._pending] == ["1", "2"]
+        worker._pending.append(_vector(3))
+        await worker.flush()
+
+    asyncio.run(run())
+    assert [v["id"] for v in store.saved] == ["1", "2", "3"]
+    assert worker.upsert_errors == 1 and worker.upserted == 3
+
+
+def test_retried_vectors_are_capped(monkeypatch):
+    monkeypatch.setattr(vector_db_service, "memory_store", FlakyStore(failures=2))
+    worker = _worker(max_pending=3)
+    worker._pending = [_vector(1), _vector(2)]
+
+    async def run():
+        await worker.flush()
+        worker._pending.extend([_vector(3), _vector(4)])
+        await worker.flush()
+
+    asyncio.run(run())
+    assert [v["id"] for v in worker._pending] == ["2", "3", "4"]
+    assert worker.failed == 1
@@ -0,0 +1,94 @@
+# tests/test_quiz_grader.py
+# 규칙 채점(grade_locally)과 LLM 판정 메모(QuizGrader)를 확인합니다.
+
+import asyncio
+
+import pytest
+
+from app.services.quiz_bank import QuizRecord
+from app.services.quiz_grader import QuizGrader, extract_numbers, grade_locally
+
+
+@pytest.mark.parametrize("correct_answer, user_answer, expected", [
+    # 숫자 하나
+    ("8", "8이요", True),
+    ("8", "팔", True),
+    ("8", "여덟 개요", True),
+    ("8", "네, 8이요", True),
+    ("8", "7", False),
+    ("8", "오 더하기 삼은 구", False),
+    ("8", "5 더하기 3은 8", None),
+    ("15", "십오", True),
+    ("15", "열 다섯 개", True),
+    ("15", "열다섯", True),
+    ("17", "십칠", True),
+    ("17", "십칠 개", True),
+    ("4", "네 자루요", True),
+    ("4", "사 개", True),
+    ("13", "모르겠어요", False),
+    # 한자어 수사처럼 보이는 보통 단어는 숫자로 보지 않고 LLM에 맡깁니다.
+    ("5", "오이", None),
+    ("4", "사요", None),
+    ("8", "팔이요", None),
+    ("2", "이요", None),
+    # 숫자/단어 나열
+    ("9, 2, 7", "구 이 칠", True),
+    ("9, 2, 7", "927", True),
+    ("9, 2, 7", "7, 2, 9", False),
+    ("3, 1, 8, 5", "삼일팔오", True),
+    ("사과, 의자, 하늘, 연필, 자동차", "사과 의자 하늘 연필 자동 차", True),
+    ("사과, 의자, 하늘, 연필, 자동차", "의자 사과 하늘 연필 자동차", None),
+    ("사과, 의자, 하늘, 연필, 자동차", "사과 책상", False),
+    ("강아지, 고양이", "고양이하고 강아지", None),
+    # 여러 정답 중 하나
+    ("나비 / 나라 / 나무", "나무요", True),
+    ("나비 / 나라 / 나무", "나팔", None),
+    ("나비 / 나라 / 나무", "나무인 것 같아요", True),
+    ("나비 / 나라 / 나무", "나무꾼", None),
+    ("나비 / 나라 / 나무", "나비 말고 나방", None),
+    # 짧은 단어/문장
+    ("작다", "작아요", True),
+    ("작다", "안 작아요", None),
+    ("서울", "서울이요", True),
+    ("서울", "서울 아니에요", None),
+    ("서울", "부산", None),
+    ("서울", "음, 서울이요", True),
+    ("서울", "정답은 서울입니다", True),
+    ("어머니", "어머니요", True),
+    # 정답을 포함하기만 한 답변은 LLM에 맡깁니다.
+    ("사과", "사과 말고 배", None),
+    ("해", "해바라기", None),
+    ("해", "해요", True),
+    ("백두산 큰 돌담은 돌담보다 더 크다.", "백두산 큰 돌담은 돌담보다 더 크다", True),
+    ("과일", "기억이 안 나요", False),
+])
+def test_grade_locally(correct_answer, user_answer, expected):
+    assert grade_locally(correct_answer, user_answer) is expected
+
+
+def test_extract_numbers_ignores_sino_syllables_inside_words():
+    assert extract_numbers("오이 두 개 샀어요") == [2]
+    assert extract_numbers("사요") == []
+    assert extract_numbers("오 원이요") == [5]
+
+
+class _FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_quiz_feedback(self, question, user_answer, correct_answer, raise_on_error=False):
+        self.calls += 1
+        return "정답이에요!", True
+
+
+def test_llm_verdict_is_memoized_per_normalized_answer():
+    async def grade_all():
+        grader, llm = QuizGrader(memo_max_items=10), _FakeLLM()
+        quiz = QuizRecord(16, "언어 능력", "바나나의 끝 글자로 시작하는 단어는?", "나비 / 나라 / 나무")
+        results = [await grader.grade(quiz, answer, llm) for answer in ("나팔", "나 팔!", "나무")]
+        return results, llm.calls, grader.stats()
+
+    results, llm_calls, stats = asyncio.run(grade_all())
+    assert results == [(True, "정답이에요!"), (True, None), (True, None)]
+    assert llm_calls == 1
+    assert (stats["local"], stats["memo_hits"], stats["llm_calls"]) == (1, 1, 1)
@@ -0,0 +1,86 @@
+# tests/test_quiz_rollup.py
+# 퀴즈 결과 저장 시 quiz_daily_rollup 갱신이 다른 연결과 경합해도 결과 행이 사라지지 않는지 확인합니다.
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, false
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.db import crud, async_crud, models
+from app.db.database import Base
+
+QUIZ_TIME = datetime(2026, 10, 1, 9, 30)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "quiz.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        user = models.User(user_id_str="senior")
+        db.add_all([user, models.Quiz(id=1, topic="계산력", question_text="5 더하기 3은?", answer="8")])
+        db.flush()
+        # 다른 연결이 같은 (사용자, 날짜, 주제) 집계 행을 먼저 만들어 둔 상황
+        db.add(models.QuizDailyRollup(user_id=user.id, rollup_date=QUIZ_TIME.date(), topic="계산력", total_count=1, correct_count=1))
+        db.commit()
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def lose_first_update(monkeypatch):
+    """첫 UPDATE가 아무 행도 갱신하지 못한 것처럼 만들어, INSERT가 유니크 제약에 걸리는 경합 경로를 강제합니다."""
+    original = crud.quiz_rollup_increment
+    calls = []
+
+    def racing_increment(*args, **kwargs):
+        calls.append(args)
+        statement = original(*args, **kwargs)
+        return statement.where(false()) if len(calls) == 1 else statement
+
+    monkeypatch.setattr(crud, "quiz_rollup_increment", racing_increment)
+    monkeypatch.setattr(async_crud, "quiz_rollup_increment", racing_increment)
+    return calls
+
+
+def _result(is_correct: bool) -> dict:
+    return {
+        "user_id": "senior", "quiz_id": 1, "question_text": "5 더하기 3은?", "user_answer": "8",
+        "correct_answer": "8", "is_correct": is_correct, "quiz_session_id": "s1", "created_at": QUIZ_TIME,
+    }
+
+
+def _assert_both_rows_persisted(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    with sessionmaker(bind=engine)() as db:
+        assert db.query(models.QuizResult).count() == 1
+        rollup = db.query(models.QuizDailyRollup).one()
+        assert (rollup.total_count, rollup.correct_count) == (2, 1)
+    engine.dispose()
+
+
+def test_sync_save_quiz_result_survives_rollup_race(db_path, lose_first_update):
+    engine = create_engine(f"sqlite:///{db_path}")
+    with sessionmaker(bind=engine, autoflush=False)() as db:
+        crud.save_quiz_result(db, _result(is_correct=False))
+    engine.dispose()
+
+    assert len(lose_first_update) == 2  # UPDATE(경합으로 0행) -> INSERT 실패 -> UPDATE 재시도
+    _assert_both_rows_persisted(db_path)
+
+
+def test_async_save_quiz_result_survives_rollup_race(db_path, lose_first_update):
+    async def save():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        async with async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)() as db:
+            await async_crud.save_quiz_result(db, _result(is_correct=False))
+        await engine.dispose()
+
+    asyncio.run(save())
+
+    assert len(lose_first_update) == 2
+    _assert_both_rows_persisted(db_path)
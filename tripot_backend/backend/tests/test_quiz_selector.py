@@ -0,0 +1,49 @@
+# tests/test_quiz_selector.py
+# 사용자별 출제(quiz_selector)가 안 푼 문제부터 고르고, 비트맵이 문제 수 기준으로 유지되는지 확인합니다.
+
+from app.services.quiz_bank import QuizBank, QuizRecord
+from app.services.quiz_selector import QuizSelector, UserQuizState
+
+
+def _bank(quiz_ids: list[int]) -> QuizBank:
+    topics = ("기억력", "계산력", "언어 능력")
+    return QuizBank([QuizRecord(quiz_id, topics[quiz_id % 3], f"q{quiz_id}", "a") for quiz_id in quiz_ids])
+
+
+def _selector(user_id: str, answered_ids: list[int]) -> QuizSelector:
+    selector = QuizSelector(max_users=10, miss_lookback_days=14, miss_weight=1.0)
+    selector._states[user_id] = UserQuizState(answered_ids, {})
+    return selector
+
+
+def test_bitmap_size_follows_bank_size_not_quiz_ids():
+    bank = _bank(list(range(10_000_001, 10_000_031)))
+    selector = _selector("senior", [10_000_001, 10_000_002])
+
+    chosen = selector.select("senior", bank, 5)
+
+    state = selector._states["senior"]
+    assert len(state.seen.bits) == (len(bank) + 7) // 8
+    assert {10_000_001, 10_000_002}.isdisjoint(record.id for record in chosen)
+
+
+def test_serves_every_quiz_once_before_repeating():
+    bank = _bank(list(range(1, 31)))
+    selector = _selector("senior", [1, 2, 3])
+
+    served = [record.id for _ in range(9) for record in selector.select("senior", bank, 3)]
+
+    assert sorted(served) == list(range(4, 31))
+    assert selector.round_resets == 0
+
+
+def test_seen_quizzes_survive_bank_reload():
+    selector = _selector("senior", [])
+    first = selector.select("senior", _bank(list(range(1, 11))), 4)
+
+    # 새 문제가 추가되고 기존 문제 하나가 삭제된 은행으로 다시 적재된 경우
+    reloaded = _bank([quiz_id for quiz_id in range(1, 21) if quiz_id != first[0].id])
+    served = [record.id for _ in range(5) for record in selector.select("senior", reloaded, 3)]
+
+    assert set(served).isdisjoint(record.id for record in first)
+    assert len(set(served)) == len(served) == 15
@@ -0,0 +1,98 @@
+# tests/test_report_batch.py
+# 배치 결과 저장(ingest_results)이 새 사용자 생성 때문에 중간 커밋하지 않고, 한 줄의 저장 실패가 나머지 줄을 막지 않는지 확인합니다.
+
+import json
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from app.db import crud, models
+from app.db.database import Base
+from app.services import report_batch
+
+TARGET_DATE = date(2026, 10, 1)
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reports.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    commits = []
+
+    def counting_factory():
+        db = factory()
+        original_commit = db.commit
+
+        def commit():
+            commits.append(db.query(models.Summary).count())
+            original_commit()
+
+        db.commit = commit
+        return db
+
+    monkeypatch.setattr(report_batch, "SessionLocal", counting_factory)
+    yield factory, commits
+    engine.dispose()
+
+
+def _write_results(path, user_ids):
+    with open(path, "w", encoding="utf-8") as f:
+        for user_id in user_ids:
+            f.write(json.dumps({
+                "custom_id": report_batch.make_custom_id(TARGET_DATE, user_id),
+                "response": {"status_code": 200, "body": {"choices": [{"message": {"content": json.dumps({"user": user_id})}}]}},
+                "error": None,
+            }, ensure_ascii=False) + "\n")
+
+
+def test_new_users_do_not_commit_mid_batch(session_factory, tmp_path, monkeypatch):
+    factory, commits = session_factory
+    monkeypatch.setattr(report_batch, "INGEST_COMMIT_EVERY", 2)
+    results_path = tmp_path / "results.jsonl"
+    _write_results(results_path, ["u1", "u2", "u3"])
+
+    outcome = report_batch.ingest_results(str(results_path))
+
+    assert outcome["saved"] == 3
+    assert commits == [2, 3]
+    with factory() as db:
+        assert db.query(models.User).count() == 3
+        assert db.query(models.Summary).count() == 3
+
+
+def test_one_failing_row_does_not_abort_the_file(session_factory, tmp_path, monkeypatch):
+    factory, _ = session_factory
+    original_save = crud.save_summary
+
+    def flaky_save(db, user_id_str, *args, **kwargs):
+        original_save(db, user_id_str, *args, **kwargs)
+        if user_id_str == "bad":
+            raise SQLAlchemyError("저장 실패")
+
+    monkeypatch.setattr(crud, "save_summary", flaky_save)
+    results_path = tmp_path / "results.jsonl"
+    _write_results(results_path, ["u1", "bad", "u2"])
+
+    outcome = report_batch.ingest_results(str(results_path))
+
+    assert outcome["saved"] == 2
+    assert [custom_id for custom_id, _ in outcome["failures"]] == [report_batch.make_custom_id(TARGET_DATE, "bad")]
+    with factory() as db:
+        assert sorted(user.user_id_str for user in db.query(models.User)) == ["u1", "u2"]
+        assert db.query(models.Summary).count() == 2
+
+
+def test_report_cache_is_invalidated_after_commit(session_factory, tmp_path, monkeypatch):
+    _, commits = session_factory
+    invalidated = []
+    monkeypatch.setattr(report_batch.report_cache, "invalidate_user", lambda user_id: invalidated.append((user_id, len(commits))))
+    results_path = tmp_path / "results.jsonl"
+    _write_results(results_path, ["u1", "u2"])
+
+    report_batch.ingest_results(str(results_path))
+
+    assert sorted(invalidated) == [("u1", 1), ("u2", 1)]